@@ -0,0 +1,4 @@
+"""This package times the ciphers, metrics and attacks in this repository so that performance regressions can be caught.
+
+Run `python -m benchmarks --help` for details.
+"""
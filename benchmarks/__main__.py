@@ -0,0 +1,56 @@
+import sys
+from typing import Optional
+
+import plac
+
+from benchmarks.cases import get_benchmarks, GROUPS, DEFAULT_SIZES, DEFAULT_ATTACK_SIZES
+from benchmarks.harness import run_benchmarks, compare, save_report, load_report
+
+
+@plac.annotations(
+    output=plac.Annotation('The name of a file to write the results to as JSON.', kind='option', type=str,
+                           abbrev='o'),
+    baseline=plac.Annotation('The name of a file with the results of an earlier run to compare against. The exit code '
+                             'is 1 if any benchmark got slower than the tolerance allows.', kind='option', type=str,
+                             abbrev='b'),
+    tolerance=plac.Annotation('How much slower (as a fraction) a benchmark can get before it counts as a '
+                              'regression.', kind='option', type=float, abbrev='t'),
+    group=plac.Annotation('Only run the benchmarks in this group.', kind='option', type=str, abbrev='g',
+                          choices=GROUPS),
+    repeat=plac.Annotation('The number of times to repeat each timing loop.', kind='option', type=int, abbrev='r'),
+    min_time=plac.Annotation('The minimum number of seconds each timing loop should take.', kind='option',
+                             type=float, abbrev='m'),
+    quick=plac.Annotation('Only use the smallest message size, for a quick check.', kind='flag', abbrev='q')
+)
+def main(output: Optional[str] = None, baseline: Optional[str] = None, tolerance: float = 0.2,
+         group: Optional[str] = None, repeat: int = 5, min_time: float = 0.2, quick: bool = False) -> int:
+    """Time the ciphers, metrics and attacks, and optionally compare the results against a baseline."""
+    groups = GROUPS if group is None else (group,)
+    sizes = DEFAULT_SIZES[:1] if quick else DEFAULT_SIZES
+    attack_sizes = DEFAULT_ATTACK_SIZES[:1] if quick else DEFAULT_ATTACK_SIZES
+
+    report = run_benchmarks(get_benchmarks(groups, sizes, attack_sizes), repeat, min_time, log=print)
+
+    if output:
+        save_report(report, output)
+        print('\nResults written to %s.' % output)
+
+    if not baseline:
+        return 0
+
+    comparisons = compare(report['results'], load_report(baseline)['results'], tolerance)
+    regressions = [comparison for comparison in comparisons if comparison['regression']]
+
+    print('\nComparison against %s (tolerance %.0f%%):' % (baseline, tolerance * 100))
+
+    for comparison in comparisons:
+        print('%-50s %8.2fx%s' % (comparison['name'], comparison['ratio'],
+                                  '  REGRESSION' if comparison['regression'] else ''))
+
+    print('\n%d of %d benchmarks regressed.' % (len(regressions), len(comparisons)))
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(plac.call(main))
@@ -0,0 +1,239 @@
+"""This module defines the benchmarks for the ciphers, metrics and attacks in this repository."""
+
+import glob
+import os
+from string import ascii_uppercase
+from typing import List, Sequence, Type, Callable, Any, Optional
+
+import numpy as np
+
+from benchmarks.harness import Benchmark
+from crypto.ciphers import CaesarCipher, CaesarCipherKey, SubstitutionCipher, SubstitutionCipherKey, \
+    VigenereCipher, VigenereCipherKey, OneTimePadCipher, OneTimePadCipherKey
+from crypto.ciphers.utils import encode
+from crypto.common_attacks import LetterFrequencyAttack, DictionaryAttack, LanguageAnalysisAttack, NGramAttack, \
+    HillClimbingAttack, IndexOfCoincidenceAttack
+from crypto.dictionaries import DATA_DIR, default_provider
+from crypto.interfaces import CipherI, KeyI, CiphertextOnlyAttackI
+from crypto.language import CORPORA
+from crypto.metrics import letter_distribution, ngram_fitness, ngram_fitness_many, ratio_tokens_in_dict, \
+    positional_similarity, distributional_similarity, aggregate_score, get_ngram_table
+from crypto.strategies import ExhaustiveSampling
+from crypto.types import Message
+
+# The sizes (in bytes) of the messages used to time the ciphers and metrics.
+DEFAULT_SIZES = (1024, 16 * 1024, 256 * 1024)
+# The sizes (in bytes) of the messages used to time the attacks, which are much slower per byte.
+DEFAULT_ATTACK_SIZES = (256, 4096)
+
+GROUPS = ('ciphers', 'metrics', 'attacks')
+
+
+def read_texts(data_dir: str = DATA_DIR) -> str:
+    """Read the sample texts that ship with this repository.
+
+    :param data_dir: The directory containing the texts.
+    :return: The texts joined by spaces. The word lists are not texts, and the language models are built from their
+             corpora (see `crypto.language.CORPORA`), so these are skipped to keep the attacks' inputs held out.
+    """
+    corpus = {os.path.abspath(filename) for filenames in CORPORA.values() for filename in filenames}
+    texts = []
+
+    for filename in sorted(glob.glob(os.path.join(data_dir, '*.txt'))):
+        if os.path.basename(filename).startswith('words_') or os.path.abspath(filename) in corpus:
+            continue
+
+        with open(filename, 'r') as f:
+            texts.append(' '.join(f.read().split()))
+
+    return ' '.join(texts)
+
+
+def make_message(size: int, text: str) -> Message:
+    """Make a message of an exact size by repeating a text.
+
+    :param size: The number of characters in the message.
+    :param text: The text to repeat.
+    :return: The message.
+    """
+    n_repeats = size // (len(text) + 1) + 1
+
+    return Message(' '.join([text] * n_repeats)[:size])
+
+
+def make_key(key_type: Type[KeyI], size: int) -> KeyI:
+    """Make a fixed (so that runs are comparable) key for a cipher.
+
+    :param key_type: The type of key.
+    :param size: The size of the message the key will be used with.
+    :return: The key.
+    """
+    if key_type is CaesarCipherKey:
+        return CaesarCipherKey(3)
+    elif key_type is SubstitutionCipherKey:
+        return SubstitutionCipherKey(dict(zip(ascii_uppercase, 'QWERTYUIOPASDFGHJKLZXCVBNM')))
+    elif key_type is VigenereCipherKey:
+        return VigenereCipherKey('LEMON')
+    elif key_type is OneTimePadCipherKey:
+        return OneTimePadCipherKey(bytes(i % 256 for i in range(size)))
+
+    raise ValueError('Unknown key type %s.' % key_type.__name__)
+
+
+def cipher_benchmarks(sizes: Sequence[int] = DEFAULT_SIZES, text: Optional[str] = None) -> List[Benchmark]:
+    """Get the benchmarks for the encryption and decryption throughput of each cipher.
+
+    :param sizes: The sizes (in bytes) of the messages to encrypt and decrypt.
+    :param text: The text to make messages from. If None then the sample texts are used.
+    :return: The benchmarks.
+    """
+    text = read_texts() if text is None else text
+    ciphers = [(CaesarCipher, CaesarCipherKey), (SubstitutionCipher, SubstitutionCipherKey),
+               (VigenereCipher, VigenereCipherKey), (OneTimePadCipher, OneTimePadCipherKey)]
+    benchmarks = []
+
+    for cipher_type, key_type in ciphers:
+        for size in sizes:
+            for operation in ('encrypt', 'decrypt'):
+                name = 'ciphers/%s/%s/%d' % (cipher_type.__name__, operation, size)
+                setup = _cipher_setup(cipher_type, key_type, operation, size, text)
+                benchmarks.append(Benchmark(name, 'ciphers', setup, n_bytes=size))
+
+    return benchmarks
+
+
+def _cipher_setup(cipher_type: Type[CipherI], key_type: Type[KeyI], operation: str, size: int,
+                  text: str) -> Callable[[], Callable[[], Any]]:
+    def setup():
+        cipher = cipher_type()
+        k = make_key(key_type, size)
+        m = make_message(size, text)
+
+        if operation == 'encrypt':
+            return lambda: cipher.encrypt(m, k)
+
+        c = cipher.encrypt(m, k)
+
+        return lambda: cipher.decrypt(c, k)
+
+    return setup
+
+
+def metric_benchmarks(sizes: Sequence[int] = DEFAULT_SIZES, text: Optional[str] = None) -> List[Benchmark]:
+    """Get the benchmarks for the time per call of each metric.
+
+    :param sizes: The sizes (in bytes) of the messages to score.
+    :param text: The text to make messages from. If None then the sample texts are used.
+    :return: The benchmarks.
+    """
+    text = read_texts() if text is None else text
+    benchmarks = []
+
+    for size in sizes:
+        m = make_message(size, text)
+        # Compare against a decryption with a wrong key, like the attacks do.
+        other = CaesarCipher().encrypt(m, CaesarCipherKey(1))
+        # A batch of candidate messages, as passed to `ngram_fitness_many` by the attacks.
+        candidates = np.stack([encode(m)] * 26)
+
+        metrics = [
+            ('letter_distribution', lambda m=m: letter_distribution(m)),
+            ('ngram_fitness', lambda m=m: ngram_fitness(m)),
+            ('ngram_fitness_many', lambda candidates=candidates: ngram_fitness_many(candidates)),
+            ('ratio_tokens_in_dict', lambda m=m: ratio_tokens_in_dict(m)),
+            ('positional_similarity', lambda m=m, other=other: positional_similarity(m, other)),
+            ('distributional_similarity', lambda m=m, other=other: distributional_similarity(m, other)),
+            ('aggregate_score', lambda m=m, other=other: aggregate_score(m, other)),
+        ]
+
+        for metric_name, f in metrics:
+            name = 'metrics/%s/%d' % (metric_name, size)
+            benchmarks.append(Benchmark(name, 'metrics', _metric_setup(f), n_bytes=size))
+
+    return benchmarks
+
+
+def _metric_setup(f: Callable[[], Any]) -> Callable[[], Callable[[], Any]]:
+    def setup():
+        # Load the n-gram table and the dictionary outside of the timing loop.
+        get_ngram_table()
+        default_provider.get('en')
+
+        return f
+
+    return setup
+
+
+def attack_benchmarks(sizes: Sequence[int] = DEFAULT_ATTACK_SIZES, text: Optional[str] = None) -> List[Benchmark]:
+    """Get the benchmarks for the end-to-end time of each attack.
+
+    Each attack is run against the cipher it is intended for, with a fixed key and (where the attack is randomised)
+    a fixed seed, so that runs are comparable.
+
+    :param sizes: The sizes (in bytes) of the ciphertexts to attack.
+    :param text: The text to make messages from. If None then the sample texts are used.
+    :return: The benchmarks.
+    """
+    text = read_texts() if text is None else text
+    attacks = [
+        ('LetterFrequencyAttack', lambda: LetterFrequencyAttack(ExhaustiveSampling()),
+         CaesarCipher, CaesarCipherKey),
+        ('DictionaryAttack', lambda: DictionaryAttack(ExhaustiveSampling()), CaesarCipher, CaesarCipherKey),
+        ('ProgressiveDictionaryAttack', lambda: DictionaryAttack(ExhaustiveSampling(), prefix_length=200),
+         CaesarCipher, CaesarCipherKey),
+        ('LanguageAnalysisAttack', lambda: LanguageAnalysisAttack(ExhaustiveSampling()),
+         CaesarCipher, CaesarCipherKey),
+        ('NGramAttack', lambda: NGramAttack(ExhaustiveSampling()), CaesarCipher, CaesarCipherKey),
+        ('HillClimbingAttack', lambda: HillClimbingAttack(n_restarts=1, n_iterations=1000, seed=0),
+         SubstitutionCipher, SubstitutionCipherKey),
+        ('IndexOfCoincidenceAttack', lambda: IndexOfCoincidenceAttack(), VigenereCipher, VigenereCipherKey),
+    ]
+    benchmarks = []
+
+    for attack_name, make_attack, cipher_type, key_type in attacks:
+        for size in sizes:
+            name = 'attacks/%s/%s/%d' % (attack_name, cipher_type.__name__, size)
+            setup = _attack_setup(make_attack, cipher_type, key_type, size, text)
+            benchmarks.append(Benchmark(name, 'attacks', setup, n_bytes=size))
+
+    return benchmarks
+
+
+def _attack_setup(make_attack: Callable[[], CiphertextOnlyAttackI], cipher_type: Type[CipherI],
+                  key_type: Type[KeyI], size: int, text: str) -> Callable[[], Callable[[], Any]]:
+    def setup():
+        get_ngram_table()
+        default_provider.get('en')
+
+        c = cipher_type().encrypt(make_message(size, text), make_key(key_type, size))
+
+        # The attack is created for each call because randomised attacks carry their random state between calls.
+        return lambda: make_attack().from_cipher(c, cipher_type, key_type)
+
+    return setup
+
+
+def get_benchmarks(groups: Sequence[str] = GROUPS, sizes: Sequence[int] = DEFAULT_SIZES,
+                   attack_sizes: Sequence[int] = DEFAULT_ATTACK_SIZES) -> List[Benchmark]:
+    """Get the benchmarks in one or more groups.
+
+    :param groups: The groups of benchmarks to get, any of 'ciphers', 'metrics' and 'attacks'.
+    :param sizes: The sizes (in bytes) of the messages used to time the ciphers and metrics.
+    :param attack_sizes: The sizes (in bytes) of the ciphertexts used to time the attacks.
+    :return: The benchmarks.
+    """
+    assert set(groups).issubset(GROUPS), 'Groups must be some of %s.' % ', '.join(GROUPS)
+
+    text = read_texts()
+    benchmarks = []
+
+    if 'ciphers' in groups:
+        benchmarks += cipher_benchmarks(sizes, text)
+
+    if 'metrics' in groups:
+        benchmarks += metric_benchmarks(sizes, text)
+
+    if 'attacks' in groups:
+        benchmarks += attack_benchmarks(attack_sizes, text)
+
+    return benchmarks
@@ -0,0 +1,173 @@
+"""This module times benchmarks and compares their results against a saved baseline."""
+
+import json
+import platform
+import statistics
+import time
+from datetime import datetime
+from typing import Callable, Any, Optional, List, Dict
+
+import numpy as np
+
+
+class Benchmark:
+    """A named piece of code to time."""
+
+    def __init__(self, name: str, group: str, setup: Callable[[], Callable[[], Any]], n_bytes: Optional[int] = None):
+        """Create a benchmark.
+
+        :param name: The name of the benchmark. This is used to match results against a baseline, so it should not
+                     change between runs.
+        :param group: The kind of code being timed, e.g. 'ciphers', 'metrics' or 'attacks'.
+        :param setup: A function that prepares any inputs and returns the function to time. Setup is not timed.
+        :param n_bytes: The number of bytes the timed function processes per call. If given, the throughput in MB/s is
+                        reported as well as the time per call.
+        """
+        self.name = name
+        self.group = group
+        self.setup = setup
+        self.n_bytes = n_bytes
+
+    def __repr__(self):
+        return '%s(name=%s)' % (self.__class__.__name__, self.name)
+
+    def run(self, repeat: int = 5, min_time: float = 0.2) -> Dict[str, Any]:
+        """Time the benchmark.
+
+        The timed function is called in a loop enough times that each loop takes at least `min_time` seconds, and the
+        loop is repeated `repeat` times. The best loop is the least affected by other processes, so it is the one
+        used to compare runs.
+
+        :param repeat: The number of times to repeat the timing loop.
+        :param min_time: The minimum number of seconds each timing loop should take.
+        :return: The result, which can be serialised as JSON.
+        """
+        f = self.setup()
+        n_calls = self._calibrate(f, min_time)
+        times = []
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+
+            for _ in range(n_calls):
+                f()
+
+            times.append((time.perf_counter() - start) / n_calls)
+
+        result = dict(name=self.name, group=self.group, n_calls=n_calls, repeat=repeat, best=min(times),
+                      median=statistics.median(times))
+
+        if self.n_bytes is not None:
+            result['n_bytes'] = self.n_bytes
+            result['mb_per_s'] = self.n_bytes / min(times) / 1e6
+
+        return result
+
+    @staticmethod
+    def _calibrate(f: Callable[[], Any], min_time: float) -> int:
+        """Find how many calls of a function take at least a given time, trying 1, 2, 5, 10, 20, 50, ... calls.
+
+        :param f: The function to time.
+        :param min_time: The minimum number of seconds.
+        :return: The number of calls.
+        """
+        scale = 1
+
+        while True:
+            for n_calls in (scale, 2 * scale, 5 * scale):
+                start = time.perf_counter()
+
+                for _ in range(n_calls):
+                    f()
+
+                if time.perf_counter() - start >= min_time:
+                    return n_calls
+
+            scale *= 10
+
+
+def run_benchmarks(benchmarks: List[Benchmark], repeat: int = 5, min_time: float = 0.2,
+                   log: Optional[Callable[[str], Any]] = None) -> Dict[str, Any]:
+    """Run a list of benchmarks.
+
+    :param benchmarks: The benchmarks to run.
+    :param repeat: The number of times to repeat each timing loop, see `Benchmark.run(...)`.
+    :param min_time: The minimum number of seconds each timing loop should take, see `Benchmark.run(...)`.
+    :param log: A function to report progress with, e.g. `print`. If None then nothing is reported.
+    :return: The report, with a description of the machine under 'metadata' and the result of each benchmark under
+             'results'.
+    """
+    results = []
+
+    for benchmark in benchmarks:
+        result = benchmark.run(repeat, min_time)
+        results.append(result)
+
+        if log is not None:
+            log(format_result(result))
+
+    metadata = dict(timestamp=datetime.now().isoformat(timespec='seconds'), python=platform.python_version(),
+                    numpy=np.__version__, platform=platform.platform(), processor=platform.processor())
+
+    return dict(metadata=metadata, results=results)
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    """Format the result of a benchmark as a line of text.
+
+    :param result: The result, see `Benchmark.run(...)`.
+    :return: The formatted result.
+    """
+    line = '%-50s %12.3f us/call' % (result['name'], result['best'] * 1e6)
+
+    if 'mb_per_s' in result:
+        line += ' %10.1f MB/s' % result['mb_per_s']
+
+    return line
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]],
+            tolerance: float = 0.2) -> List[Dict[str, Any]]:
+    """Compare the results of benchmarks against the results of an earlier run.
+
+    :param results: The results of this run.
+    :param baseline: The results of the earlier run. Benchmarks are matched by name, and benchmarks that are missing
+                     from either run are skipped.
+    :param tolerance: How much slower (as a fraction) a benchmark can get before it is flagged as a regression.
+    :return: One comparison per benchmark, with the ratio of the new best time to the old best time and whether that
+             is a regression.
+    """
+    baseline_by_name = {result['name']: result for result in baseline}
+    comparisons = []
+
+    for result in results:
+        if result['name'] not in baseline_by_name:
+            continue
+
+        old = baseline_by_name[result['name']]['best']
+        ratio = result['best'] / old
+
+        comparisons.append(dict(name=result['name'], baseline=old, best=result['best'], ratio=ratio,
+                                regression=ratio > 1 + tolerance))
+
+    return comparisons
+
+
+def save_report(report: Dict[str, Any], path: str):
+    """Save a benchmark report as JSON.
+
+    :param report: The report, see `run_benchmarks(...)`.
+    :param path: The path of the file to save the report to.
+    """
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    """Load a benchmark report that was saved as JSON.
+
+    :param path: The path of the file to load the report from.
+    :return: The report.
+    """
+    with open(path, 'r') as f:
+        return json.load(f)
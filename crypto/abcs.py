@@ -1,10 +1,22 @@
 """This module defines any abstract base classes (ABCs)."""
 
+import itertools
+import re
 from abc import ABC, abstractmethod
-from typing import Optional
+from multiprocessing.synchronize import Event
+from time import perf_counter_ns
+from typing import Optional, Sequence, Type, Tuple, Generator, List, Callable, IO, Union
 
-from crypto.interfaces import CipherI, KeyI, BruteForceAttackI, SamplingStrategyI
-from crypto.types import T
+import numpy as np
+
+from crypto import validation
+from crypto.candidates import Candidate, CandidateHeap
+from crypto.checkpoint import Checkpointer, fingerprint
+from crypto.instrumentation import AttackStats
+from crypto.interfaces import CipherI, KeyI, BruteForceAttackI, SamplingStrategyI, InstrumentationSinkI
+from crypto.parallel import parallel_search
+from crypto.translation import TranslationTable, translation_table, inverse_alphabet
+from crypto.types import T, CipherText, Message, Buffer
 
 
 class KeyABC(KeyI, ABC):
@@ -46,6 +58,45 @@ class KeyABC(KeyI, ABC):
         return self._value
 
 
+class TranslationKeyABC(KeyABC, ABC):
+    """Abstract base class representing a key for a cipher that maps each letter onto a fixed letter.
+
+    The tables for encrypting and decrypting with a key are built the first time they are needed, and keys with the same
+    value share the same tables, see `translation.translation_table(...)`.
+    """
+
+    @property
+    @abstractmethod
+    def alphabet(self) -> str:
+        """Get the letters that 'A' through 'Z' are mapped to when encrypting with this key.
+
+        :return: The 26 letters, in order.
+        """
+        raise NotImplementedError
+
+    @property
+    def encryption_table(self) -> TranslationTable:
+        """Get the table for encrypting with this key.
+
+        :return: The translation table.
+        """
+        if getattr(self, '_encryption_table', None) is None:
+            self._encryption_table = translation_table(self.alphabet)
+
+        return self._encryption_table
+
+    @property
+    def decryption_table(self) -> TranslationTable:
+        """Get the table for decrypting with this key.
+
+        :return: The translation table.
+        """
+        if getattr(self, '_decryption_table', None) is None:
+            self._decryption_table = translation_table(inverse_alphabet(self.alphabet))
+
+        return self._decryption_table
+
+
 class CipherABC(CipherI, ABC):
     """The abstract base class for a cipher."""
 
@@ -54,15 +105,364 @@ class CipherABC(CipherI, ABC):
     def __init__(self, key: Optional[KeyI] = None):
         raise NotImplementedError
 
+    @staticmethod
+    def is_valid(x: Union[Message, CipherText, Buffer]) -> bool:
+        return validation.is_valid(x)
+
+    def encrypt_stream(self, src: IO, dst: IO, k: Optional[KeyI] = None, chunk_size: int = 2 ** 16) -> int:
+        """Encrypt a message that is read from a stream, writing the ciphertext to another stream.
+
+        Each chunk is encrypted on its own, which is only correct for ciphers where a character's encryption does not
+        depend on its position in the message. Other ciphers must override this.
+
+        :param src: The stream to read the message from. This may be a text or a binary stream.
+        :param dst: The stream to write the ciphertext to, in the same mode as `src`.
+        :param k: The key to use for encrypting the message with. If None then
+                  the key returned by `get_key()` is used.
+        :param chunk_size: The maximum number of characters to read at once.
+        :return: The number of characters written.
+        """
+        return self.transform_stream(src, dst, lambda chunk: self.encrypt(chunk, k), chunk_size)
+
+    def decrypt_stream(self, src: IO, dst: IO, k: Optional[KeyI] = None, chunk_size: int = 2 ** 16) -> int:
+        """Decrypt a ciphertext that is read from a stream, writing the message to another stream.
+
+        Each chunk is decrypted on its own, see `encrypt_stream(...)`.
+
+        :param src: The stream to read the ciphertext from. This may be a text or a binary stream.
+        :param dst: The stream to write the message to, in the same mode as `src`.
+        :param k: The key to use for decrypting the message with. If None then
+                  the key returned by `get_key()` is used.
+        :param chunk_size: The maximum number of characters to read at once.
+        :return: The number of characters written.
+        """
+        return self.transform_stream(src, dst, lambda chunk: self.decrypt(chunk, k), chunk_size)
+
+    @staticmethod
+    def transform_stream(src: IO, dst: IO, transform: Callable[[Union[str, bytes]], Union[str, bytes]],
+                         chunk_size: int = 2 ** 16) -> int:
+        """Read a stream in chunks, transform each chunk and write the result to another stream.
+
+        Only one chunk is held in memory at a time.
+
+        :param src: The stream to read from. This may be a text or a binary stream.
+        :param dst: The stream to write to, in the same mode as `src`.
+        :param transform: The function to apply to each chunk, e.g. `encrypt(...)` with a fixed key. This must give
+                          back a string for a string and bytes for bytes.
+        :param chunk_size: The maximum number of characters to read at once.
+        :return: The number of characters written.
+        """
+        assert chunk_size > 0, 'The chunk size must be positive.'
+
+        n_written = 0
+
+        while True:
+            chunk = src.read(chunk_size)
+
+            if not chunk:
+                return n_written
+
+            n_written += dst.write(transform(chunk))
+
+    def decrypt_many(self, c: Union[CipherText, Buffer], keys: Sequence[KeyI], validate: bool = True) -> np.ndarray:
+        # Fallback for ciphers that do not have a vectorised implementation.
+        if len(keys) == 0:
+            return np.empty((0, len(c)), dtype=np.uint8)
+
+        assert not validate or self.is_valid(c), 'Invalid ciphertext.'
+
+        messages = [self.decrypt(c, k, validate=False) for k in keys]
+
+        return np.stack([np.frombuffer(m.encode('ascii') if isinstance(m, str) else m, dtype=np.uint8)
+                         for m in messages])
+
 
 class BruteForceAttackABC(BruteForceAttackI, ABC):
     """Abstract base class representing a brute-force attack."""
 
-    def __init__(self, sampling_strategy: SamplingStrategyI):
+    # The search stops as soon as a key scores higher than this.
+    threshold = 0.99
+
+    def __init__(self, sampling_strategy: SamplingStrategyI, chunk_size: int = 256, n_workers: int = 1,
+                 top_k: int = 1, checkpoint_path: Optional[str] = None, checkpoint_interval: float = 60.0,
+                 sinks: Sequence[InstrumentationSinkI] = (), prefix_length: Optional[int] = None, margin: float = 0.2):
         """Create a new brute-force attack.
 
         :param sampling_strategy: The strategy to use for sampling key spaces.
+        :param chunk_size: How many keys to decrypt and score at once.
+        :param n_workers: The number of processes to split the search between. The sampling strategy is partitioned
+                          into one strategy per process.
+        :param top_k: The number of best keys to keep track of, see `top_candidates(...)`.
+        :param checkpoint_path: The file to periodically save the progress of searches to. If the file already exists
+                                then the search resumes from where it left off. When searching with several processes
+                                each process uses its own file with the part number appended to this path.
+        :param checkpoint_interval: The minimum number of seconds between saving the progress of a search.
+        :param sinks: Where to send statistics about each search, e.g. how many keys were searched per second and how
+                      the time was split between decrypting and scoring (see `crypto.instrumentation`). If empty then
+                      searches are not instrumented.
+        :param prefix_length: If not None then keys are scored progressively: the first this many letters of the
+                              ciphertext are decrypted and scored first and only the keys that are still in contention
+                              are scored in full, see `get_prefix_key_scorer(...)`.
+        :param margin: How far below the best scores a key's prefix score may be before the key is pruned.
         """
         super().__init__()
 
         self.sampling_strategy = sampling_strategy
+        self.chunk_size = chunk_size
+        self.n_workers = n_workers
+        self.top_k = top_k
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.sinks = list(sinks)
+        self.prefix_length = prefix_length
+        self.margin = margin
+
+    def from_cipher(self, c: CipherText, cipher_type: Type[CipherI],
+                    key_type: Type[KeyI]) -> Tuple[Message, Optional[KeyI]]:
+        candidates = self.top_candidates(c, cipher_type, key_type)
+
+        if not candidates:
+            return None, None
+
+        return candidates[0].message, candidates[0].key
+
+    def top_candidates(self, c: CipherText, cipher_type: Type[CipherI], key_type: Type[KeyI]) -> List[Candidate]:
+        """Search for the `top_k` keys with the best scores.
+
+        Messages are only decrypted for the keys that are returned, and only when they are first asked for.
+
+        :param c: The ciphertext.
+        :param cipher_type: The type of cipher that is being used.
+        :param key_type: The type of key the cipher uses.
+        :return: Up to `top_k` candidates, best first.
+        """
+        if self.n_workers > 1:
+            results = parallel_search(self, c, cipher_type, key_type, self.n_workers)
+        else:
+            results = self.search(c, cipher_type, key_type, checkpoint_path=self.checkpoint_path)
+
+        return [Candidate(score, key, c, cipher_type) for score, key in results]
+
+    def search(self, c: CipherText, cipher_type: Type[CipherI], key_type: Type[KeyI],
+               sampling_strategy: Optional[SamplingStrategyI] = None,
+               stop_event: Optional[Event] = None,
+               checkpoint_path: Optional[str] = None) -> List[Tuple[float, KeyI]]:
+        """Search for the keys with the best scores.
+
+        :param c: The ciphertext.
+        :param cipher_type: The type of cipher that is being used.
+        :param key_type: The type of key the cipher uses.
+        :param sampling_strategy: The strategy to sample keys with. If None then the attack's strategy is used.
+        :param stop_event: An event that is checked between chunks of keys. The search stops early once it is set, and
+                           it is set by this search if a key scores higher than `threshold`.
+        :param checkpoint_path: The file to save the progress of the search to, and to resume the search from if it
+                                exists. If None then progress is not saved.
+        :return: Up to `top_k` (score, key) pairs, best first.
+        """
+        sampling_strategy = self.sampling_strategy if sampling_strategy is None else sampling_strategy
+        cipher = cipher_type()
+        # The ciphertext is checked once here, so the key scorer can skip the check for every chunk of keys.
+        assert cipher.is_valid(c), 'Invalid ciphertext.'
+        stats = AttackStats(self.__class__.__name__, cipher_type.__name__, key_type.__name__) if self.sinks else None
+        score_keys = self.get_key_scorer(c, cipher, stats)
+        candidates = CandidateHeap(self.top_k)
+        checkpointer = None
+        position = 0
+        exit_reason = 'exhausted'
+
+        if checkpoint_path is not None:
+            checkpointer = Checkpointer(checkpoint_path, fingerprint(c, cipher_type, key_type, sampling_strategy),
+                                        self.checkpoint_interval)
+            checkpoint = checkpointer.restore()
+
+            if checkpoint.finished:
+                if stats is not None:
+                    stats.finish('restored', checkpoint.position)
+                    stats.emit(self.sinks)
+
+                return checkpoint.candidates
+
+            if checkpoint.position > 0:
+                candidates.push_many(np.array([score for score, _ in checkpoint.candidates]),
+                                     [key for _, key in checkpoint.candidates])
+                sampling_strategy.setstate(checkpoint.sampling_state)
+                position = checkpoint.position
+
+        tick = perf_counter_ns() if stats is not None else 0
+
+        for keys in self.sample_chunks(key_type, sampling_strategy, position):
+            if stats is None:
+                scores = score_keys(keys)
+            else:
+                sampled = perf_counter_ns()
+                scores = score_keys(keys)
+                stats.record_chunk(len(keys), sampled - tick, perf_counter_ns() - sampled, scores)
+
+            candidates.push_many(scores, keys)
+            position += len(keys)
+
+            if candidates.best_score > self.threshold:
+                exit_reason = 'threshold'
+
+                if stop_event is not None:
+                    stop_event.set()
+
+                break
+
+            if stop_event is not None and stop_event.is_set():
+                exit_reason = 'stopped'
+
+                break
+
+            # Getting the state of the sampling strategy can be costly (`UniqueRandomSampling` copies the keys it has
+            # sampled), so it is only done when the progress is going to be saved.
+            if checkpointer is not None and checkpointer.due():
+                checkpointer.update(position, sampling_strategy.getstate(), candidates.items())
+
+            if stats is not None:
+                tick = perf_counter_ns()
+
+        if checkpointer is not None:
+            checkpointer.update(position, sampling_strategy.getstate(), candidates.items(), exit_reason != 'stopped',
+                                force=True)
+
+        if stats is not None:
+            stats.finish(exit_reason, position)
+            stats.emit(self.sinks)
+
+        return candidates.items()
+
+    def get_key_scorer(self, c: CipherText, cipher: CipherI,
+                       stats: Optional[AttackStats] = None) -> Callable[[List[KeyI]], np.ndarray]:
+        """Get a function that scores a chunk of keys for a given ciphertext.
+
+        By default each chunk of keys is decrypted with `CipherI.decrypt_many(...)` and the candidate messages are
+        scored with `score_many(...)`, progressively if `prefix_length` is set (see `get_prefix_key_scorer(...)`).
+        Subclasses may override this to score keys without decrypting the ciphertext. The ciphertext has already been
+        validated by `search(...)`, so the scorer does not need to validate it again.
+
+        :param c: The ciphertext.
+        :param cipher: The cipher that is being used.
+        :param stats: The statistics of the search if it is instrumented. Scorers that decrypt should add the time it
+                      takes to `stats.decrypt_ns`, the rest of their time is counted as scoring.
+        :return: A function that takes a list of keys and returns a vector with a score for each key.
+        """
+        if self.prefix_length is not None:
+            return self.get_prefix_key_scorer(c, cipher, self.prefix_length, self.margin, stats)
+
+        return self._get_decrypting_key_scorer(c, cipher, stats)
+
+    def _get_decrypting_key_scorer(self, c: Union[CipherText, Buffer], cipher: CipherI,
+                                   stats: Optional[AttackStats] = None) -> Callable[[List[KeyI]], np.ndarray]:
+        """Get a function that scores a chunk of keys by decrypting the whole ciphertext, see `get_key_scorer(...)`."""
+        if stats is None:
+            return lambda keys: self.score_many(cipher.decrypt_many(c, keys, validate=False))
+
+        def score_keys(keys: List[KeyI]) -> np.ndarray:
+            start = perf_counter_ns()
+            candidates = cipher.decrypt_many(c, keys, validate=False)
+            stats.decrypt_ns += perf_counter_ns() - start
+
+            return self.score_many(candidates)
+
+        return score_keys
+
+    def get_prefix_key_scorer(self, c: CipherText, cipher: CipherI, prefix_length: int, margin: float,
+                              stats: Optional[AttackStats] = None) -> Callable[[List[KeyI]], np.ndarray]:
+        """Get a function that scores a chunk of keys progressively, pruning keys on a prefix of the ciphertext.
+
+        Each chunk of keys is first used to decrypt and score only the start of the ciphertext (its first
+        `prefix_length` letters, extended to the end of the word they stop in). Only the keys whose prefix score is
+        within `margin` of the `top_k`-th best full score so far are used to decrypt and score the whole ciphertext
+        (at first the `top_k`-th best prefix score in the chunk stands in for it). Pruned keys keep their prefix score,
+        which is always more than `margin` below the `top_k` best full scores, so they can never displace them: every
+        key returned by a search has been scored in full. This only suits attacks whose scores do not depend on the
+        length of the message, e.g. ratios and averages.
+
+        :param c: The ciphertext.
+        :param cipher: The cipher that is being used.
+        :param prefix_length: The number of letters in the prefix.
+        :param margin: How far below the best score a key's prefix score may be before the key is pruned.
+        :param stats: The statistics of the search if it is instrumented, see `get_key_scorer(...)`.
+        :return: A function that takes a list of keys and returns a vector with a score for each key.
+        """
+        assert prefix_length > 0, 'The prefix must contain at least one letter.'
+        assert margin >= 0, 'The margin must not be negative.'
+
+        end = _prefix_end(c, prefix_length)
+        # Use the default scorer, which decrypts, even if a subclass overrides it.
+        score_prefixes = self._get_decrypting_key_scorer(c[:end], cipher, stats)
+        score_full = self._get_decrypting_key_scorer(c, cipher, stats)
+
+        if end >= len(c):
+            # The ciphertext is no longer than the prefix, so there is nothing to save.
+            return score_full
+
+        # The `top_k` best full scores so far, in no particular order.
+        best = np.full(self.top_k, -np.inf)
+
+        def score_keys(keys: List[KeyI]) -> np.ndarray:
+            nonlocal best
+
+            scores = score_prefixes(keys)
+            scored = np.zeros(len(keys), dtype=bool)
+            reference = float(np.partition(np.concatenate([best, scores]), -self.top_k)[-self.top_k])
+
+            # Scoring survivors in full can lower the reference below the prefix scores it was taken from, so keep
+            # going until every pruned key is more than `margin` below the `top_k` best full scores.
+            while True:
+                survivors = ~scored & (scores >= reference - margin)
+
+                if not survivors.any():
+                    return scores
+
+                indices = np.flatnonzero(survivors)
+                scores[indices] = score_full([keys[i] for i in indices])
+                scored[indices] = True
+                best = np.partition(np.concatenate([best, scores[indices]]), -self.top_k)[-self.top_k:]
+                reference = float(best.min())
+
+        return score_keys
+
+    def sample_chunks(self, key_type: Type[KeyI], sampling_strategy: Optional[SamplingStrategyI] = None,
+                      start: int = 0) -> Generator[List[KeyI], None, None]:
+        """Sample keys from a key space in chunks of at most `chunk_size` keys.
+
+        :param key_type: The type of key whose key space should be sampled.
+        :param sampling_strategy: The strategy to sample keys with. If None then the attack's strategy is used.
+        :param start: The number of keys to skip, see `SamplingStrategyI.sample(...)`.
+        :return: Yields lists of keys sampled by the sampling strategy.
+        """
+        sampling_strategy = self.sampling_strategy if sampling_strategy is None else sampling_strategy
+        keys = sampling_strategy.sample(key_type, start=start)
+
+        while True:
+            chunk = list(itertools.islice(keys, self.chunk_size))
+
+            if not chunk:
+                return
+
+            yield chunk
+
+    @abstractmethod
+    def score_many(self, candidates: np.ndarray) -> np.ndarray:
+        """Score how likely each candidate decryption is to be the original message.
+
+        :param candidates: A 2-D uint8 array where each row is an ASCII encoded candidate message, as returned by
+                           `CipherI.decrypt_many(...)`.
+        :return: A vector with a score for each candidate where higher scores indicate better candidates.
+        """
+        raise NotImplementedError
+
+
+def _prefix_end(c: Union[CipherText, Buffer], n_letters: int) -> int:
+    """Find the end of the prefix of a ciphertext that holds a number of letters, extended to the end of a word.
+
+    :param c: The ciphertext, which must be valid.
+    :param n_letters: The number of letters in the prefix.
+    :return: The index just after the prefix, or the length of the ciphertext if it has fewer letters.
+    """
+    pattern = r'(?:[^A-Z]*[A-Z]){%d}[A-Z]*' % n_letters
+    match = re.match(pattern if isinstance(c, str) else pattern.encode('ascii'), c)
+
+    return len(c) if match is None else match.end()
@@ -0,0 +1,126 @@
+"""This module keeps track of the best keys found by an attack."""
+
+import heapq
+from typing import List, Tuple, Type, Optional, Callable, Sequence
+
+import numpy as np
+
+from crypto.interfaces import KeyI, CipherI
+from crypto.types import CipherText, Message
+
+
+class Candidate:
+    """A key found by an attack, its score and (lazily) the message it decrypts the ciphertext to."""
+
+    def __init__(self, score: float, key: KeyI, c: CipherText, cipher_type: Type[CipherI]):
+        """Create a candidate.
+
+        :param score: The score the attack gave the key.
+        :param key: The key.
+        :param c: The ciphertext that was attacked.
+        :param cipher_type: The type of cipher that was attacked.
+        """
+        self.score = score
+        self.key = key
+        self._c = c
+        self._cipher_type = cipher_type
+        self._message: Optional[Message] = None
+
+    def __repr__(self):
+        return '%s(score=%s, key=%s)' % (self.__class__.__name__, self.score, self.key)
+
+    @property
+    def message(self) -> Message:
+        """Get the message the key decrypts the ciphertext to. This is only decrypted the first time it is needed.
+
+        :return: The decrypted message.
+        """
+        if self._message is None:
+            self._message = self._cipher_type().decrypt(self._c, self.key)
+
+        return self._message
+
+    def rescored(self, score: float) -> 'Candidate':
+        """Get a copy of this candidate with a different score.
+
+        :param score: The new score.
+        :return: The new candidate. This shares the decrypted message with this candidate.
+        """
+        candidate = Candidate(score, self.key, self._c, self._cipher_type)
+        candidate._message = self._message
+
+        return candidate
+
+
+class CandidateHeap:
+    """A bounded min-heap that keeps the `k` highest scoring keys that are pushed onto it.
+
+    Pushing a key costs O(log k) and keys that score no higher than the worst key on a full heap are rejected without
+    touching the heap. Of keys with the same score, the ones pushed first are kept.
+    """
+
+    def __init__(self, k: int = 1):
+        """Create an empty heap.
+
+        :param k: The maximum number of keys to keep.
+        """
+        assert k > 0, 'Must keep at least one candidate.'
+
+        self.k = k
+        self._heap: List[Tuple[float, int, KeyI]] = []
+        self._n_pushed = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def best_score(self) -> float:
+        """Get the highest score on the heap.
+
+        :return: The highest score, or -inf if the heap is empty.
+        """
+        return max(score for score, _, _ in self._heap) if self._heap else -np.inf
+
+    @property
+    def min_score(self) -> float:
+        """Get the score a key has to beat to be kept.
+
+        :return: The lowest score on the heap if it is full, otherwise -inf.
+        """
+        return self._heap[0][0] if len(self._heap) == self.k else -np.inf
+
+    def push_many(self, scores: np.ndarray, keys: Sequence[KeyI]):
+        """Offer a chunk of scored keys to the heap.
+
+        :param scores: The score of each key.
+        :param keys: The keys.
+        """
+        for i in np.flatnonzero(scores > self.min_score):
+            # The negated push order breaks ties in favour of the keys that were pushed first.
+            entry = (float(scores[i]), -(self._n_pushed + int(i)), keys[i])
+
+            if len(self._heap) < self.k:
+                heapq.heappush(self._heap, entry)
+            elif entry[:2] > self._heap[0][:2]:
+                heapq.heapreplace(self._heap, entry)
+
+        self._n_pushed += len(keys)
+
+    def items(self) -> List[Tuple[float, KeyI]]:
+        """Get the keys on the heap.
+
+        :return: A list of (score, key) pairs, best first.
+        """
+        return [(score, key) for score, _, key in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+
+
+def rerank(candidates: Sequence[Candidate], score: Callable[[Message], float]) -> List[Candidate]:
+    """Score the messages of a list of candidates again, e.g. with a slower but more accurate scorer.
+
+    :param candidates: The candidates to rerank.
+    :param score: The function to score each candidate's message with. Higher scores are better.
+    :return: New candidates sorted by their new scores, best first.
+    """
+    reranked = [candidate.rescored(score(candidate.message)) for candidate in candidates]
+
+    return sorted(reranked, key=lambda candidate: candidate.score, reverse=True)
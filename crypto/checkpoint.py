@@ -0,0 +1,160 @@
+"""This module saves the progress of brute-force searches so that interrupted searches can be resumed."""
+
+import hashlib
+import json
+import os
+import pickle
+import time
+from typing import Any, List, Tuple, Type, Optional
+
+from crypto.interfaces import CipherI, KeyI, SamplingStrategyI
+from crypto.types import CipherText
+
+
+class Checkpoint:
+    """The progress of a brute-force search at the end of a chunk of keys."""
+
+    def __init__(self, fingerprint: str, position: int = 0, sampling_state: Any = None,
+                 candidates: Optional[List[Tuple[float, KeyI]]] = None, elapsed: float = 0.0,
+                 finished: bool = False):
+        """Create a checkpoint.
+
+        :param fingerprint: Identifies the search the checkpoint belongs to, see `fingerprint(...)`.
+        :param position: The number of keys that have been sampled and scored.
+        :param sampling_state: The state of the sampling strategy, see `SamplingStrategyI.getstate()`.
+        :param candidates: The best (score, key) pairs found so far, best first.
+        :param elapsed: The number of seconds spent searching, summed over every run of the search.
+        :param finished: Whether the search ran to completion.
+        """
+        self.fingerprint = fingerprint
+        self.position = position
+        self.sampling_state = sampling_state
+        self.candidates = [] if candidates is None else candidates
+        self.elapsed = elapsed
+        self.finished = finished
+
+    def __repr__(self):
+        return '%s(position=%d, elapsed=%.1f, finished=%s)' % (self.__class__.__name__, self.position, self.elapsed,
+                                                                self.finished)
+
+
+def fingerprint(c: CipherText, cipher_type: Type[CipherI], key_type: Type[KeyI],
+                sampling_strategy: Optional[SamplingStrategyI] = None) -> str:
+    """Identify a search so that a checkpoint is not resumed for a different ciphertext, cipher or sampling strategy.
+
+    :param c: The ciphertext.
+    :param cipher_type: The type of cipher that is being used.
+    :param key_type: The type of key the cipher uses.
+    :param sampling_strategy: The strategy that keys are sampled with, if any.
+    :return: A hex digest of the ciphertext, the names of the types and the parameters of the sampling strategy (see
+             `SamplingStrategyI.get_params()`).
+    """
+    h = hashlib.sha256()
+    strategy = ''
+
+    if sampling_strategy is not None:
+        strategy = type(sampling_strategy).__qualname__ + json.dumps(sampling_strategy.get_params(), sort_keys=True)
+
+    for part in (cipher_type.__qualname__, key_type.__qualname__, strategy, c):
+        # Buffers are hashed in place, and give the same digest as the string they encode.
+        h.update(part.encode('utf-8') if isinstance(part, str) else part)
+        h.update(b'\0')
+
+    return h.hexdigest()
+
+
+def save_checkpoint(checkpoint: Checkpoint, path: str):
+    """Save a checkpoint to a file.
+
+    The checkpoint is written to a temporary file first so that a search that is killed while saving does not leave a
+    corrupt checkpoint behind.
+
+    :param checkpoint: The checkpoint to save.
+    :param path: The path of the file to save the checkpoint to.
+    """
+    temp_path = '%s.%d.tmp' % (path, os.getpid())
+
+    with open(temp_path, 'wb') as f:
+        pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    os.replace(temp_path, path)
+
+
+def load_checkpoint(path: str) -> Optional[Checkpoint]:
+    """Load a checkpoint from a file.
+
+    Checkpoints are pickled, so only load checkpoints that you saved yourself.
+
+    :param path: The path of the file to load the checkpoint from.
+    :return: The checkpoint, or None if the file does not exist.
+    """
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+
+
+class Checkpointer:
+    """Periodically saves the progress of a search to a file."""
+
+    def __init__(self, path: str, fingerprint: str, interval: float = 60.0):
+        """Create a checkpointer.
+
+        :param path: The path of the checkpoint file.
+        :param fingerprint: Identifies the search, see `fingerprint(...)`.
+        :param interval: The minimum number of seconds between saves.
+        """
+        self.path = path
+        self.fingerprint = fingerprint
+        self.interval = interval
+        self.checkpoint = Checkpoint(fingerprint)
+
+        self._started = time.monotonic()
+        self._last_saved = self._started
+
+    def restore(self) -> Checkpoint:
+        """Load the checkpoint of the search if there is one.
+
+        :return: The saved checkpoint, or a new checkpoint at the start of the search if there is none.
+        """
+        checkpoint = load_checkpoint(self.path)
+
+        if checkpoint is not None:
+            assert checkpoint.fingerprint == self.fingerprint, \
+                'The checkpoint \'%s\' belongs to a different search.' % self.path
+
+            self.checkpoint = checkpoint
+
+        self._started = time.monotonic()
+        self._last_saved = self._started
+
+        return self.checkpoint
+
+    def due(self) -> bool:
+        """Check whether `interval` seconds have passed since the progress was last saved.
+
+        :return: True if the next call to `update(...)` will save the progress, False otherwise.
+        """
+        return time.monotonic() - self._last_saved >= self.interval
+
+    def update(self, position: int, sampling_state: Any, candidates: List[Tuple[float, KeyI]],
+               finished: bool = False, force: bool = False):
+        """Record the progress of the search, saving it if `interval` seconds have passed since the last save.
+
+        :param position: The number of keys that have been sampled and scored.
+        :param sampling_state: The state of the sampling strategy.
+        :param candidates: The best (score, key) pairs found so far, best first.
+        :param finished: Whether the search ran to completion.
+        :param force: Whether to save the progress regardless of when it was last saved.
+        """
+        if not force and not self.due():
+            return
+
+        now = time.monotonic()
+        self.checkpoint = Checkpoint(self.fingerprint, position, sampling_state, candidates,
+                                     self.checkpoint.elapsed + now - self._started, finished)
+        save_checkpoint(self.checkpoint, self.path)
+
+        self._started = now
+        self._last_saved = now
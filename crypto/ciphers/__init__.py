@@ -1,6 +1,7 @@
 """This package contains implementations of some well known ciphers."""
 
 from crypto.ciphers.caesar import CaesarCipher, CaesarCipherKey
+from crypto.ciphers.otp import OneTimePadCipher, OneTimePadCipherKey
 from crypto.ciphers.substitution import SubstitutionCipher, SubstitutionCipherKey
 from crypto.ciphers.vigenere import VigenereCipher, VigenereCipherKey
 
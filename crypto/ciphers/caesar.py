@@ -1,11 +1,15 @@
-from random import SystemRandom
-from typing import Optional, Union
+from random import SystemRandom, Random
+from typing import Optional, Union, Sequence
 
-from crypto.abcs import CipherABC, KeyABC
-from crypto.types import CipherText, Message
+import numpy as np
 
+from crypto.abcs import CipherABC, KeyABC, TranslationKeyABC
+from crypto.ciphers.utils import encode, lookup_tables, shifted_alphabet, shifted_alphabets, substitute_many, translate
+from crypto.key_space import KeySpace
+from crypto.types import CipherText, Message, Buffer
 
-class CaesarCipherKey(KeyABC):
+
+class CaesarCipherKey(TranslationKeyABC):
     """A key used in the Caesar cipher.
     This is defined as an integer in the range [0, 25].
     A key of zero results in no effect, i.e. if k = 0 then E(m, k) = c = D(c, k) = m.
@@ -23,6 +27,10 @@ class CaesarCipherKey(KeyABC):
 
     __hash__ = KeyABC.__hash__
 
+    @property
+    def alphabet(self) -> str:
+        return shifted_alphabet(self.value)
+
     @staticmethod
     def key_space_contains(k: int) -> bool:
         return type(k) is int and k in range(0, 26)
@@ -32,15 +40,22 @@ class CaesarCipherKey(KeyABC):
         return CaesarCipherKey(0)
 
     @staticmethod
-    def generate_random():
-        r = SystemRandom()
+    def generate_random(rng: Optional[Random] = None):
+        r = SystemRandom() if rng is None else rng
 
         return CaesarCipherKey(r.randrange(0, 26))
 
     @staticmethod
     def get_space():
-        for i in range(0, 26):
-            yield CaesarCipherKey(i)
+        return KeySpace(CaesarCipherKey.key_at, CaesarCipherKey.index_of, CaesarCipherKey.get_space_size())
+
+    @staticmethod
+    def key_at(index: int) -> 'CaesarCipherKey':
+        return CaesarCipherKey(index)
+
+    @staticmethod
+    def index_of(k: 'CaesarCipherKey') -> int:
+        return k.value
 
     @staticmethod
     def get_space_size():
@@ -59,47 +74,32 @@ class CaesarCipher(CipherABC):
     def key(self) -> CaesarCipherKey:
         return self._key
 
-    @staticmethod
-    def is_valid(x: Union[Message, CipherText]) -> bool:
-        return all((char.isalpha() and char.isupper()) or char.isspace()
-                   for char in x)
-
-    def encrypt(self, m: Message, k: Optional[CaesarCipherKey] = None) -> CipherText:
-        assert self.is_valid(m), 'Invalid message.' \
-                                 '\nMessage must be all uppercase letters ' \
-                                 'or spaces.'
+    def encrypt(self, m: Union[Message, Buffer], k: Optional[CaesarCipherKey] = None,
+                out: Optional[Buffer] = None, validate: bool = True) -> Union[CipherText, Buffer]:
+        assert not validate or self.is_valid(m), 'Invalid message.' \
+                                               '\nMessage must be all uppercase letters ' \
+                                               'or spaces.'
 
-        if k:
-            k = k.value
-        else:
-            k = self.key.value
-
-        c = CipherText('')
+        k = k if k else self.key
 
-        for char in m:
-            if char.isspace():
-                c += char
-            else:
-                c += '%c' % (ord('A') + (ord(char) - ord('A') + k) % 26)
+        return CipherText(translate(m, k.encryption_table, out))
 
-        return c
+    def decrypt(self, c: Union[CipherText, Buffer], k: Optional[CaesarCipherKey] = None,
+                out: Optional[Buffer] = None, validate: bool = True) -> Union[Message, Buffer]:
+        assert not validate or self.is_valid(c), 'Invalid Ciphertext.' \
+                                               '\nMessage must be all uppercase letters ' \
+                                               'or spaces.'
 
-    def decrypt(self, c: CipherText, k: Optional[CaesarCipherKey] = None) -> Message:
-        assert self.is_valid(c), 'Invalid Ciphertext.' \
-                                 '\nMessage must be all uppercase letters ' \
-                                 'or spaces.'
+        k = k if k else self.key
 
-        if k:
-            k = k.value
-        else:
-            k = self.key.value
+        return Message(translate(c, k.decryption_table, out))
 
-        m = Message('')
+    def decrypt_many(self, c: Union[CipherText, Buffer], keys: Sequence[CaesarCipherKey],
+                     validate: bool = True) -> np.ndarray:
+        assert not validate or self.is_valid(c), 'Invalid Ciphertext.' \
+                                               '\nMessage must be all uppercase letters ' \
+                                               'or spaces.'
 
-        for char in c:
-            if char.isspace():
-                m += char
-            else:
-                m += chr(ord('A') + (ord(char) - ord('A') - k) % 26)
+        shifts = np.array([k.value for k in keys], dtype=int)
 
-        return m
+        return substitute_many(encode(c), lookup_tables(shifted_alphabets(-shifts)))
@@ -1,102 +1,233 @@
-import random
-from typing import Optional, Generator
+import functools
+import os
+from random import Random
+from typing import Optional, Union, Sequence, BinaryIO, Callable
+
+import numpy as np
 
 from crypto.abcs import CipherABC, KeyABC
-from crypto.ciphers.utils import is_valid
-from crypto.types import CipherText, Message
+from crypto.ciphers.utils import encode, output_array
+from crypto.key_space import KeySpace
+from crypto.types import CipherText, Message, Buffer
 
 
 class OneTimePadCipherKey(KeyABC):
-    def __init__(self, value: int):
+    """A key used in the one time pad cipher.
+    This is a string of bytes (the pad) that is at least as long as the messages it is used to encrypt.
+    """
+
+    def __init__(self, value: bytes):
         super().__init__(value)
 
     @staticmethod
-    def key_space_contains(k: int) -> bool:
-        return type(k) is int  # all integers, and by extension bit strings are valid keys.
+    def key_space_contains(k: bytes) -> bool:
+        return type(k) is bytes  # all byte strings are valid keys.
+
+    @staticmethod
+    def get_identity(length=64) -> 'OneTimePadCipherKey':
+        """Get the identity key, or the key that when used from encrypting has no effect (yields the original message).
+
+        :param length: The length of the key in bytes.
+        :return: The identity key.
+        """
+        return OneTimePadCipherKey(bytes(length))
+
+    @staticmethod
+    def generate_random(length=64, rng: Optional[Random] = None) -> 'OneTimePadCipherKey':
+        """Generate a random key.
+
+        :param length: The length of the key in bytes. This must be at least the length of the message.
+        :param rng: The random number generator to use. If None then the operating system's source of randomness (which
+                    is suitable for cryptographic use) is used.
+        :return: A randomly generated key.
+        """
+        if rng is None:
+            return OneTimePadCipherKey(os.urandom(length))
+
+        return OneTimePadCipherKey(rng.getrandbits(8 * length).to_bytes(length, 'big'))
 
     @staticmethod
-    def get_identity() -> 'OneTimePadCipherKey':
-        return OneTimePadCipherKey(0)
+    def get_space(length=64) -> KeySpace:
+        """Get the key space, or the set of all valid keys.
+        For the one time pad cipher this is defined for keys of a given length.
+
+        :param length: The length of the keys in bytes.
+        :return: The key space.
+        """
+        return KeySpace(functools.partial(OneTimePadCipherKey.key_at, length=length),
+                        functools.partial(OneTimePadCipherKey.index_of, length=length),
+                        OneTimePadCipherKey.get_space_size(length))
 
     @staticmethod
-    def generate_random(length=64) -> 'OneTimePadCipherKey':
-        return OneTimePadCipherKey(random.getrandbits(length))
+    def key_at(index: int, length=64) -> 'OneTimePadCipherKey':
+        # Keys are ordered as big-endian numbers.
+        return OneTimePadCipherKey(index.to_bytes(length, 'big'))
 
     @staticmethod
-    def get_space(length=64) -> Generator['OneTimePadCipherKey', None, None]:
-        for n in range(2 ** length):
-            yield OneTimePadCipherKey(n)
+    def index_of(k: 'OneTimePadCipherKey', length: Optional[int] = None) -> int:
+        assert length is None or len(k.value) == length, 'The key is not %d bytes long.' % length
+
+        return int.from_bytes(k.value, 'big')
 
     @staticmethod
     def get_space_size(length=64) -> int:
-        return 2 ** length - 1
+        # There are 256 possible values for each byte.
+        return 256 ** length
 
 
 # noinspection PyMissingConstructor
 class OneTimePadCipher(CipherABC):
-    """The one time pad cipher where a bit string is used to encrypt messages."""
+    """The one time pad cipher where each byte of a message is XORed with the corresponding byte of a key (the pad).
+
+    Unlike the other ciphers, this works on arbitrary bytes: messages may be strings or buffers of ASCII codes, but
+    ciphertexts are binary, so encrypting and decrypting always give bytes (or write to the buffer given as `out`).
+
+    If the cipher is created without a key, then the first message it encrypts without a key generates a random pad
+    that is exactly as long as the message (see `OneTimePadCipherKey.generate_random(...)`). The pad is then available
+    through `key` to decrypt the message with.
+    """
 
     def __init__(self, key: Optional[OneTimePadCipherKey] = None):
-        """Create a substitution cipher
+        """Create a one time pad cipher.
 
-        :param key: A dictionary encoding letter (uppercase alphabet) to letter mappings.
+        :param key: The pad to use when a key is not given to `encrypt(...)` or `decrypt(...)`. If None then a random
+                    pad is generated for the first message that is encrypted.
         """
-        if key:
-            self._key = key
-        else:
-            self._key = OneTimePadCipherKey.get_identity()
+        self._key = key
 
     @property
-    def key(self) -> OneTimePadCipherKey:
+    def key(self) -> Optional[OneTimePadCipherKey]:
+        """Get the cipher's pad.
+
+        :return: The pad, or None if the cipher was created without a key and has not encrypted a message yet.
+        """
         return self._key
 
-    def encrypt(self, m: Message, k: Optional[OneTimePadCipherKey] = None) -> CipherText:
-        assert is_valid(m), 'Invalid message.' \
-                            '\nMessage must be all uppercase letters ' \
-                            'or spaces.'
+    @staticmethod
+    def is_valid(x: Union[Message, CipherText, Buffer]) -> bool:
+        # Any bytes can be encrypted, but strings must be ASCII so that each character is a single byte.
+        return not isinstance(x, str) or x.isascii()
+
+    def encrypt(self, m: Union[Message, Buffer], k: Optional[OneTimePadCipherKey] = None, out: Optional[Buffer] = None,
+                validate: bool = True) -> Union[bytes, Buffer]:
+        assert not validate or self.is_valid(m), 'Invalid message.\nString messages must be ASCII.'
+
+        if k is None and self._key is None:
+            self._key = OneTimePadCipherKey.generate_random(len(encode(m)))
 
-        if k:
-            k = k.value
-        else:
-            bits_in_m = 8 * len(m)
-            k = OneTimePadCipherKey.generate_random(bits_in_m).value
+        return self._xor(m, k, out)
 
-        # Convert message to bit string
-        m_bit_string = 0
+    def decrypt(self, c: Union[CipherText, Buffer], k: Optional[OneTimePadCipherKey] = None,
+                out: Optional[Buffer] = None, validate: bool = True) -> Union[bytes, Buffer]:
+        assert not validate or self.is_valid(c), 'Invalid ciphertext.\nString ciphertexts must be ASCII.'
 
-        for char in m:
-            m_bit_string = m_bit_string << 8  # shift left by a byte for ASCII chars
-            m_bit_string += ord(char)
+        # XOR is its own inverse.
+        return self._xor(c, k, out)
 
-        c_bit_string = m_bit_string ^ k
+    def decrypt_many(self, c: Union[CipherText, Buffer], keys: Sequence[OneTimePadCipherKey],
+                     validate: bool = True) -> np.ndarray:
+        assert not validate or self.is_valid(c), 'Invalid ciphertext.\nString ciphertexts must be ASCII.'
 
-        # Convert bit string to string
-        c = CipherText('')
+        a = encode(c)
 
-        for _ in range(len(m)):
-            c = chr(c_bit_string & 0xff) + c  # grab lowest byte of the bit string
-            c_bit_string = c_bit_string >> 8  # drop lowest byte
+        for k in keys:
+            assert len(k) >= len(a), 'The key is shorter than the ciphertext (%d < %d).' % (len(k), len(a))
 
-        return c
+        pads = np.array([encode(k.value)[:len(a)] for k in keys], dtype=np.uint8).reshape(-1, len(a))
 
-    def decrypt(self, c: CipherText, k: Optional[OneTimePadCipherKey] = None) -> Message:
-        assert is_valid(c), 'Invalid ciphertext.' \
-                            '\nMessage must be all uppercase letters ' \
-                            'or spaces.'
+        return np.bitwise_xor(a, pads)
+
+    def encrypt_stream(self, src: BinaryIO, dst: BinaryIO, k: Optional[OneTimePadCipherKey] = None,
+                       chunk_size: int = 2 ** 16) -> int:
+        """Encrypt a message that is read from a binary stream, writing the ciphertext to another binary stream.
+
+        :param src: The stream to read the message from, e.g. a file opened in binary mode or `sys.stdin.buffer`.
+        :param dst: The stream to write the ciphertext to.
+        :param k: The key to use for encrypting the message with. If None then
+                  the key returned by `get_key()` is used.
+        :param chunk_size: The maximum number of bytes to read at once.
+        :return: The number of bytes written.
+        """
+        if k is None and self._key is None:
+            # The length of the message is not known in advance, so generate the pad one chunk at a time.
+            pads = []
 
-        if k:
-            k = k.value
-        else:
-            k = self.key.value
+            def xor(chunk: bytes) -> bytes:
+                pads.append(os.urandom(len(chunk)))
+
+                return np.bitwise_xor(encode(chunk), encode(pads[-1])).tobytes()
+
+            n_bytes = self.transform_stream(src, dst, xor, chunk_size)
+            self._key = OneTimePadCipherKey(b''.join(pads))
+
+            return n_bytes
+
+        return self.transform_stream(src, dst, self._stream_xor(k), chunk_size)
+
+    def decrypt_stream(self, src: BinaryIO, dst: BinaryIO, k: Optional[OneTimePadCipherKey] = None,
+                       chunk_size: int = 2 ** 16) -> int:
+        """Decrypt a ciphertext that is read from a binary stream, writing the message to another binary stream.
+
+        :param src: The stream to read the ciphertext from.
+        :param dst: The stream to write the message to.
+        :param k: The key to use for decrypting the message with. If None then
+                  the key returned by `get_key()` is used.
+        :param chunk_size: The maximum number of bytes to read at once.
+        :return: The number of bytes written.
+        """
+        return self.transform_stream(src, dst, self._stream_xor(k), chunk_size)
+
+    def _xor(self, x: Union[str, Buffer], k: Optional[OneTimePadCipherKey] = None,
+             out: Optional[Buffer] = None) -> Union[bytes, Buffer]:
+        """XOR a message or ciphertext with the start of a pad.
+
+        :param x: The message or ciphertext.
+        :param k: The key. If None then the cipher's key is used.
+        :param out: A writable buffer to write the result to. If None then the result is returned as bytes.
+        :return: The result.
+        """
+        a = encode(x)
+        pad = self._pad(k, 0, len(a))
+
+        if out is None:
+            return np.bitwise_xor(a, pad).tobytes()
+
+        np.bitwise_xor(a, pad, out=output_array(out, len(a)))
+
+        return out
+
+    def _stream_xor(self, k: Optional[OneTimePadCipherKey] = None) -> Callable[[bytes], bytes]:
+        """Get a function that XORs consecutive chunks of a stream with consecutive parts of the pad.
+
+        :param k: The key. If None then the cipher's key is used.
+        :return: A function that takes a chunk and returns the result.
+        """
+        offset = 0
+
+        def xor(chunk: bytes) -> bytes:
+            nonlocal offset
+
+            a = encode(chunk)
+            pad = self._pad(k, offset, len(a))
+            offset += len(a)
+
+            return np.bitwise_xor(a, pad).tobytes()
+
+        return xor
+
+    def _pad(self, k: Optional[OneTimePadCipherKey], start: int, size: int) -> np.ndarray:
+        """Get part of a pad.
+
+        :param k: The key. If None then the cipher's key is used.
+        :param start: The index of the first byte of the pad to use.
+        :param size: The number of bytes of the pad to use.
+        :return: A uint8 array that views the bytes of the key without copying them.
+        """
+        assert k is not None or self.key is not None, 'No key was given and the cipher has not generated one yet.'
 
-        m = Message('')
-        i = 0
+        pad = (k if k is not None else self.key).value
 
-        for char in c:
-            if char.isspace():
-                m += char
-            else:
-                m += '%c' % (ord('A') + (ord(char) - ord(k[i % len(k)])) % 26)
-                i += 1
+        assert start + size <= len(pad), 'The key is shorter than the message (%d < %d). A one time pad must be at ' \
+                                         'least as long as the message.' % (len(pad), start + size)
 
-        return m
+        return encode(pad)[start:start + size]
@@ -1,13 +1,17 @@
-import itertools
-from random import SystemRandom
+import math
+from random import SystemRandom, Random
 from string import ascii_uppercase
-from typing import Optional, Union, Generator
+from typing import Optional, Union, Sequence
 
-from crypto.abcs import CipherABC, KeyABC
-from crypto.types import CipherText, Message
+import numpy as np
 
+from crypto.abcs import CipherABC, TranslationKeyABC
+from crypto.ciphers.utils import encode, lookup_tables, substitute_many, translate
+from crypto.key_space import KeySpace
+from crypto.types import CipherText, Message, Buffer
 
-class SubstitutionCipherKey(KeyABC):
+
+class SubstitutionCipherKey(TranslationKeyABC):
     """A key used in the Substitution cipher.
     This is defined as a set of one-to-one mappings between a set uppercase letters from the alphabet and another set
     of uppercase letters. For example, {A: B, B: C, C: D, ..., Z: A} would be an example of a key where each letter maps
@@ -35,6 +39,10 @@ class SubstitutionCipherKey(KeyABC):
         """
         return self._inverse_mappings
 
+    @property
+    def alphabet(self) -> str:
+        return ''.join(self.value[char] for char in ascii_uppercase)
+
     @staticmethod
     def key_space_contains(k: dict) -> bool:
         if not k or not type(k) is dict:
@@ -53,9 +61,9 @@ class SubstitutionCipherKey(KeyABC):
         return SubstitutionCipherKey({char: char for char in ascii_uppercase})
 
     @staticmethod
-    def generate_random() -> 'SubstitutionCipherKey':
+    def generate_random(rng: Optional[Random] = None) -> 'SubstitutionCipherKey':
         shuffled_letters = list(ascii_uppercase)
-        SystemRandom().shuffle(shuffled_letters)
+        (SystemRandom() if rng is None else rng).shuffle(shuffled_letters)
 
         letter_mappings = SubstitutionCipherKey.get_identity().value
 
@@ -65,13 +73,44 @@ class SubstitutionCipherKey(KeyABC):
         return SubstitutionCipherKey(letter_mappings)
 
     @staticmethod
-    def get_space() -> Generator['SubstitutionCipherKey', None, None]:
-        for value_permutations in itertools.permutations(ascii_uppercase):
-            yield SubstitutionCipherKey({k: v for k, v in zip(ascii_uppercase, value_permutations)})
+    def get_space() -> KeySpace:
+        """Get the key space, or the set of all valid keys.
+        Keys are ordered lexicographically by the letters that 'A' through 'Z' are mapped to, starting with the
+        identity key.
+
+        :return: The key space.
+        """
+        return KeySpace(SubstitutionCipherKey.key_at, SubstitutionCipherKey.index_of,
+                        SubstitutionCipherKey.get_space_size())
+
+    @staticmethod
+    def key_at(index: int) -> 'SubstitutionCipherKey':
+        # Convert the index to the factorial number system (i.e. a Lehmer code), where each digit picks one of the
+        # letters that have not been used yet.
+        letters = list(ascii_uppercase)
+        mapped_letters = []
+
+        for i in range(len(ascii_uppercase) - 1, -1, -1):
+            digit, index = divmod(index, math.factorial(i))
+            mapped_letters.append(letters.pop(digit))
+
+        return SubstitutionCipherKey(dict(zip(ascii_uppercase, mapped_letters)))
+
+    @staticmethod
+    def index_of(k: 'SubstitutionCipherKey') -> int:
+        mapped_letters = [k.value[char] for char in ascii_uppercase]
+        index = 0
+
+        for i, letter in enumerate(mapped_letters):
+            # The Lehmer code digit is the number of unused letters that come before this one.
+            digit = sum(1 for other in mapped_letters[i + 1:] if other < letter)
+            index += digit * math.factorial(len(mapped_letters) - 1 - i)
+
+        return index
 
     @staticmethod
     def get_space_size() -> int:
-        return int(4.0329146e+26)  # approximately 26!
+        return math.factorial(len(ascii_uppercase))
 
 
 # noinspection PyMissingConstructor
@@ -92,52 +131,33 @@ class SubstitutionCipher(CipherABC):
     def key(self) -> SubstitutionCipherKey:
         return self._key
 
-    @staticmethod
-    def is_valid(x: Union[Message, CipherText]) -> bool:
-        """Check if a given message or ciphertext are in a valid format.
-
-        :param x: The message or ciphertext to check.
-        :return: True if the message or ciphertext is valid, False otherwise.
-        """
-        return all((char.isalpha() and char.isupper()) or char.isspace()
-                   for char in x)
-
-    def encrypt(self, m: Message, k: Optional[SubstitutionCipherKey] = None) -> CipherText:
-        assert self.is_valid(m), 'Invalid message.' \
-                                 '\nMessage must be all uppercase letters ' \
-                                 'or spaces.'
+    def encrypt(self, m: Union[Message, Buffer], k: Optional[SubstitutionCipherKey] = None,
+                out: Optional[Buffer] = None, validate: bool = True) -> Union[CipherText, Buffer]:
+        assert not validate or self.is_valid(m), 'Invalid message.' \
+                                               '\nMessage must be all uppercase letters ' \
+                                               'or spaces.'
 
-        if k:
-            k = k.value
-        else:
-            k = self.key.value
+        k = k if k else self.key
 
-        c = CipherText('')
+        return CipherText(translate(m, k.encryption_table, out))
 
-        for char in m:
-            if char.isspace():
-                c += char
-            else:
-                c += k[char]
+    def decrypt(self, c: Union[CipherText, Buffer], k: Optional[SubstitutionCipherKey] = None,
+                out: Optional[Buffer] = None, validate: bool = True) -> Union[Message, Buffer]:
+        assert not validate or self.is_valid(c), 'Invalid ciphertext.' \
+                                               '\nMessage must be all uppercase letters ' \
+                                               'or spaces.'
 
-        return c
+        k = k if k else self.key
 
-    def decrypt(self, c: CipherText, k: Optional[SubstitutionCipherKey] = None) -> Message:
-        assert self.is_valid(c), 'Invalid ciphertext.' \
-                                 '\nMessage must be all uppercase letters ' \
-                                 'or spaces.'
-
-        if k:
-            k = k.inverse_mappings
-        else:
-            k = self.key.inverse_mappings
+        return Message(translate(c, k.decryption_table, out))
 
-        m = Message('')
+    def decrypt_many(self, c: Union[CipherText, Buffer], keys: Sequence[SubstitutionCipherKey],
+                     validate: bool = True) -> np.ndarray:
+        assert not validate or self.is_valid(c), 'Invalid ciphertext.' \
+                                               '\nMessage must be all uppercase letters ' \
+                                               'or spaces.'
 
-        for char in c:
-            if char.isspace():
-                m += char
-            else:
-                m += k[char]
+        alphabets = np.array([[ord(k.inverse_mappings[char]) for char in ascii_uppercase] for k in keys],
+                             dtype=np.uint8).reshape(-1, 26)
 
-        return m
+        return substitute_many(encode(c), lookup_tables(alphabets))
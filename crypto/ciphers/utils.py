@@ -1,13 +1,223 @@
-from typing import Union
+from string import ascii_uppercase
+from typing import Union, Sequence, Optional, Callable
 
-from crypto.types import Message, CipherText
+import numpy as np
 
+from crypto.translation import TranslationTable
+from crypto.types import Message, CipherText, Buffer
+from crypto.validation import is_valid
 
-def is_valid(x: Union[Message, CipherText]) -> bool:
-    """Check if a given message or ciphertext are in a valid format.
+# ASCII codes of the letters A-Z.
+LETTERS = np.frombuffer(ascii_uppercase.encode('ascii'), dtype=np.uint8)
 
-    :param x: The message or ciphertext to check.
-    :return: True if the message or ciphertext is valid, False otherwise.
+
+def encode(x: Union[Message, CipherText, Buffer]) -> np.ndarray:
+    """Encode a message or ciphertext as an array of ASCII codes.
+
+    :param x: The message or ciphertext to encode. Buffers (e.g. bytes or a memory-mapped file) already hold ASCII
+              codes, so they are viewed rather than copied.
+    :return: A uint8 array with one element per character in `x`. This is read-only unless `x` is a writable buffer.
+    """
+    if isinstance(x, str):
+        return np.frombuffer(x.encode('ascii'), dtype=np.uint8)
+
+    return np.frombuffer(x, dtype=np.uint8)
+
+
+def decode(a: np.ndarray) -> str:
+    """Decode an array of ASCII codes back into a string.
+
+    :param a: The uint8 array to decode.
+    :return: The string that `a` encodes.
+    """
+    return a.tobytes().decode('ascii')
+
+
+def transform(x: Union[Message, CipherText, Buffer], f: Callable[[np.ndarray, Optional[np.ndarray]], np.ndarray],
+              out: Optional[Buffer] = None) -> Union[str, bytes, Buffer]:
+    """Apply a function to an encoded message or ciphertext and give back the result in the same form as the input.
+
+    :param x: The message or ciphertext.
+    :param f: A function that takes the encoded `x` and an array to write the result to (or None if it should allocate
+              one) and returns the encoded result.
+    :param out: A writable buffer (e.g. a bytearray or a memory-mapped file opened for writing) to write the result to.
+                This must be at least as long as `x`.
+    :return: `out` if it was given, otherwise a string if `x` is a string or bytes if `x` is a buffer.
+    """
+    a = encode(x)
+
+    if out is not None:
+        f(a, output_array(out, len(a)))
+
+        return out
+
+    result = f(a, None)
+
+    return decode(result) if isinstance(x, str) else result.tobytes()
+
+
+def output_array(out: Buffer, size: int) -> np.ndarray:
+    """View the start of a caller-provided buffer as a writable array.
+
+    :param out: A writable buffer, e.g. a bytearray or a memory-mapped file opened for writing.
+    :param size: The number of bytes that are going to be written.
+    :return: A uint8 array of `size` elements that shares its memory with `out`.
+    """
+    out_array = np.frombuffer(out, dtype=np.uint8)
+
+    assert out_array.flags.writeable, 'The output buffer must be writable.'
+    assert len(out_array) >= size, 'The output buffer is too small (%d < %d).' % (len(out_array), size)
+
+    return out_array[:size]
+
+
+def translate(x: Union[Message, CipherText, Buffer], table: TranslationTable,
+              out: Optional[Buffer] = None) -> Union[str, bytes, Buffer]:
+    """Map every letter in a message or ciphertext onto another letter.
+
+    Strings and bytes are translated with a single call to `str.translate(...)` or `bytes.translate(...)`, which avoids
+    the cost of converting them to and from arrays. Other buffers, and results that should be written to `out`, go
+    through `transform(...)`.
+
+    :param x: The message or ciphertext.
+    :param table: The translation table.
+    :param out: A writable buffer to write the result to, see `transform(...)`.
+    :return: The result in the same form as `x`, see `transform(...)`.
+    """
+    if out is None:
+        if isinstance(x, str):
+            return x.translate(table.str_table)
+
+        if isinstance(x, (bytes, bytearray)):
+            return bytes(x.translate(table.bytes_table))
+
+    return transform(x, lambda a, a_out: substitute(a, table.array, a_out), out)
+
+
+def letter_mask(a: np.ndarray) -> np.ndarray:
+    """Find the letters in an encoded message or ciphertext.
+
+    :param a: The encoded message or ciphertext.
+    :return: A boolean array that is True where `a` holds an uppercase letter.
+    """
+    return (a >= LETTERS[0]) & (a <= LETTERS[-1])
+
+
+def lookup_table(alphabet: str) -> np.ndarray:
+    """Create a lookup table that maps the letters A-Z onto another alphabet.
+
+    Every other byte (e.g. whitespace) is mapped onto itself.
+
+    :param alphabet: The 26 letters that 'A' through 'Z' should be mapped to, in order.
+    :return: A uint8 array of 256 elements that can be indexed with an encoded message.
+    """
+    table = np.arange(256, dtype=np.uint8)
+    table[LETTERS] = encode(alphabet)
+
+    return table
+
+
+def lookup_tables(alphabets: np.ndarray) -> np.ndarray:
+    """Create a lookup table for each of a batch of alphabets.
+
+    :param alphabets: A (n, 26) uint8 array where each row holds the ASCII codes of the letters that 'A' through 'Z'
+                      should be mapped to.
+    :return: A (n, 256) uint8 array where each row is a lookup table, see `lookup_table(...)`.
+    """
+    tables = np.tile(np.arange(256, dtype=np.uint8), (len(alphabets), 1))
+    tables[:, LETTERS] = alphabets
+
+    return tables
+
+
+def shifted_alphabets(shifts: np.ndarray) -> np.ndarray:
+    """Get the alphabet rotated by each of a batch of shifts.
+
+    :param shifts: A vector of the number of letters to rotate the alphabet by.
+    :return: A (len(shifts), 26) uint8 array where each row holds the ASCII codes of a rotated alphabet.
+    """
+    return LETTERS[(np.arange(26) + np.reshape(shifts, (-1, 1))) % 26]
+
+
+def shifted_alphabet(shift: int) -> str:
+    """Get the alphabet rotated by a given number of letters.
+
+    :param shift: How many letters to rotate the alphabet by. Negative shifts rotate the alphabet the other way.
+    :return: The rotated alphabet, e.g. a shift of 1 gives 'BCD...ZA'.
+    """
+    shift %= 26
+
+    return ascii_uppercase[shift:] + ascii_uppercase[:shift]
+
+
+def substitute(a: np.ndarray, table: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Substitute every character in an encoded message or ciphertext using a lookup table.
+
+    :param a: The encoded message or ciphertext.
+    :param table: The lookup table, see `lookup_table(...)`.
+    :param out: The uint8 array to write the result to. If None then a new array is allocated.
+    :return: The encoded result of the substitution.
+    """
+    # Every uint8 is a valid index into the table, so clipping never happens, but it lets numpy write straight to `out`.
+    return np.take(table, a, out=out, mode='clip')
+
+
+def substitute_many(a: np.ndarray, tables: np.ndarray) -> np.ndarray:
+    """Substitute every character in an encoded message or ciphertext using each of a batch of lookup tables.
+
+    :param a: The encoded message or ciphertext.
+    :param tables: A (n, 256) array of lookup tables, see `lookup_tables(...)`.
+    :return: A (n, len(a)) uint8 array where each row is the result of the substitution with the corresponding table.
+    """
+    return tables[np.arange(len(tables)).reshape(-1, 1), a]
+
+
+def shift_letters(a: np.ndarray, shifts: np.ndarray, offset: int = 0, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Shift each letter by the amount given by a repeating key stream.
+
+    Whitespace is passed through untouched and does not advance the position in the key stream.
+
+    :param a: The encoded message or ciphertext.
+    :param shifts: The shift (in the range [0, 25]) for each position in the key. This is repeated as many times as
+                   needed to cover all of the letters in `a`.
+    :param offset: The position in the key stream of the first letter in `a`, e.g. the number of letters that came
+                   before `a` when shifting a long message in chunks.
+    :param out: The uint8 array to write the result to. If None then a new array is allocated.
+    :return: The encoded result of the shift.
     """
-    return all((char.isalpha() and char.isupper()) or char.isspace()
-               for char in x)
+    mask = letter_mask(a)
+    letters = a[mask]
+    key_stream = shifts[(np.arange(len(letters)) + offset) % len(shifts)]
+
+    if out is None:
+        out = a.copy()
+    else:
+        out[:] = a
+
+    out[mask] = LETTERS[(letters - LETTERS[0] + key_stream) % 26]
+
+    return out
+
+
+def shift_letters_many(a: np.ndarray, shifts: Sequence[np.ndarray]) -> np.ndarray:
+    """Shift each letter by the amount given by each of a batch of repeating key streams.
+
+    :param a: The encoded message or ciphertext.
+    :param shifts: The shifts for each key, see `shift_letters(...)`. Keys may be of different lengths.
+    :return: A (len(shifts), len(a)) uint8 array where each row is the result of shifting with the corresponding key.
+    """
+    lengths = np.array([len(s) for s in shifts], dtype=int)
+    keys = np.zeros((len(shifts), lengths.max(initial=1)), dtype=np.uint8)
+
+    for i, s in enumerate(shifts):
+        keys[i, :len(s)] = s
+
+    out = np.tile(a, (len(shifts), 1))
+    mask = letter_mask(a)
+    letters = a[mask]
+    positions = np.arange(len(letters)) % lengths.reshape(-1, 1)
+    key_streams = keys[np.arange(len(shifts)).reshape(-1, 1), positions]
+
+    out[:, mask] = LETTERS[(letters - LETTERS[0] + key_streams) % 26]
+
+    return out
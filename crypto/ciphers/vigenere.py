@@ -1,10 +1,13 @@
-import itertools
-from random import SystemRandom
+from random import SystemRandom, Random
 from string import ascii_uppercase
-from typing import Optional, Union, Generator
+from typing import Optional, Union, Sequence, IO, Callable
+
+import numpy as np
 
 from crypto.abcs import CipherABC, KeyABC
-from crypto.types import CipherText, Message
+from crypto.ciphers.utils import encode, letter_mask, shift_letters, shift_letters_many, transform, LETTERS
+from crypto.key_space import KeySpace
+from crypto.types import CipherText, Message, Buffer
 
 
 class VigenereCipherKey(KeyABC):
@@ -21,27 +24,55 @@ class VigenereCipherKey(KeyABC):
         return VigenereCipherKey('A')
 
     @staticmethod
-    def generate_random(max_length=20) -> 'VigenereCipherKey':
+    def generate_random(max_length=20, *, rng: Optional[Random] = None) -> 'VigenereCipherKey':
         """Generate a random key.
         For the Vigenere cipher only keys up to a given length are generated.
 
         :param max_length: The longest key to generate.
+        :param rng: The random number generator to use. If None then the operating system's source of randomness is
+                    used.
         :return: A randomly generated key.
         """
-        r = SystemRandom()
-        return r.choices(list(ascii_uppercase), k=r.randint(1, max_length))
+        r = SystemRandom() if rng is None else rng
+        return VigenereCipherKey(''.join(r.choices(ascii_uppercase, k=r.randint(1, max_length))))
 
     @staticmethod
-    def get_space(max_length=20) -> Generator['VigenereCipherKey', None, None]:
+    def get_space(max_length=20) -> KeySpace:
         """Get the key space, or the set of all valid keys.
-        For the Vigenere cipher this is defined up to a maximum key length.
+        For the Vigenere cipher this is defined up to a maximum key length. Keys are ordered by length and then
+        alphabetically, i.e. 'A', 'B', ..., 'Z', 'AA', 'AB', ...
 
         :param max_length: The longest key to consider.
-        :return: A generator that yields a sequence of valid keys.
+        :return: The key space.
         """
-        for r in range(max_length):
-            for permutation in itertools.permutations(ascii_uppercase, r):
-                yield VigenereCipherKey(''.join(permutation))
+        return KeySpace(VigenereCipherKey.key_at, VigenereCipherKey.index_of,
+                        VigenereCipherKey.get_space_size(max_length))
+
+    @staticmethod
+    def key_at(index: int) -> 'VigenereCipherKey':
+        # Skip over the blocks of shorter keys, then read the key off as a base-26 number.
+        length = 1
+
+        while index >= 26 ** length:
+            index -= 26 ** length
+            length += 1
+
+        letters = []
+
+        for _ in range(length):
+            index, digit = divmod(index, 26)
+            letters.append(ascii_uppercase[digit])
+
+        return VigenereCipherKey(''.join(reversed(letters)))
+
+    @staticmethod
+    def index_of(k: 'VigenereCipherKey') -> int:
+        index = 0
+
+        for char in k.value:
+            index = index * 26 + ord(char) - ord('A')
+
+        return index + VigenereCipherKey.get_space_size(len(k.value) - 1)
 
     @staticmethod
     def get_space_size(max_length=20) -> int:
@@ -51,7 +82,8 @@ class VigenereCipherKey(KeyABC):
         :param max_length: The longest key to consider.
         :return: The size of the key space.
         """
-        return 26 ** max_length  # 26 is the number of letters in the alphabet
+        # 26 is the number of letters in the alphabet
+        return sum(26 ** length for length in range(1, max_length + 1))
 
 
 # noinspection PyMissingConstructor
@@ -74,56 +106,80 @@ class VigenereCipher(CipherABC):
     def key(self) -> VigenereCipherKey:
         return self._key
 
-    @staticmethod
-    def is_valid(x: Union[Message, CipherText]) -> bool:
-        """Check if a given message or ciphertext are in a valid format.
-
-        :param x: The message or ciphertext to check.
-        :return: True if the message or ciphertext is valid, False otherwise.
-        """
-        return all((char.isalpha() and char.isupper()) or char.isspace()
-                   for char in x)
-
-    def encrypt(self, m: Message, k: Optional[VigenereCipherKey] = None) -> CipherText:
-        assert self.is_valid(m), 'Invalid message.' \
-                                 '\nMessage must be all uppercase letters ' \
-                                 'or spaces.'
+    def encrypt(self, m: Union[Message, Buffer], k: Optional[VigenereCipherKey] = None,
+                out: Optional[Buffer] = None, validate: bool = True) -> Union[CipherText, Buffer]:
+        assert not validate or self.is_valid(m), 'Invalid message.' \
+                                               '\nMessage must be all uppercase letters ' \
+                                               'or spaces.'
 
         if k:
             k = k.value
         else:
             k = self.key.value
 
-        c = CipherText('')
-        i = 0
+        shifts = encode(k) - LETTERS[0]
 
-        for char in m:
-            if char.isspace():
-                c += char
-            else:
-                c += chr(ord('A') + (ord(char) + ord(k[i % len(k)])) % 26)
-                i += 1
+        return CipherText(transform(m, lambda a, a_out: shift_letters(a, shifts, out=a_out), out))
 
-        return c
-
-    def decrypt(self, c: CipherText, k: Optional[VigenereCipherKey] = None) -> Message:
-        assert self.is_valid(c), 'Invalid ciphertext.' \
-                                 '\nMessage must be all uppercase letters ' \
-                                 'or spaces.'
+    def decrypt(self, c: Union[CipherText, Buffer], k: Optional[VigenereCipherKey] = None,
+                out: Optional[Buffer] = None, validate: bool = True) -> Union[Message, Buffer]:
+        assert not validate or self.is_valid(c), 'Invalid ciphertext.' \
+                                               '\nMessage must be all uppercase letters ' \
+                                               'or spaces.'
 
         if k:
             k = k.value
         else:
             k = self.key.value
 
-        m = Message('')
-        i = 0
+        shifts = (26 - (encode(k) - LETTERS[0])) % 26
+
+        return Message(transform(c, lambda a, a_out: shift_letters(a, shifts, out=a_out), out))
+
+    def encrypt_stream(self, src: IO, dst: IO, k: Optional[VigenereCipherKey] = None,
+                       chunk_size: int = 2 ** 16) -> int:
+        k = k.value if k else self.key.value
+
+        return self.transform_stream(src, dst, self._stream_shifter(encode(k) - LETTERS[0]), chunk_size)
+
+    def decrypt_stream(self, src: IO, dst: IO, k: Optional[VigenereCipherKey] = None,
+                       chunk_size: int = 2 ** 16) -> int:
+        k = k.value if k else self.key.value
+
+        return self.transform_stream(src, dst, self._stream_shifter((26 - (encode(k) - LETTERS[0])) % 26), chunk_size)
+
+    def _stream_shifter(self, shifts: np.ndarray) -> Callable[[Union[str, bytes]], Union[str, bytes]]:
+        """Get a function that shifts consecutive chunks of a message as if they were one message.
+
+        Whitespace does not advance the position in the key, so the position is carried from one chunk to the next by
+        counting the letters in each chunk.
+
+        :param shifts: The shift for each position in the key.
+        :return: A function that takes a chunk and returns the shifted chunk, as a string if the chunk is a string or
+                 as bytes if it is bytes.
+        """
+        offset = 0
+
+        def shift(chunk: Union[str, bytes]) -> Union[str, bytes]:
+            nonlocal offset
+
+            assert self.is_valid(chunk), 'Invalid message.' \
+                                         '\nMessage must be all uppercase letters ' \
+                                         'or spaces.'
+
+            out = transform(chunk, lambda a, a_out: shift_letters(a, shifts, offset, out=a_out))
+            offset = (offset + int(np.count_nonzero(letter_mask(encode(chunk))))) % len(shifts)
+
+            return out
+
+        return shift
+
+    def decrypt_many(self, c: Union[CipherText, Buffer], keys: Sequence[VigenereCipherKey],
+                     validate: bool = True) -> np.ndarray:
+        assert not validate or self.is_valid(c), 'Invalid ciphertext.' \
+                                               '\nMessage must be all uppercase letters ' \
+                                               'or spaces.'
 
-        for char in c:
-            if char.isspace():
-                m += char
-            else:
-                m += chr(ord('A') + (ord(char) - ord(k[i % len(k)])) % 26)
-                i += 1
+        shifts = [(26 - (encode(k.value) - LETTERS[0])) % 26 for k in keys]
 
-        return m
+        return shift_letters_many(encode(c), shifts)
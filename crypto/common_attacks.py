@@ -1,14 +1,24 @@
-from collections import Counter
+import math
+import random
 from string import ascii_uppercase
-from typing import Type, Tuple, Optional
+from typing import Callable, List, Type, Tuple, Optional, Sequence
 
-import enchant
 import numpy as np
 
 from crypto.abcs import BruteForceAttackABC
-from crypto.interfaces import CipherI, KeyI, SamplingStrategyI
-from crypto.metrics import cosine_similarity, ratio_tokens_in_dict
+from crypto.ciphers.caesar import CaesarCipher
+from crypto.ciphers.substitution import SubstitutionCipherKey
+from crypto.ciphers.utils import decode, encode, letter_mask, LETTERS
+from crypto.ciphers.vigenere import VigenereCipherKey
+from crypto.dictionaries import DictionaryProvider
+from crypto.instrumentation import AttackStats
+from crypto.interfaces import SamplingStrategyI, CipherI, KeyI, CiphertextOnlyAttackI, ScorerI
+from crypto.language import get_language_model, ngram_counts
+from crypto.metrics import letter_distribution, letter_distributions, ratio_tokens_in_dict, rotations, \
+    ngram_fitness_many, get_ngram_table
+from crypto.scorers import CosineScorer, ChiSquaredScorer
 from crypto.types import CipherText, Message
+from crypto.validation import is_valid
 
 
 class LetterFrequencyAttack(BruteForceAttackABC):
@@ -17,40 +27,36 @@ class LetterFrequencyAttack(BruteForceAttackABC):
     the English language.
     """
 
-    def __init__(self, sampling_strategy: SamplingStrategyI):
-        super().__init__(sampling_strategy)
+    def __init__(self, sampling_strategy: SamplingStrategyI, letter_frequencies: Optional[np.ndarray] = None,
+                 scorer: Optional[ScorerI] = None, **kwargs):
+        """Create a new letter frequency attack.
 
-        # Vector of letter frequencies from a-z.
-        self.letter_frequencies = np.array([0.08167, 0.01492, 0.02782, 0.04253, 0.12702, 0.02228, 0.02015,
-                                            0.06094, 0.06966, 0.00153, 0.00772, 0.04025, 0.02406, 0.06749,
-                                            0.07507, 0.01929, 0.00095, 0.05987, 0.06327, 0.09056, 0.02758,
-                                            0.00978, 0.02360, 0.00150, 0.01974, 0.00074])
+        :param sampling_strategy: The strategy to use for sampling key spaces.
+        :param letter_frequencies: The frequencies of the letters a-z. If None then the letter frequencies of the
+                                   English language model are used, see `crypto.language`.
+        :param scorer: How to compare the letter frequencies of each candidate message to `letter_frequencies`, see
+                       `crypto.scorers`. If None then the cosine similarity is used.
+        :param kwargs: Any other options for `BruteForceAttackABC`, e.g. `chunk_size` or `n_workers`.
+        """
+        super().__init__(sampling_strategy, **kwargs)
 
-    def from_cipher(self, c: CipherText, cipher_type: Type[CipherI],
-                    key_type: Type[KeyI]) -> Tuple[Message, Optional[KeyI]]:
-        cipher = cipher_type()
-        best_score = -1
-        the_message = None
-        the_key = None
+        self.letter_frequencies = get_language_model().letter_frequencies if letter_frequencies is None \
+            else letter_frequencies
+        self.scorer = CosineScorer(self.letter_frequencies) if scorer is None else scorer
 
-        # Calculate the empirical letter frequencies for the cipher text
-        # decrypted with each key in the key space.
-        for k in self.sampling_strategy.sample(key_type):
-            m = cipher.decrypt(c, k)
-            letter_dist = Counter(m)
-            letter_dist_vec = np.array([letter_dist[key] for key in ascii_uppercase])
+    def get_key_scorer(self, c: CipherText, cipher: CipherI,
+                       stats: Optional[AttackStats] = None) -> Callable[[List[KeyI]], np.ndarray]:
+        if isinstance(cipher, CaesarCipher):
+            # Score all 26 keys at once from the ciphertext's letter distribution so that nothing is decrypted.
+            scores = self.scorer.score(rotations(letter_distribution(c)))
 
-            score = cosine_similarity(self.letter_frequencies, letter_dist_vec)
+            return lambda keys: scores[[k.value for k in keys]]
 
-            if score > best_score:
-                best_score = score
-                the_message = m
-                the_key = k
-
-            if best_score > 0.99:
-                break
+        return super().get_key_scorer(c, cipher, stats)
 
-        return the_message, the_key
+    def score_many(self, candidates: np.ndarray) -> np.ndarray:
+        # Compare the empirical letter frequencies of each candidate message to those of the English language.
+        return self.scorer.score(letter_distributions(candidates))
 
 
 class DictionaryAttack(BruteForceAttackABC):
@@ -58,72 +64,362 @@ class DictionaryAttack(BruteForceAttackABC):
     a given ciphertext using brute force and a dictionary of the English language.
     """
 
-    def __init__(self, sampling_strategy: SamplingStrategyI):
-        super().__init__(sampling_strategy)
+    def __init__(self, sampling_strategy: SamplingStrategyI, language: str = 'en',
+                 provider: Optional[DictionaryProvider] = None, **kwargs):
+        """Create a new attack.
 
-        self.dict = enchant.Dict('en')
+        :param sampling_strategy: The strategy to use for sampling key spaces.
+        :param language: The language of the dictionary to check tokens against.
+        :param provider: The provider of the dictionary. If None then the provider shared by the whole process is used.
+        :param kwargs: Any other options for `BruteForceAttackABC`, e.g. `chunk_size`, `n_workers` or `prefix_length`.
+        """
+        super().__init__(sampling_strategy, **kwargs)
 
-    def from_cipher(self, c: CipherText, cipher_type: Type[CipherI],
-                    key_type: Type[KeyI]) -> Tuple[Message, Optional[KeyI]]:
-        cipher = cipher_type()
+        self.language = language
+        self.provider = provider
 
-        best_score = -1
-        the_message = None
-        the_key = None
+    def score_many(self, candidates: np.ndarray) -> np.ndarray:
+        return np.array([ratio_tokens_in_dict(decode(m), self.language, self.provider) for m in candidates])
 
-        for k in self.sampling_strategy.sample(key_type):
-            m = cipher.decrypt(c, k)
 
-            score = ratio_tokens_in_dict(m)
+class LanguageAnalysisAttack(BruteForceAttackABC):
+    """A simple attack that combines the approaches of `LetterFrequencyAttack` and `DictionaryAttack`."""
 
-            if score > best_score:
-                best_score = score
-                the_message = m
-                the_key = k
+    def __init__(self, sampling_strategy: SamplingStrategyI, language: str = 'en',
+                 provider: Optional[DictionaryProvider] = None, letter_frequencies: Optional[np.ndarray] = None,
+                 scorer: Optional[ScorerI] = None, **kwargs):
+        """Create a new attack.
+
+        :param sampling_strategy: The strategy to use for sampling key spaces.
+        :param language: The language of the dictionary to check tokens against and of the language model.
+        :param provider: The provider of the dictionary. If None then the provider shared by the whole process is used.
+        :param letter_frequencies: The frequencies of the letters a-z. If None then the letter frequencies of the
+                                   language model of `language` are used, see `crypto.language`.
+        :param scorer: How to compare the letter frequencies of each candidate message to `letter_frequencies`, see
+                       `crypto.scorers`. If None then the cosine similarity is used. The score is averaged with the
+                       ratio of tokens in the dictionary, so it should be in the range [0.0, 1.0].
+        :param kwargs: Any other options for `BruteForceAttackABC`, e.g. `chunk_size`, `n_workers` or `prefix_length`.
+        """
+        super().__init__(sampling_strategy, **kwargs)
+
+        self.language = language
+        self.provider = provider
+        self.letter_frequencies = get_language_model(language).letter_frequencies if letter_frequencies is None \
+            else letter_frequencies
+        self.scorer = CosineScorer(self.letter_frequencies) if scorer is None else scorer
+
+    def score_many(self, candidates: np.ndarray) -> np.ndarray:
+        scores = self.scorer.score(letter_distributions(candidates))
+        scores += [ratio_tokens_in_dict(decode(m), self.language, self.provider) for m in candidates]
+        scores *= 0.5
+
+        return scores
+
+
+class NGramAttack(BruteForceAttackABC):
+    """A brute-force attack that guesses the key used by a cipher to encrypt a given ciphertext by how much the letter
+    n-grams (quadgrams by default) of each candidate message look like those of the English language.
+    """
 
-            if best_score > 0.99:
-                break
+    def __init__(self, sampling_strategy: SamplingStrategyI, n: int = 4, table: Optional[np.ndarray] = None,
+                 **kwargs):
+        """Create a new n-gram attack.
 
-        return the_message, the_key
+        :param sampling_strategy: The strategy to use for sampling key spaces.
+        :param n: The number of letters in each n-gram.
+        :param table: The n-gram log probability table to use. If None then the English table for `n` is loaded
+                      (memory-mapped) the first time it is needed.
+        :param kwargs: Any other options for `BruteForceAttackABC`, e.g. `chunk_size` or `n_workers`.
+        """
+        super().__init__(sampling_strategy, **kwargs)
 
+        self.n = n
+        self.table = table
 
-class LanguageAnalysisAttack(BruteForceAttackABC):
-    """A simple attack that combines the approaches of `LetterFrequencyAttack` and `DictionaryAttack`."""
+    def score_many(self, candidates: np.ndarray) -> np.ndarray:
+        return ngram_fitness_many(candidates, get_ngram_table(self.n) if self.table is None else self.table)
 
-    def __init__(self, sampling_strategy: SamplingStrategyI):
-        super().__init__(sampling_strategy)
 
-        self.dict = enchant.Dict('en')
+class HillClimbingAttack(CiphertextOnlyAttackI):
+    """An attack on the substitution cipher that improves a key one swap at a time.
 
-        # Vector of letter frequencies from a-z.
-        self.letter_frequencies = np.array([0.08167, 0.01492, 0.02782, 0.04253, 0.12702, 0.02228, 0.02015,
-                                            0.06094, 0.06966, 0.00153, 0.00772, 0.04025, 0.02406, 0.06749,
-                                            0.07507, 0.01929, 0.00095, 0.05987, 0.06327, 0.09056, 0.02758,
-                                            0.00978, 0.02360, 0.00150, 0.01974, 0.00074])
+    The search starts `n_restarts` times from a random key and the best key found is kept. At each step two letters of
+    the key are swapped and the swap is kept if it makes the decrypted message look more like English according to a
+    table of bigram log probabilities. With a non-zero temperature, swaps that make things worse are sometimes kept too
+    (simulated annealing).
+
+    The score of a key is the sum of `counts[a, b] * log_probs[key[a], key[b]]` over the bigram counts of the
+    ciphertext, so swapping two letters only changes two rows and two columns of the sum and keys can be scored
+    without decrypting the ciphertext.
+    """
+
+    def __init__(self, n_restarts: int = 3, n_iterations: int = 5000, temperature: float = 0.0,
+                 cooling_rate: float = 0.999, bigram_log_probs: Optional[np.ndarray] = None,
+                 seed: Optional[int] = None):
+        """Create a new hill climbing attack.
+
+        :param n_restarts: The number of random keys to start a search from.
+        :param n_iterations: The number of swaps to try for each starting key.
+        :param temperature: The initial temperature for simulated annealing. If zero, only swaps that improve the
+                            score are kept.
+        :param cooling_rate: The factor the temperature is multiplied by after each swap.
+        :param bigram_log_probs: A (26, 26) array of bigram log probabilities. If None then these are taken from the
+                                 English language model, see `crypto.language`.
+        :param seed: The seed for the random number generator that chooses the starting keys and which letters to swap.
+        """
+        assert n_restarts > 0, 'The number of restarts must be positive.'
+
+        self.n_restarts = n_restarts
+        self.n_iterations = n_iterations
+        self.temperature = temperature
+        self.cooling_rate = cooling_rate
+        self.random = random.Random(seed)
+
+        if bigram_log_probs is None:
+            # Scores are sums of many of these, so use double precision to keep the differences between keys exact.
+            bigram_log_probs = get_language_model().ngram_table(2).astype(np.float64)
+
+        self.bigram_log_probs = bigram_log_probs
 
     def from_cipher(self, c: CipherText, cipher_type: Type[CipherI],
                     key_type: Type[KeyI]) -> Tuple[Message, Optional[KeyI]]:
-        cipher = cipher_type()
+        assert issubclass(key_type, SubstitutionCipherKey), \
+            '%s only works with substitution cipher keys.' % self.__class__.__name__
+        assert is_valid(c), 'Invalid ciphertext.'
 
-        best_score = -1
-        the_message = None
+        counts = ngram_counts(encode(c), 2)
+        best_score = -math.inf
         the_key = None
 
-        for k in self.sampling_strategy.sample(key_type):
-            m = cipher.decrypt(c, k)
-
-            letter_dist = Counter(m)
-            letter_dist_vec = np.array([letter_dist[key] for key in ascii_uppercase])
-
-            score = cosine_similarity(self.letter_frequencies, letter_dist_vec) + ratio_tokens_in_dict(m)
-            score *= 0.5
+        for _ in range(self.n_restarts):
+            score, key = self._improve(counts, key_type.generate_random(rng=self.random))
 
             if score > best_score:
                 best_score = score
-                the_message = m
-                the_key = k
+                the_key = key
+
+        return cipher_type().decrypt(c, the_key), the_key
+
+    def improve(self, c: CipherText, start_key: SubstitutionCipherKey,
+                letters: Optional[str] = None) -> Tuple[float, SubstitutionCipherKey]:
+        """Search for a better key than a given key by swapping pairs of letters.
+
+        :param c: The ciphertext.
+        :param start_key: The key to start from.
+        :param letters: The ciphertext letters whose mappings may be swapped, e.g. the ones that are not already known.
+                        If None then any two letters may be swapped.
+        :return: The score of the best key found and the key.
+        """
+        assert is_valid(c), 'Invalid ciphertext.'
+
+        free = range(26) if letters is None else [ord(char) - ord('A') for char in letters]
+
+        return self._improve(ngram_counts(encode(c), 2), start_key, free)
+
+    def _improve(self, counts: np.ndarray, start_key: SubstitutionCipherKey,
+                 free: Sequence[int] = range(26)) -> Tuple[float, SubstitutionCipherKey]:
+        # The key as a permutation that maps each ciphertext letter (by index) to a message letter.
+        permutation = np.array([ord(start_key.inverse_mappings[char]) - ord('A') for char in ascii_uppercase])
+        score = self._climb(counts, permutation, free)
+
+        return score, type(start_key)({chr(ord('A') + p): char for p, char in zip(permutation, ascii_uppercase)})
+
+    def _climb(self, counts: np.ndarray, permutation: np.ndarray, free: Sequence[int] = range(26)) -> float:
+        """Search for a better key by swapping pairs of letters.
+
+        :param counts: The bigram counts of the ciphertext.
+        :param permutation: The key to start from as a permutation of ciphertext letters to message letters. This is
+                            updated in place to hold the best key found.
+        :param free: The indices of the ciphertext letters whose mappings may be swapped.
+        :return: The score of the best key found.
+        """
+        score = float(np.sum(counts * self.bigram_log_probs[np.ix_(permutation, permutation)]))
+        best_score = score
+        best_permutation = permutation.copy()
+        temperature = self.temperature
+
+        if len(free) < 2:
+            return score
+
+        for _ in range(self.n_iterations):
+            x, y = self.random.sample(free, 2)
+            delta = -self._partial_score(counts, permutation, x, y)
+            permutation[[x, y]] = permutation[[y, x]]
+            delta += self._partial_score(counts, permutation, x, y)
+
+            if delta >= 0 or (temperature > 0 and self.random.random() < math.exp(delta / temperature)):
+                score += delta
+
+                if score > best_score:
+                    best_score = score
+                    best_permutation[:] = permutation
+            else:
+                permutation[[x, y]] = permutation[[y, x]]
+
+            temperature *= self.cooling_rate
+
+        permutation[:] = best_permutation
+
+        return best_score
+
+    def _partial_score(self, counts: np.ndarray, permutation: np.ndarray, x: int, y: int) -> float:
+        """Calculate the part of a key's score that involves the ciphertext letters `x` or `y`.
+
+        :param counts: The bigram counts of the ciphertext.
+        :param permutation: The key as a permutation of ciphertext letters to message letters.
+        :param x: The index of a ciphertext letter.
+        :param y: The index of another ciphertext letter.
+        :return: The sum of the terms of the score in the rows and columns for `x` and `y`.
+        """
+        rows = [x, y]
+        log_probs = self.bigram_log_probs
+
+        return float(np.sum(counts[rows] * log_probs[np.ix_(permutation[rows], permutation)])
+                     + np.sum(counts[:, rows] * log_probs[np.ix_(permutation, permutation[rows])])
+                     - np.sum(counts[np.ix_(rows, rows)] * log_probs[np.ix_(permutation[rows], permutation[rows])]))
+
+
+class IndexOfCoincidenceAttack(CiphertextOnlyAttackI):
+    """An attack on the Vigenere cipher that solves each letter of the key on its own for every candidate key length.
+
+    The letters of the ciphertext that were encrypted with the same letter of the key form a Caesar ciphertext, so
+    for the right key length these columns have the letter distribution (and the index of coincidence) of English
+    rather than that of random letters. For each key length, each column is solved by comparing every rotation of its
+    letter distribution to the letter frequencies of the English language. The keys of the few best key lengths are
+    then improved one column at a time, and the key whose decryption has the best n-gram log probability (less a
+    penalty for each letter of the key) is chosen. A key that repeats is shortened to its period, so multiples of the
+    true key length give the true key. The cost is linear in the length of the ciphertext for each key length.
+    """
+
+    def __init__(self, max_key_length: int = 20, min_column_length: int = 8, n_refined: int = 3,
+                 length_penalty: float = 3 * math.log(26), letter_frequencies: Optional[np.ndarray] = None,
+                 scorer: Optional[ScorerI] = None):
+        """Create a new index of coincidence attack.
+
+        :param max_key_length: The longest key to consider.
+        :param min_column_length: The fewest letters each column must have for a key length to be considered. Columns
+                                  with fewer letters cannot be solved reliably, so this caps the key length for short
+                                  ciphertexts.
+        :param n_refined: The number of best key lengths whose keys (and the keys of their divisors) are improved column
+                          by column.
+        :param length_penalty: How much the log probability of a key's decryption must improve by for each extra
+                               letter of the key. This stops the attack from preferring longer keys whose extra
+                               letters only fit the noise in short ciphertexts.
+        :param letter_frequencies: The frequencies of the letters a-z. If None then the letter frequencies of the
+                                   English language model are used, see `crypto.language`.
+        :param scorer: How to compare each rotation of a column's letter distribution to `letter_frequencies`, see
+                       `crypto.scorers`. If None then the chi-squared statistic is used.
+        """
+        super().__init__()
+
+        self.max_key_length = max_key_length
+        self.min_column_length = min_column_length
+        self.n_refined = n_refined
+        self.length_penalty = length_penalty
+        self.letter_frequencies = get_language_model().letter_frequencies if letter_frequencies is None \
+            else letter_frequencies
+        self.scorer = ChiSquaredScorer(self.letter_frequencies) if scorer is None else scorer
 
-            if best_score > 0.99:
-                break
+    def from_cipher(self, c: CipherText, cipher_type: Type[CipherI],
+                    key_type: Type[KeyI]) -> Tuple[Message, Optional[KeyI]]:
+        assert issubclass(key_type, VigenereCipherKey), \
+            '%s only works with Vigenere cipher keys.' % self.__class__.__name__
+
+        a = encode(c)
+        # Whitespace does not advance the position in the key so only the letters are needed.
+        letters = (a[letter_mask(a)] - LETTERS[0]).astype(np.int64)
+
+        if len(letters) == 0:
+            return cipher_type().decrypt(c, key_type.get_identity()), key_type.get_identity()
+
+        key_lengths = np.arange(1, max(1, min(self.max_key_length, len(letters) // self.min_column_length)) + 1)
+        keys = [self._solve_columns(letters, key_length) for key_length in key_lengths]
+        scores = self._score(letters, keys)
+        # Short columns are often solved wrongly by their letter frequencies alone, so improve the keys of the best few
+        # key lengths (and of their divisors, which may be the true length) one column at a time.
+        best = {int(key_lengths[i]) for i in np.argsort(-scores, kind='stable')[:self.n_refined]}
+        best = sorted({d for key_length in best for d in range(1, key_length + 1) if key_length % d == 0})
+        keys = [self._refine(letters, keys[key_length - 1]) for key_length in best]
+        scores = self._score(letters, keys)
+        shifts = _shortest_period(keys[int(np.argmax(scores))])
+        key = key_type(''.join(chr(ord('A') + int(shift)) for shift in shifts))
+
+        return cipher_type().decrypt(c, key), key
+
+    def _refine(self, letters: np.ndarray, shifts: np.ndarray) -> np.ndarray:
+        """Improve a key one column at a time, trying every shift of each column until no shift improves the fitness.
+
+        :param letters: The letters of the ciphertext as indices into the alphabet.
+        :param shifts: The shift of each column.
+        :return: The improved shifts.
+        """
+        shifts = shifts.copy()
+        changed = True
+
+        # Shifts are only changed when the score strictly improves, so this always stops.
+        while changed:
+            changed = False
+
+            for column in range(len(shifts)):
+                candidates = np.repeat(shifts.reshape(1, -1), 26, axis=0)
+                candidates[:, column] = np.arange(26)
+                scores = self._score(letters, candidates)
+                shift = int(np.argmax(scores))
+
+                if scores[shift] > scores[shifts[column]]:
+                    shifts[column] = shift
+                    changed = True
+
+        return shifts
+
+    def _score(self, letters: np.ndarray, keys: Sequence[np.ndarray]) -> np.ndarray:
+        """Score the decryption of the letters with each of a number of keys.
+
+        The score is the total n-gram log probability of the decryption less `length_penalty` for each letter of the
+        key, since every extra column lets a key fit the ciphertext a little better by chance.
+
+        :param letters: The letters of the ciphertext as indices into the alphabet.
+        :param keys: The shift of each column for each key. The keys may have different lengths.
+        :return: A vector with the score of each key.
+        """
+        decryptions = np.stack([(letters - shifts[np.arange(len(letters)) % len(shifts)]) % 26 for shifts in keys])
+        table = get_ngram_table()
+        fitness = ngram_fitness_many((decryptions + LETTERS[0]).astype(np.uint8), table)
+
+        return fitness * max(1, len(letters) - table.ndim + 1) - self.length_penalty * np.array([len(k) for k in keys])
+
+    def _solve_columns(self, letters: np.ndarray, key_length: int) -> np.ndarray:
+        """Find the shift of each column of letters for a given key length.
+
+        :param letters: The letters of the ciphertext as indices into the alphabet.
+        :param key_length: The length of the key, i.e. the number of columns.
+        :return: The shift (0 for 'A' to 25 for 'Z') of each column.
+        """
+        return np.array([int(np.argmax(self.scorer.score(rotations(dist))))
+                         for dist in self._column_distributions(letters, key_length)], dtype=np.int64)
+
+    @staticmethod
+    def _column_distributions(letters: np.ndarray, key_length: int) -> np.ndarray:
+        """Calculate the letter distribution of each column of letters for a given key length.
+
+        :param letters: The letters of the ciphertext as indices into the alphabet.
+        :param key_length: The length of the key, i.e. the number of columns.
+        :return: A (key_length, 26) array where the i-th row is the letter distribution of the letters that were
+                 encrypted with the i-th letter of the key.
+        """
+        columns = np.arange(len(letters)) % key_length
+
+        return np.bincount(columns * 26 + letters, minlength=key_length * 26).reshape(key_length, 26)
+
+
+def _shortest_period(shifts: np.ndarray) -> np.ndarray:
+    """Shorten a repeating key to the part that repeats, e.g. the shifts of 'KEYKEY' to those of 'KEY'.
+
+    :param shifts: The shift of each letter of the key.
+    :return: The shortest prefix of the key that the whole key repeats.
+    """
+    for period in range(1, len(shifts)):
+        if len(shifts) % period == 0 and np.array_equal(shifts, np.tile(shifts[:period], len(shifts) // period)):
+            return shifts[:period]
 
-        return the_message, the_key
+    return shifts
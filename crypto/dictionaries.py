@@ -0,0 +1,161 @@
+"""This module provides shared access to the dictionaries used to check whether tokens are words."""
+
+import os
+from functools import lru_cache
+from typing import Dict, Callable, Union, Iterable
+
+from crypto.interfaces import DictionaryI
+
+# The directory containing the sample texts and word lists that ship with this repository.
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+
+class EnchantDictionary(DictionaryI):
+    """A dictionary backed by Enchant (https://abiword.github.io/enchant/).
+
+    This needs the Enchant C library to be installed.
+    """
+
+    def __init__(self, language: str = 'en'):
+        """Open the Enchant dictionary for a language.
+
+        :param language: The language of the dictionary (See https://abiword.github.io/enchant/ for details on the
+                         dictionary.)
+        """
+        import enchant
+
+        self._dict = enchant.Dict(language)
+
+    def check(self, token: str) -> bool:
+        return self._dict.check(token)
+
+
+class WordlistDictionary(DictionaryI):
+    """A dictionary backed by a plain list of words held in memory, so that looking up a token is a hash lookup."""
+
+    def __init__(self, words: Iterable[str]):
+        """Create a dictionary from a list of words.
+
+        :param words: The words in the dictionary. Words are not case sensitive.
+        """
+        self.words = frozenset(word.upper() for word in words)
+
+    def check(self, token: str) -> bool:
+        return token.upper() in self.words
+
+    @staticmethod
+    def from_file(filename: str) -> 'WordlistDictionary':
+        """Load a dictionary from a text file with one word per line.
+
+        :param filename: The name of the file to load.
+        :return: The dictionary.
+        """
+        with open(filename, 'r') as f:
+            return WordlistDictionary(line.strip() for line in f if line.strip())
+
+    @staticmethod
+    def for_language(language: str = 'en') -> 'WordlistDictionary':
+        """Load the word list that ships with this repository for a language.
+
+        :param language: The language of the dictionary, e.g. 'en' loads 'data/words_en.txt'. The English word list is
+                         expanded from the en_US Hunspell dictionary of SCOWL, see 'data/words_en.LICENSE'.
+        :return: The dictionary.
+        """
+        return WordlistDictionary.from_file(os.path.join(DATA_DIR, 'words_%s.txt' % language))
+
+
+def enchant_is_available(language: str = 'en') -> bool:
+    """Check whether the Enchant library (and its C library) can be used with a dictionary for a language.
+
+    :param language: The language of the dictionary that must be installed.
+    :return: True if Enchant can be imported and has a dictionary for `language`, False otherwise.
+    """
+    try:
+        import enchant
+    except ImportError:
+        return False
+
+    try:
+        enchant.Dict(language)
+    except enchant.errors.DictNotFoundError:
+        return False
+
+    return True
+
+
+# Functions that create a dictionary for a language, by name.
+BACKENDS: Dict[str, Callable[[str], DictionaryI]] = {
+    'enchant': EnchantDictionary,
+    'wordlist': WordlistDictionary.for_language,
+}
+
+
+class DictionaryProvider:
+    """Hands out one dictionary per language and caches the result of looking up tokens in them.
+
+    Attacks look up the same tokens over and over again (e.g. the words of a ciphertext decrypted with similar keys),
+    so lookups are kept in a bounded least-recently-used cache whose hit and miss counts are exposed through
+    `cache_info()` to help choose a cache size.
+
+    A provider can be pickled (e.g. to send an attack to worker processes) if its backend can be, i.e. if the backend
+    is a name in `BACKENDS` or a function defined at the top level of a module rather than a lambda or a closure.
+    """
+
+    def __init__(self, backend: Union[str, Callable[[str], DictionaryI]] = 'auto', cache_size: int = 2 ** 16):
+        """Create a dictionary provider.
+
+        :param backend: The name of a backend in `BACKENDS`, or a function that creates a dictionary for a language.
+                        If 'auto' then Enchant is used if it is installed with an English dictionary, otherwise the
+                        bundled word lists are used.
+        :param cache_size: The maximum number of (token, language) lookups to cache.
+        """
+        self.backend = backend
+        self.cache_size = cache_size
+
+        if backend == 'auto':
+            backend = 'enchant' if enchant_is_available() else 'wordlist'
+
+        self._create_dictionary = BACKENDS[backend] if isinstance(backend, str) else backend
+        self._dictionaries: Dict[str, DictionaryI] = {}
+        self.check = lru_cache(maxsize=cache_size)(self._check)
+
+    def __reduce__(self):
+        # Dictionary handles and the cache do not need to (and often cannot) be pickled, so only the settings are.
+        return self.__class__, (self.backend, self.cache_size)
+
+    def get(self, language: str = 'en') -> DictionaryI:
+        """Get the dictionary for a language, creating it the first time it is asked for.
+
+        :param language: The language of the dictionary.
+        :return: The dictionary.
+        """
+        try:
+            return self._dictionaries[language]
+        except KeyError:
+            dictionary = self._dictionaries[language] = self._create_dictionary(language)
+
+            return dictionary
+
+    def _check(self, token: str, language: str = 'en') -> bool:
+        """Check whether a token is a word in the dictionary for a language.
+
+        :param token: The token to look up.
+        :param language: The language of the dictionary.
+        :return: True if the token is in the dictionary, False otherwise.
+        """
+        return self.get(language).check(token)
+
+    def cache_info(self):
+        """Get the statistics of the token lookup cache.
+
+        :return: A named tuple with the fields `hits`, `misses`, `maxsize` and `currsize`.
+        """
+        return self.check.cache_info()
+
+    def cache_clear(self):
+        """Empty the token lookup cache and reset its statistics."""
+        self.check.cache_clear()
+
+
+# The provider shared by everything in this process.
+default_provider = DictionaryProvider()
@@ -0,0 +1,243 @@
+"""This module records where brute-force attacks spend their time and sends the statistics to pluggable sinks.
+
+Instrumentation is off unless an attack is given at least one sink (see `BruteForceAttackABC`), in which case the
+attack's search creates an `AttackStats`, times each chunk of keys with `time.perf_counter_ns()` and emits the
+statistics to every sink when the search ends. When it is off the only cost is a few `is None` checks per chunk.
+"""
+
+import json
+import logging
+import math
+import os
+from time import perf_counter_ns
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from crypto.interfaces import InstrumentationSinkI
+
+
+class AttackStats:
+    """The statistics of one search by a brute-force attack.
+
+    The time of each chunk of keys is split between sampling the keys, decrypting the ciphertext and scoring the
+    candidate messages. Decryption is only timed separately by key scorers that decrypt (the default scorer does),
+    otherwise it is counted as scoring.
+
+    The distribution of scores is summarised by its moments, which are exact, and by quantiles, which are estimated
+    from a uniform sample (a reservoir) of a bounded number of scores.
+    """
+
+    # The quantiles of the scores that are reported.
+    quantiles = (0.5, 0.9, 0.99)
+
+    def __init__(self, attack: str, cipher: str, key_type: str, max_scores: int = 65536, seed: int = 0):
+        """Start recording the statistics of a search.
+
+        :param attack: The name of the attack.
+        :param cipher: The name of the cipher being attacked.
+        :param key_type: The name of the type of key being searched for.
+        :param max_scores: The number of scores to keep for estimating quantiles.
+        :param seed: The seed of the random number generator that chooses which scores to keep.
+        """
+        self.attack = attack
+        self.cipher = cipher
+        self.key_type = key_type
+        self.n_keys = 0
+        self.n_chunks = 0
+        self.sample_ns = 0
+        self.decrypt_ns = 0
+        self.scorer_ns = 0
+        self.elapsed_ns = 0
+        self.exit_reason: Optional[str] = None
+        self.exit_position: Optional[int] = None
+        self.score_min = math.inf
+        self.score_max = -math.inf
+        self._score_sum = 0.0
+        self._score_sum_squares = 0.0
+        self._reservoir = np.empty(max_scores)
+        self._rng = np.random.default_rng(seed)
+        self._start_ns = perf_counter_ns()
+
+    def __repr__(self):
+        return '%s(attack=%s, n_keys=%d)' % (self.__class__.__name__, self.attack, self.n_keys)
+
+    @property
+    def score_ns(self) -> int:
+        """Get the time spent scoring candidates, not counting decryption.
+
+        :return: The time in nanoseconds.
+        """
+        return self.scorer_ns - self.decrypt_ns
+
+    @property
+    def keys_per_second(self) -> float:
+        """Get the number of keys searched per second over the whole search.
+
+        :return: The number of keys per second, or zero if no time has passed.
+        """
+        return self.n_keys / self.elapsed_ns * 1e9 if self.elapsed_ns else 0.0
+
+    def record_chunk(self, n_keys: int, sample_ns: int, scorer_ns: int, scores: np.ndarray):
+        """Record one chunk of keys.
+
+        :param n_keys: The number of keys in the chunk.
+        :param sample_ns: The nanoseconds it took to sample the keys.
+        :param scorer_ns: The nanoseconds it took to score the keys, including any decryption.
+        :param scores: The score of each key.
+        """
+        self.n_chunks += 1
+        self.sample_ns += sample_ns
+        self.scorer_ns += scorer_ns
+
+        scores = np.asarray(scores, dtype=np.float64)
+
+        if len(scores) > 0:
+            self.score_min = min(self.score_min, float(scores.min()))
+            self.score_max = max(self.score_max, float(scores.max()))
+            self._score_sum += float(scores.sum())
+            self._score_sum_squares += float(np.dot(scores, scores))
+            self._sample_scores(scores)
+
+        self.n_keys += n_keys
+
+    def _sample_scores(self, scores: np.ndarray):
+        """Keep a uniform sample of all of the scores recorded so far (reservoir sampling).
+
+        :param scores: The new scores, which are counted in `n_keys` after this is called.
+        """
+        capacity = len(self._reservoir)
+        n_seen = self.n_keys
+        # Fill the reservoir first...
+        n_fill = max(0, min(capacity - n_seen, len(scores)))
+        self._reservoir[n_seen:n_seen + n_fill] = scores[:n_fill]
+        # ...then the i-th score replaces a random element with probability capacity / i.
+        rest = scores[n_fill:]
+        slots = self._rng.integers(0, np.arange(n_seen + n_fill, n_seen + len(scores)) + 1)
+        keep = slots < capacity
+        self._reservoir[slots[keep]] = rest[keep]
+
+    def finish(self, exit_reason: str, exit_position: int):
+        """Record the end of the search.
+
+        :param exit_reason: Why the search ended: 'exhausted' if every key was searched, 'threshold' if a key scored
+                            higher than the attack's threshold, 'stopped' if another process asked it to stop, or
+                            'restored' if the finished search was loaded from a checkpoint.
+        :param exit_position: The number of keys into the sampling strategy at which the search ended, including any
+                              keys searched before the search was resumed from a checkpoint.
+        """
+        self.elapsed_ns = perf_counter_ns() - self._start_ns
+        self.exit_reason = exit_reason
+        self.exit_position = exit_position
+
+    def score_distribution(self) -> Dict[str, Any]:
+        """Summarise the distribution of the scores.
+
+        :return: The number of scores, their minimum, maximum, mean and standard deviation, and estimates of the
+                 `quantiles`. Everything but the count is None if no keys were scored.
+        """
+        n_scores = min(self.n_keys, len(self._reservoir))
+
+        if n_scores == 0:
+            return dict(count=0, min=None, max=None, mean=None, std=None,
+                        **{'p%g' % (100 * q): None for q in self.quantiles})
+
+        mean = self._score_sum / self.n_keys
+        variance = max(0.0, self._score_sum_squares / self.n_keys - mean ** 2)
+        quantiles = np.quantile(self._reservoir[:n_scores], self.quantiles)
+
+        return dict(count=self.n_keys, min=self.score_min, max=self.score_max, mean=mean, std=math.sqrt(variance),
+                    **{'p%g' % (100 * q): float(value) for q, value in zip(self.quantiles, quantiles)})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the statistics in a form that can be serialised as JSON.
+
+        :return: The statistics. Times are in seconds.
+        """
+        return dict(attack=self.attack, cipher=self.cipher, key_type=self.key_type, pid=os.getpid(),
+                    n_keys=self.n_keys, n_chunks=self.n_chunks, elapsed=self.elapsed_ns / 1e9,
+                    keys_per_second=self.keys_per_second, sample_time=self.sample_ns / 1e9,
+                    decrypt_time=self.decrypt_ns / 1e9, score_time=self.score_ns / 1e9,
+                    exit_reason=self.exit_reason, exit_position=self.exit_position,
+                    scores=self.score_distribution())
+
+    def emit(self, sinks: Sequence[InstrumentationSinkI]):
+        """Send the statistics to sinks.
+
+        :param sinks: The sinks to send the statistics to.
+        """
+        record = self.to_dict()
+
+        for sink in sinks:
+            sink.emit(record)
+
+
+def format_stats(record: Dict[str, Any]) -> str:
+    """Format the statistics of a search as a line of text.
+
+    :param record: The statistics, see `AttackStats.to_dict()`.
+    :return: The formatted statistics.
+    """
+    accounted = record['sample_time'] + record['decrypt_time'] + record['score_time']
+    elapsed = max(record['elapsed'], accounted, 1e-9)
+
+    return '%s on %s: %d keys in %.3fs (%.0f keys/s), sample %.0f%%, decrypt %.0f%%, score %.0f%%, ' \
+           'exit %s at key %s, best score %s' % (record['attack'], record['cipher'], record['n_keys'],
+                                                 record['elapsed'], record['keys_per_second'],
+                                                 100 * record['sample_time'] / elapsed,
+                                                 100 * record['decrypt_time'] / elapsed,
+                                                 100 * record['score_time'] / elapsed,
+                                                 record['exit_reason'], record['exit_position'],
+                                                 record['scores']['max'])
+
+
+class LoggingSink(InstrumentationSinkI):
+    """A sink that writes a one line summary of each search to a logger."""
+
+    def __init__(self, logger_name: str = __name__, level: int = logging.INFO):
+        """Create a logging sink.
+
+        :param logger_name: The name of the logger to write to.
+        :param level: The level to log at.
+        """
+        self.logger_name = logger_name
+        self.level = level
+
+    def emit(self, record: Dict[str, Any]):
+        logging.getLogger(self.logger_name).log(self.level, format_stats(record))
+
+
+class JsonLinesSink(InstrumentationSinkI):
+    """A sink that appends the statistics of each search as a line of JSON to a file.
+
+    The file is opened for each record, so the sink can be used by searches running in several processes at once.
+    """
+
+    def __init__(self, path: str):
+        """Create a JSON lines sink.
+
+        :param path: The file to append to.
+        """
+        self.path = path
+
+    def emit(self, record: Dict[str, Any]):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+
+class MemorySink(InstrumentationSinkI):
+    """A sink that keeps the statistics of each search in a list, e.g. for tests or interactive use.
+
+    Records emitted by searches running in other processes (i.e. attacks with `n_workers > 1`) are not collected.
+    """
+
+    def __init__(self):
+        """Create an empty memory sink."""
+        self.records: List[Dict[str, Any]] = []
+
+    def emit(self, record: Dict[str, Any]):
+        self.records.append(record)
+
+    def clear(self):
+        """Forget all of the records collected so far."""
+        self.records.clear()
@@ -1,7 +1,11 @@
 from abc import abstractmethod, ABC
-from typing import Tuple, Optional, Type, Generator
+from random import Random
+from typing import Tuple, Optional, Type, Generator, Sequence, List, Any, TextIO, Union, Dict, Callable
 
-from crypto.types import CipherText, Message, T
+import numpy as np
+
+from crypto.key_space import KeySpace
+from crypto.types import CipherText, Message, T, Buffer
 
 
 class KeyI(ABC):
@@ -36,19 +40,42 @@ class KeyI(ABC):
 
     @staticmethod
     @abstractmethod
-    def generate_random() -> 'KeyI':
+    def generate_random(rng: Optional[Random] = None) -> 'KeyI':
         """Generate a random key.
 
+        :param rng: The random number generator to use. If None then the operating system's source of randomness is
+                    used.
         :return: A randomly generated key.
         """
         raise NotImplementedError
 
     @staticmethod
     @abstractmethod
-    def get_space() -> Generator['KeyI', None, None]:
+    def get_space() -> KeySpace:
         """Get the key space, or the set of all valid keys.
 
-        :return: A generator that yields a sequence of valid keys.
+        :return: The key space. This can be iterated over to get every valid key in order, or indexed to get the key
+                 at a given position.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    @abstractmethod
+    def key_at(index: int) -> 'KeyI':
+        """Get the key at a given position in the key space.
+
+        :param index: The index of the key.
+        :return: The key.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    @abstractmethod
+    def index_of(k: 'KeyI') -> int:
+        """Get the position of a key in the key space, i.e. the inverse of `key_at(...)`.
+
+        :param k: The key.
+        :return: The index of the key.
         """
         raise NotImplementedError
 
@@ -66,13 +93,34 @@ class EncrypterI(ABC):
     """Interface for an encryption algorithm"""
 
     @abstractmethod
-    def encrypt(self, m: Message, k: Optional[KeyI] = None) -> CipherText:
+    def encrypt(self, m: Union[Message, Buffer], k: Optional[KeyI] = None, out: Optional[Buffer] = None,
+                validate: bool = True) -> Union[CipherText, Buffer]:
         """Encrypt a message.
 
-        :param m: The message to encrypt.
+        :param m: The message to encrypt. This may also be a buffer of ASCII codes, e.g. bytes or a memory-mapped file,
+                  which is read without being copied.
         :param k: The key to use for encrypting the message with. If None then
                   the key returned by `get_key()` is used.
-        :return: The ciphertext (the encrypted message).
+        :param out: A writable buffer to write the ciphertext to, e.g. a bytearray or a memory-mapped file.
+        :param validate: Whether to check that the message is valid. Only skip this for messages that have already
+                         been checked.
+        :return: The ciphertext (the encrypted message). This is `out` if it was given, otherwise a string if `m` is a
+                 string or bytes if `m` is a buffer.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def encrypt_stream(self, src: TextIO, dst: TextIO, k: Optional[KeyI] = None, chunk_size: int = 2 ** 16) -> int:
+        """Encrypt a message that is read from a stream, writing the ciphertext to another stream.
+
+        The message is processed in chunks, so it does not have to fit in memory.
+
+        :param src: The stream to read the message from, e.g. a file opened in text mode or `sys.stdin`.
+        :param dst: The stream to write the ciphertext to.
+        :param k: The key to use for encrypting the message with. If None then
+                  the key returned by `get_key()` is used.
+        :param chunk_size: The maximum number of characters to read at once.
+        :return: The number of characters written.
         """
         raise NotImplementedError
 
@@ -81,13 +129,34 @@ class DecrypterI(ABC):
     """Interface for a decryption algorithm."""
 
     @abstractmethod
-    def decrypt(self, c: CipherText, k: Optional[KeyI] = None) -> Message:
+    def decrypt(self, c: Union[CipherText, Buffer], k: Optional[KeyI] = None, out: Optional[Buffer] = None,
+                validate: bool = True) -> Union[Message, Buffer]:
         """Decrypt a ciphertext.
 
-        :param c: The ciphertext to decrypt.
+        :param c: The ciphertext to decrypt. This may also be a buffer of ASCII codes, e.g. bytes or a memory-mapped
+                  file, which is read without being copied.
+        :param k: The key to use for decrypting the message with. If None then
+                  the key returned by `get_key()` is used.
+        :param out: A writable buffer to write the message to, e.g. a bytearray or a memory-mapped file.
+        :param validate: Whether to check that the ciphertext is valid. Only skip this for ciphertexts that have
+                         already been checked.
+        :return: The decrypted message. This is `out` if it was given, otherwise a string if `c` is a string or bytes
+                 if `c` is a buffer.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def decrypt_stream(self, src: TextIO, dst: TextIO, k: Optional[KeyI] = None, chunk_size: int = 2 ** 16) -> int:
+        """Decrypt a ciphertext that is read from a stream, writing the message to another stream.
+
+        The ciphertext is processed in chunks, so it does not have to fit in memory.
+
+        :param src: The stream to read the ciphertext from.
+        :param dst: The stream to write the message to.
         :param k: The key to use for decrypting the message with. If None then
                   the key returned by `get_key()` is used.
-        :return: The decrypted message.
+        :param chunk_size: The maximum number of characters to read at once.
+        :return: The number of characters written.
         """
         raise NotImplementedError
 
@@ -104,6 +173,29 @@ class CipherI(EncrypterI, DecrypterI, ABC):
         """
         raise NotImplementedError
 
+    @staticmethod
+    @abstractmethod
+    def is_valid(x: Union[Message, CipherText, Buffer]) -> bool:
+        """Check if a given message or ciphertext are in a valid format for this cipher.
+
+        :param x: The message or ciphertext to check.
+        :return: True if the message or ciphertext is valid, False otherwise.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def decrypt_many(self, c: Union[CipherText, Buffer], keys: Sequence[KeyI], validate: bool = True) -> np.ndarray:
+        """Decrypt a ciphertext with each key in a batch of keys.
+
+        :param c: The ciphertext to decrypt, as a string or a buffer of ASCII codes.
+        :param keys: The keys to decrypt the ciphertext with.
+        :param validate: Whether to check that the ciphertext is valid. Attacks check the ciphertext once and then skip
+                         the check for every batch of keys.
+        :return: A (len(keys), len(c)) uint8 array where each row is the ASCII encoded message obtained by decrypting
+                 the ciphertext with the corresponding key.
+        """
+        raise NotImplementedError
+
 
 class AttackI(ABC):
     """The interface for an attacker that tries to break an encryption scheme."""
@@ -113,8 +205,8 @@ class AttackI(ABC):
         pass
 
 
-class BruteForceAttackI(AttackI, ABC):
-    """The interface for an attacker that tries to break an encryption scheme through brute force."""
+class CiphertextOnlyAttackI(AttackI, ABC):
+    """The interface for an attacker that tries to break an encryption scheme given only the ciphertext."""
 
     @abstractmethod
     def from_cipher(self, c: CipherText, cipher_type: Type[CipherI],
@@ -130,14 +222,134 @@ class BruteForceAttackI(AttackI, ABC):
         raise NotImplementedError
 
 
+class BruteForceAttackI(CiphertextOnlyAttackI, ABC):
+    """The interface for an attacker that tries to break an encryption scheme through brute force."""
+
+
+class KnownPlaintextAttackI(AttackI, ABC):
+    """The interface for an attacker that tries to break an encryption scheme given messages and their ciphertexts."""
+
+    @abstractmethod
+    def from_pairs(self, pairs: Sequence[Tuple[Message, CipherText]], cipher_type: Type[CipherI],
+                   key_type: Type[KeyI], c: Optional[CipherText] = None) -> Optional[KeyI]:
+        """Recover the key from pairs of messages and the ciphertexts they were encrypted to.
+
+        :param pairs: The (message, ciphertext) pairs, which were all encrypted with the same key.
+        :param cipher_type: The type of cipher that is being used.
+        :param key_type: The type of key the cipher uses.
+        :param c: Another ciphertext encrypted with the same key, which may be used to guess the parts of the key that
+                  the pairs do not determine.
+        :return: A key that encrypts every message to its ciphertext, or None if there is no such key.
+        """
+        raise NotImplementedError
+
+
+class ChosenPlaintextAttackI(AttackI, ABC):
+    """The interface for an attacker that tries to break an encryption scheme by choosing messages to encrypt."""
+
+    @abstractmethod
+    def from_oracle(self, encrypt: Callable[[Message], CipherText], cipher_type: Type[CipherI],
+                    key_type: Type[KeyI]) -> Optional[KeyI]:
+        """Recover the key by having messages of the attacker's choice encrypted.
+
+        :param encrypt: A function that encrypts a message with the unknown key.
+        :param cipher_type: The type of cipher that is being used.
+        :param key_type: The type of key the cipher uses.
+        :return: The key, or None if it could not be recovered.
+        """
+        raise NotImplementedError
+
+
 class SamplingStrategyI(ABC):
     """An interface for a strategy of sampling a key space."""
 
     @abstractmethod
-    def sample(self, key_type: Type[KeyI]) -> Generator[KeyI, None, None]:
+    def sample(self, key_type: Type[KeyI], *, start: int = 0) -> Generator[KeyI, None, None]:
         """Generate samples from a key space.
 
         :param key_type: The type of key whose key space should be sampled.
+        :param start: The number of samples to skip, e.g. the number of samples taken before a search was interrupted.
+                      Strategies that sample randomly expect their state to have been restored with `setstate(...)`.
         :return: Yields keys sampled from a key space.
         """
         raise NotImplementedError
+
+    @abstractmethod
+    def get_params(self) -> Dict[str, Any]:
+        """Get the parameters that decide which keys the strategy samples, e.g. to tell whether a checkpoint was saved
+        by the same strategy.
+
+        :return: The parameters, which must be JSON serializable.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def getstate(self) -> Any:
+        """Get the internal state of the strategy, e.g. the state of its random number generator.
+
+        :return: A picklable object that can be passed to `setstate(...)`.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def setstate(self, state: Any):
+        """Restore the internal state of the strategy.
+
+        :param state: A state returned by `getstate(...)`.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def partition(self, n_parts: int) -> List['SamplingStrategyI']:
+        """Split the strategy into a number of strategies that together sample the same keys.
+
+        This is used to share the work of sampling a key space between several processes.
+
+        :param n_parts: The number of strategies to split into.
+        :return: The list of strategies.
+        """
+        raise NotImplementedError
+
+
+class DictionaryI(ABC):
+    """An interface for a dictionary of the words in a language."""
+
+    @abstractmethod
+    def check(self, token: str) -> bool:
+        """Check whether a token is a word in the dictionary.
+
+        :param token: The token to look up.
+        :return: True if the token is in the dictionary, False otherwise.
+        """
+        raise NotImplementedError
+
+
+class InstrumentationSinkI(ABC):
+    """An interface for somewhere to send the statistics that instrumented attacks record about each search."""
+
+    @abstractmethod
+    def emit(self, record: Dict[str, Any]):
+        """Handle the statistics of one search.
+
+        :param record: The statistics, see `crypto.instrumentation.AttackStats.to_dict()`. These can be serialised as
+                       JSON.
+        """
+        raise NotImplementedError
+
+
+class ScorerI(ABC):
+    """An interface for comparing letter histograms to a reference distribution, e.g. that of the English language.
+
+    Scorers work on batches so that an attack can score every key in a chunk with a single call.
+    """
+
+    @abstractmethod
+    def score(self, histograms: np.ndarray) -> np.ndarray:
+        """Score how much each of a batch of letter histograms looks like the reference distribution.
+
+        :param histograms: A (n, 26) array where each row holds the counts (or frequencies) of the letters a-z, e.g. as
+                           returned by `crypto.metrics.letter_distributions(...)`. A 1-D array is treated as a single
+                           row.
+        :return: A vector with a score for each histogram where higher scores indicate a closer match.
+        """
+        raise NotImplementedError
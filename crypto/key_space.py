@@ -0,0 +1,110 @@
+"""This module defines key spaces whose keys can be addressed by index."""
+
+from typing import Callable, Iterator, List, Optional, Union
+
+from crypto.types import T
+
+
+class KeySpace:
+    """The set of all valid keys of a type, in a fixed order, where any key can be found from its index (and vice
+    versa) in O(1) time.
+
+    Key spaces can be sliced and split into contiguous ranges, e.g. to share an exhaustive search between processes or
+    to resume a search part way through.
+
+    Note that `len(...)` cannot be used with key spaces that have more than `sys.maxsize` keys (such as the key space
+    of the substitution cipher), use the `size` property instead.
+    """
+
+    def __init__(self, key_at: Callable[[int], T], index_of: Callable[[T], int], size: int,
+                 start: int = 0, stop: Optional[int] = None):
+        """Create a key space.
+
+        :param key_at: A function that gives the key at an index of the whole key space.
+        :param index_of: A function that gives the index of a key in the whole key space.
+        :param size: The number of keys in the whole key space.
+        :param start: The index (in the whole key space) of the first key in this range of the key space.
+        :param stop: The index (in the whole key space) one past the last key in this range of the key space. If None
+                     then the range continues to the end of the key space.
+        """
+        self._key_at = key_at
+        self._index_of = index_of
+        self._total_size = size
+        self.start = start
+        self.stop = size if stop is None else stop
+
+        assert 0 <= self.start <= self.stop <= size, 'Invalid range [%d, %d).' % (self.start, self.stop)
+
+    def __repr__(self):
+        return '%s(start=%d, stop=%d)' % (self.__class__.__name__, self.start, self.stop)
+
+    @property
+    def size(self) -> int:
+        """Get the number of keys in this range of the key space.
+
+        :return: The number of keys.
+        """
+        return self.stop - self.start
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[T]:
+        for index in range(self.start, self.stop):
+            yield self._key_at(index)
+
+    def __contains__(self, key: T) -> bool:
+        try:
+            index = self._index_of(key)
+        except (AssertionError, AttributeError, KeyError, TypeError, ValueError):
+            return False
+
+        return self.start <= index < self.stop
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[T, 'KeySpace']:
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self.size)
+            assert step == 1, 'Key spaces can only be sliced into contiguous ranges.'
+
+            return KeySpace(self._key_at, self._index_of, self._total_size, self.start + start,
+                            self.start + max(start, stop))
+
+        return self.key_at(item)
+
+    def key_at(self, index: int) -> T:
+        """Get the key at an index of this range of the key space.
+
+        :param index: The index of the key. Negative indices count back from the end of the range.
+        :return: The key.
+        """
+        if index < 0:
+            index += self.size
+
+        if not 0 <= index < self.size:
+            raise IndexError('Key index %d is out of range.' % index)
+
+        return self._key_at(self.start + index)
+
+    def index_of(self, key: T) -> int:
+        """Get the index of a key in this range of the key space.
+
+        :param key: The key.
+        :return: The index of the key.
+        """
+        index = self._index_of(key) - self.start
+
+        if not 0 <= index < self.size:
+            raise ValueError('The key \'%s\' is not in this range of the key space.' % key)
+
+        return index
+
+    def split(self, n_parts: int) -> List['KeySpace']:
+        """Split this range of the key space into contiguous ranges of (nearly) equal size.
+
+        :param n_parts: The number of ranges to split into.
+        :return: The ranges, in order.
+        """
+        bounds = [self.start + (self.size * i) // n_parts for i in range(n_parts + 1)]
+
+        return [KeySpace(self._key_at, self._index_of, self._total_size, start, stop)
+                for start, stop in zip(bounds[:-1], bounds[1:])]
@@ -0,0 +1,362 @@
+"""This module builds, saves and shares the reference statistics of a language that attacks and metrics score with.
+
+A `LanguageModel` holds the letter frequencies of a language, and the log probabilities of letter n-grams (unigrams up
+to quadgrams by default) and the word counts of a corpus of text files. The letter frequencies are a standard table
+where one is known (see `LETTER_FREQUENCIES`), since they are estimated far better from large corpora than from the
+texts that ship with this repository. Models are saved in a compact binary file (see
+`LanguageModel.save(...)`) which is memory-mapped when it is loaded, so loading is fast and the tables are shared
+between all of the processes that use the same file. `get_language_model(...)` builds the file the first time it is
+needed and hands out one model per language for the whole process.
+"""
+
+import hashlib
+import json
+import os
+import re
+import struct
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Sequence, Optional, Tuple, Any
+
+import numpy as np
+
+from crypto.ciphers.utils import encode, letter_mask, LETTERS
+from crypto.dictionaries import DATA_DIR
+
+# Texts that are used as a reference for the English language (three plays by Shakespeare, see
+# 'data/corpus_en.LICENSE'). These do not overlap with the sample texts, which tests and benchmarks attack.
+ENGLISH_CORPUS = [os.path.join(DATA_DIR, 'corpus_en.txt')]
+
+# Vector of letter frequencies from a-z in the English language.
+ENGLISH_LETTER_FREQUENCIES = np.array([0.08167, 0.01492, 0.02782, 0.04253, 0.12702, 0.02228, 0.02015,
+                                       0.06094, 0.06966, 0.00153, 0.00772, 0.04025, 0.02406, 0.06749,
+                                       0.07507, 0.01929, 0.00095, 0.05987, 0.06327, 0.09056, 0.02758,
+                                       0.00978, 0.02360, 0.00150, 0.01974, 0.00074])
+
+# The corpus of each language that a model can be built for.
+CORPORA: Dict[str, Sequence[str]] = {
+    'en': ENGLISH_CORPUS,
+}
+
+# The standard letter frequencies of each language that has them. Other languages estimate them from their corpus.
+LETTER_FREQUENCIES: Dict[str, np.ndarray] = {
+    'en': ENGLISH_LETTER_FREQUENCIES,
+}
+
+# Identifies language model files, followed by the version of the format and the length of the header.
+MAGIC = b'CRYPTOLM'
+VERSION = 2
+PREFIX = struct.Struct('<8sII')
+# Arrays are stored at offsets that are a multiple of this, so that they can be memory-mapped efficiently.
+ALIGNMENT = 64
+# The environment variable that overrides the directory that generated files are cached in, see `cache_dir()`.
+CACHE_DIR_VARIABLE = 'CRYPTO_CACHE_DIR'
+
+
+def read_corpus(filenames: Sequence[str] = tuple(ENGLISH_CORPUS)) -> str:
+    """Read a collection of text files into a single string.
+
+    :param filenames: The names of the files to read.
+    :return: The contents of the files joined with newlines.
+    """
+    texts = []
+
+    for filename in filenames:
+        with open(filename, 'r') as f:
+            texts.append(f.read())
+
+    return '\n'.join(texts)
+
+
+def ngram_counts(a: np.ndarray, n: int = 2) -> np.ndarray:
+    """Count the letter n-grams in an encoded message.
+
+    Whitespace is ignored, i.e. n-grams are counted over the sequence of letters only.
+
+    :param a: The ASCII encoded message.
+    :param n: The number of letters in each n-gram.
+    :return: An array of shape (26,) * n where the element at (i, j, ...) is the number of times the n-gram made up of
+             the i-th, j-th, ... letters of the alphabet occurs in the message.
+    """
+    letters = (a[letter_mask(a)] - LETTERS[0]).astype(np.int64)
+    n_grams = max(len(letters) - n + 1, 0)
+    indices = np.zeros(n_grams, dtype=np.int64)
+
+    for i in range(n):
+        indices = indices * 26 + letters[i:i + n_grams]
+
+    return np.bincount(indices, minlength=26 ** n).reshape((26,) * n)
+
+
+def ngram_log_probabilities(counts: np.ndarray, alpha: float = 0.01) -> np.ndarray:
+    """Estimate the log probabilities of letter n-grams from their counts.
+
+    Additive smoothing is used so that n-grams which never occur in the counts get a small, but non-zero, probability.
+
+    :param counts: The n-gram counts, see `ngram_counts(...)`.
+    :param alpha: The smoothing constant that is added to each count.
+    :return: An array of the same shape as `counts` holding the natural log of the estimated probability of each
+             n-gram.
+    """
+    return np.log((counts + alpha) / (counts.sum() + alpha * counts.size))
+
+
+def corpus_hash(filenames: Sequence[str], letter_frequencies: Optional[np.ndarray] = None, max_n: int = 4,
+                alpha: float = 0.01) -> str:
+    """Hash the corpus and the settings that a language model is built from, to tell when a saved model is stale.
+
+    :param filenames: The names of the text files in the corpus.
+    :param letter_frequencies: The standard letter frequencies of the language, if any.
+    :param max_n: The longest n-grams of the model.
+    :param alpha: The smoothing constant for the n-gram log probabilities.
+    :return: The hash as a hexadecimal string.
+    """
+    digest = hashlib.sha256()
+
+    for filename in filenames:
+        with open(filename, 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+
+    settings = dict(max_n=max_n, alpha=alpha,
+                    letter_frequencies=None if letter_frequencies is None else [float(p) for p in letter_frequencies])
+    digest.update(json.dumps(settings, sort_keys=True).encode('utf-8'))
+
+    return digest.hexdigest()
+
+
+class LanguageModel:
+    """The reference statistics of a language, estimated from a corpus of text."""
+
+    def __init__(self, letter_frequencies: np.ndarray, ngram_tables: Dict[int, np.ndarray],
+                 word_counts: Dict[str, int], corpus_hash: Optional[str] = None):
+        """Create a language model. Use `build(...)` or `load(...)` to make one from a corpus or a file.
+
+        :param letter_frequencies: The relative frequency of each of the letters a-z.
+        :param ngram_tables: The float32 table of n-gram log probabilities (see `ngram_log_probabilities(...)`) for
+                             each n.
+        :param word_counts: The number of times each (uppercase) word occurs in the corpus.
+        :param corpus_hash: The hash of the corpus and settings the model was built from, see `corpus_hash(...)`.
+        """
+        self.letter_frequencies = letter_frequencies
+        self.ngram_tables = ngram_tables
+        self.word_counts = word_counts
+        self.corpus_hash = corpus_hash
+        self._n_words = sum(word_counts.values())
+
+    def __repr__(self):
+        return '%s(n=%s, n_words=%d)' % (self.__class__.__name__, sorted(self.ngram_tables), len(self.word_counts))
+
+    @staticmethod
+    def build(filenames: Sequence[str] = tuple(ENGLISH_CORPUS), max_n: int = 4, alpha: float = 0.01,
+              letter_frequencies: Optional[np.ndarray] = None) -> 'LanguageModel':
+        """Build a language model from a corpus of text files.
+
+        :param filenames: The names of the text files to estimate the statistics from.
+        :param max_n: The longest n-grams to estimate log probabilities for. Tables are built for every n from 1 to
+                      this.
+        :param alpha: The smoothing constant for the n-gram log probabilities, see `ngram_log_probabilities(...)`.
+        :param letter_frequencies: The standard letter frequencies of the language (see `LETTER_FREQUENCIES`). If None
+                                   then they are estimated from the corpus.
+        :return: The language model.
+        """
+        text = read_corpus(filenames)
+        a = encode(text)
+        ngram_tables = {n: ngram_log_probabilities(ngram_counts(a, n), alpha).astype(np.float32)
+                        for n in range(1, max_n + 1)}
+        word_counts = Counter(re.findall('[A-Z]+', text.upper()))
+        hash_ = corpus_hash(filenames, letter_frequencies, max_n, alpha)
+
+        if letter_frequencies is None:
+            unigrams = ngram_counts(a, 1)
+            letter_frequencies = unigrams / max(unigrams.sum(), 1)
+
+        return LanguageModel(np.asarray(letter_frequencies, dtype=np.float64), ngram_tables, dict(word_counts), hash_)
+
+    def ngram_table(self, n: int) -> np.ndarray:
+        """Get the table of n-gram log probabilities for some n.
+
+        :param n: The number of letters in each n-gram.
+        :return: A float32 array of shape (26,) * n of log probabilities.
+        """
+        assert n in self.ngram_tables, 'The language model has no table of %d-grams.' % n
+
+        return self.ngram_tables[n]
+
+    def word_frequency(self, word: str) -> float:
+        """Get the relative frequency of a word in the corpus.
+
+        :param word: The word. Words are not case sensitive.
+        :return: The number of times the word occurs divided by the number of words in the corpus.
+        """
+        return self.word_counts.get(word.upper(), 0) / self._n_words if self._n_words else 0.0
+
+    def save(self, path: str):
+        """Save the language model to a binary file.
+
+        The file starts with `MAGIC`, the version of the format and the length of a JSON header that holds the hash of
+        the corpus (see `corpus_hash(...)`) and describes where each array is. The arrays follow, each aligned to
+        `ALIGNMENT` bytes: the letter frequencies, the word counts, the words themselves as newline separated UTF-8 text
+        and the n-gram tables.
+
+        The file is written to a temporary file first so that other processes never see a partially written model.
+
+        :param path: The path of the file to save the model to.
+        """
+        words = sorted(self.word_counts)
+        arrays = {'letter_frequencies': np.asarray(self.letter_frequencies, dtype=np.float64),
+                  'word_counts': np.array([self.word_counts[word] for word in words], dtype=np.int64),
+                  'words': np.frombuffer('\n'.join(words).encode('utf-8'), dtype=np.uint8)}
+        arrays.update({'ngrams_%d' % n: np.asarray(table, dtype=np.float32) for n, table in self.ngram_tables.items()})
+
+        # Offsets are relative to the start of the data, which is the first aligned position after the header.
+        layout = {}
+        offset = 0
+
+        for name, array in arrays.items():
+            layout[name] = dict(offset=offset, shape=list(array.shape), dtype=array.dtype.str)
+            offset += _aligned(array.nbytes)
+
+        header = json.dumps(dict(corpus_hash=self.corpus_hash, arrays=layout)).encode('utf-8')
+        data_start = _aligned(PREFIX.size + len(header))
+        temp_path = '%s.%d.tmp' % (path, os.getpid())
+
+        with open(temp_path, 'wb') as f:
+            f.write(PREFIX.pack(MAGIC, VERSION, len(header)))
+            f.write(header)
+
+            for name, array in arrays.items():
+                f.seek(data_start + layout[name]['offset'])
+                f.write(array.tobytes())
+
+            f.truncate(data_start + offset)
+
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def load(path: str) -> 'LanguageModel':
+        """Load a language model that was saved with `save(...)`.
+
+        The file is memory-mapped rather than read, so the (read-only) n-gram tables are shared between all of the
+        processes that load the same file.
+
+        :param path: The path of the file to load the model from.
+        :return: The language model.
+        """
+        header, header_length = LanguageModel._read_header(path)
+        layout = header['arrays']
+        data = np.memmap(path, dtype=np.uint8, mode='r', offset=_aligned(PREFIX.size + header_length))
+        arrays = {}
+
+        for name, entry in layout.items():
+            dtype = np.dtype(entry['dtype'])
+            size = int(np.prod(entry['shape'])) * dtype.itemsize
+            arrays[name] = data[entry['offset']:entry['offset'] + size].view(dtype).reshape(entry['shape'])
+
+        words = bytes(arrays['words']).decode('utf-8').split('\n') if arrays['words'].size else []
+        word_counts = dict(zip(words, arrays['word_counts'].tolist()))
+        ngram_tables = {int(name[len('ngrams_'):]): array for name, array in arrays.items()
+                        if name.startswith('ngrams_')}
+
+        return LanguageModel(np.array(arrays['letter_frequencies']), ngram_tables, word_counts, header['corpus_hash'])
+
+    @staticmethod
+    def read_corpus_hash(path: str) -> Optional[str]:
+        """Read the hash of the corpus that a saved language model was built from, without loading the model.
+
+        :param path: The path of the model's file.
+        :return: The hash, or None if the file does not exist or is not a language model of the current version.
+        """
+        try:
+            header, _ = LanguageModel._read_header(path)
+        except (OSError, AssertionError, ValueError, struct.error):
+            return None
+
+        return header.get('corpus_hash')
+
+    @staticmethod
+    def _read_header(path: str) -> Tuple[Dict[str, Any], int]:
+        """Read the JSON header of a language model file.
+
+        :param path: The path of the file.
+        :return: The header and its length in bytes.
+        """
+        with open(path, 'rb') as f:
+            magic, version, header_length = PREFIX.unpack(f.read(PREFIX.size))
+            assert magic == MAGIC, '\'%s\' is not a language model file.' % path
+            assert version == VERSION, 'Unsupported language model file version %d.' % version
+
+            return json.loads(f.read(header_length).decode('utf-8')), header_length
+
+
+def _aligned(n_bytes: int) -> int:
+    """Round a number of bytes up to a multiple of `ALIGNMENT`."""
+    return -(-n_bytes // ALIGNMENT) * ALIGNMENT
+
+
+def cache_dir() -> str:
+    """Get the directory that files generated at runtime, such as language models, are cached in.
+
+    This is `$CRYPTO_CACHE_DIR` if it is set, otherwise a `crypto` directory in the user's cache directory
+    (`$XDG_CACHE_HOME`, `~/.cache` or `%LOCALAPPDATA%` on Windows). The package's data directory is never written to.
+
+    :return: The path of the directory, which may not exist yet.
+    """
+    if os.environ.get(CACHE_DIR_VARIABLE):
+        return os.environ[CACHE_DIR_VARIABLE]
+
+    if os.name == 'nt' and os.environ.get('LOCALAPPDATA'):
+        return os.path.join(os.environ['LOCALAPPDATA'], 'crypto')
+
+    return os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'crypto')
+
+
+def language_model_path(language: str = 'en', hash_: Optional[str] = None) -> str:
+    """Get the path of the file that caches the language model of a language.
+
+    The name of the file includes the hash of the corpus, so a model built from another version of the corpus is never
+    picked up by mistake.
+
+    :param language: The language.
+    :param hash_: The hash of the language's corpus. If None then it is calculated, see `corpus_hash(...)`.
+    :return: The path of the model's binary file in `cache_dir()`.
+    """
+    if hash_ is None:
+        hash_ = corpus_hash(CORPORA[language], LETTER_FREQUENCIES.get(language))
+
+    return os.path.join(cache_dir(), 'language_%s_%s.bin' % (language, hash_[:16]))
+
+
+def get_language_model(language: str = 'en', path: Optional[str] = None) -> LanguageModel:
+    """Get the language model of a language, which is shared by the whole process.
+
+    The model is built from the language's corpus (see `CORPORA`) and standard letter frequencies (see
+    `LETTER_FREQUENCIES`) the first time it is needed and is cached on disk and in memory after that. The cached file
+    is rebuilt when the corpus changes.
+
+    :param language: The language.
+    :param path: The file to cache the model in. If None then `language_model_path(language)` is used.
+    :return: The language model.
+    """
+    return _get_language_model(language, path)
+
+
+@lru_cache(maxsize=None)
+def _get_language_model(language: str, path: Optional[str]) -> LanguageModel:
+    letter_frequencies = LETTER_FREQUENCIES.get(language)
+    hash_ = corpus_hash(CORPORA[language], letter_frequencies)
+    path = language_model_path(language, hash_) if path is None else path
+
+    if LanguageModel.read_corpus_hash(path) != hash_:
+        model = LanguageModel.build(CORPORA[language], letter_frequencies=letter_frequencies)
+
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            model.save(path)
+        except OSError:
+            # The cache directory is not writable, just keep the model in memory.
+            for table in model.ngram_tables.values():
+                table.flags.writeable = False
+
+            return model
+
+    return LanguageModel.load(path)
@@ -1,57 +1,158 @@
-from collections import Counter
-from datetime import datetime
 from statistics import mean
-from string import ascii_uppercase
-from typing import Iterable, Union, Type
+from time import perf_counter_ns
+from typing import Iterable, Union, Type, Optional
 
-import enchant
 import numpy as np
 
-from crypto.interfaces import BruteForceAttackI, CipherI, KeyI
-from crypto.types import Message, CipherText
+from crypto.ciphers.utils import encode, decode, letter_mask, LETTERS
+from crypto.dictionaries import default_provider, DictionaryProvider
+from crypto.instrumentation import MemorySink, format_stats
+from crypto.interfaces import CiphertextOnlyAttackI, CipherI, KeyI
+from crypto.language import get_language_model
+from crypto.types import Message, CipherText, Buffer
 
 
 def cosine_similarity(a: Iterable[Union[float, int]], b: Iterable[Union[float, int]]) -> float:
     """Calculate the cosine similarity between two vectors.
 
+    Either argument may also be a 2-D array of row vectors, in which case the similarity is calculated row-wise.
+
     :param a: A vector.
     :param b: A vector.
     :return: The cosine similarity between the vectors `a` and `b` in the range [0.0, 1.0].
     """
-    return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
+    return np.sum(np.multiply(a, b), axis=-1) / (np.linalg.norm(a, axis=-1) * np.linalg.norm(b, axis=-1))
 
 
-def letter_distribution(m: Message) -> np.ndarray:
+def letter_distribution(m: Union[Message, Buffer]) -> np.ndarray:
     """Calculate the frequency distribution of the letters in a message.
 
-    :param m: The message to process.
+    :param m: The message to process, as a string or a buffer of ASCII codes (e.g. a memory-mapped file).
     :return: The calculated frequency distribution of letters in the message `m` as a vector.
     """
-    dist = Counter(m)
+    return letter_distributions(encode(m))[0]
+
+
+def letter_distributions(a: np.ndarray) -> np.ndarray:
+    """Calculate the frequency distribution of the letters in each of a batch of encoded messages.
+
+    :param a: A 2-D uint8 array where each row is an ASCII encoded message (a 1-D array is treated as a single row).
+    :return: A (n, 26) array where each row is the frequency distribution of letters in the corresponding message.
+    """
+    a = np.atleast_2d(a)
+    mask = letter_mask(a)
+    rows = np.broadcast_to(np.arange(len(a)).reshape(-1, 1), a.shape)[mask]
+
+    # 26 is the number of letters in the alphabet
+    return np.bincount(rows * 26 + (a[mask] - LETTERS[0]), minlength=len(a) * 26).reshape(-1, 26)
+
+
+def get_ngram_table(n: int = 4) -> np.ndarray:
+    """Get the n-gram log probability table for the English language, see `crypto.language.get_language_model(...)`.
+
+    :param n: The number of letters in each n-gram.
+    :return: A read-only float32 array of shape (26,) * n of log probabilities.
+    """
+    return get_language_model().ngram_table(n)
+
+
+def ngram_fitness(m: Union[Message, Buffer], table: Optional[np.ndarray] = None) -> float:
+    """Calculate how much a message looks like English according to its letter n-grams.
+
+    :param m: The message to score, as a string or a buffer of ASCII codes.
+    :param table: The n-gram log probability table to use. If None then the English quadgram table is used.
+    :return: The mean log probability of the n-grams in the message, or -inf if the message is too short to have any.
+    """
+    return float(ngram_fitness_many(encode(m), table)[0])
+
+
+def ngram_fitness_many(a: np.ndarray, table: Optional[np.ndarray] = None) -> np.ndarray:
+    """Calculate the n-gram fitness of each of a batch of encoded messages, see `ngram_fitness(...)`.
+
+    :param a: A 2-D uint8 array where each row is an ASCII encoded message (a 1-D array is treated as a single row).
+    :param table: The n-gram log probability table to use. If None then the English quadgram table is used.
+    :return: A vector with the fitness of each message.
+    """
+    a = np.atleast_2d(a)
+    table = get_ngram_table() if table is None else table
+    n = table.ndim
+    log_probs = table.reshape(-1)
+    mask = letter_mask(a)
+
+    if len(a) == 0:
+        return np.empty(0)
+
+    if not np.all(mask == mask[:1]):
+        # The messages have letters in different places so they cannot be stacked into a single array of letters.
+        return np.concatenate([ngram_fitness_many(row, table) for row in a])
+
+    letters = (a[:, mask[0]] - LETTERS[0]).astype(np.int64)
+    n_grams = letters.shape[1] - n + 1
+
+    if n_grams < 1:
+        return np.full(len(a), -np.inf)
+
+    indices = np.zeros((len(a), n_grams), dtype=np.int64)
+
+    for i in range(n):
+        indices = indices * 26 + letters[:, i:i + n_grams]
+
+    return log_probs[indices].mean(axis=1)
+
+
+def index_of_coincidence(dist: np.ndarray) -> np.ndarray:
+    """Calculate the index of coincidence of a letter distribution, i.e. the probability that two letters drawn at
+    random (without replacement) are the same.
+
+    This is roughly 0.066 for English text and 1 / 26 (about 0.038) for uniformly random letters.
+
+    :param dist: A letter distribution, or a 2-D array of letter distributions (one per row).
+    :return: The index of coincidence of the distribution, or a vector of them for a 2-D array.
+    """
+    dist = np.asarray(dist, dtype=float)
+    n = dist.sum(axis=-1)
 
-    dist_vec = np.zeros(26)  # 26 is the number of letters in the alphabet
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.sum(dist * (dist - 1), axis=-1) / (n * (n - 1))
 
-    for i, char in enumerate(ascii_uppercase):
-        dist_vec[i] = dist[char]
 
-    return dist_vec
+def rotation_similarities(dist: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """Calculate the cosine similarity between a reference letter distribution and every rotation of a letter
+    distribution.
 
+    Decrypting a Caesar ciphertext with the key k gives a message whose letter distribution is the ciphertext's letter
+    distribution rotated to the left by k letters, so this scores every Caesar key without decrypting anything.
+
+    :param dist: The letter distribution to rotate, e.g. the letter distribution of a ciphertext.
+    :param reference: The reference letter distribution, e.g. the letter frequencies of the English language.
+    :return: A vector of 26 elements where the k-th element is the similarity of the distribution rotated by k
+             letters.
+    """
+    return cosine_similarity(rotations(dist), reference)
 
-def ratio_tokens_in_dict(m: Message, language: str = 'en') -> float:
+
+def rotations(dist: np.ndarray) -> np.ndarray:
+    """Get every rotation of a letter distribution, e.g. to score every Caesar key at once (see
+    `rotation_similarities(...)`).
+
+    :param dist: The letter distribution to rotate.
+    :return: A (26, 26) array where the k-th row is the distribution rotated to the left by k letters.
+    """
+    return np.asarray(dist)[(np.arange(26) + np.arange(26).reshape(-1, 1)) % 26]
+
+
+def ratio_tokens_in_dict(m: Union[Message, Buffer], language: str = 'en',
+                         provider: Optional[DictionaryProvider] = None) -> float:
     """Calculate the ratio of tokens in a message that are found in a dictionary.
 
-    :param m: The message to process.
-    :param language: The language of the dictionary to use (See https://abiword.github.io/enchant/ for details on the
-                     dictionary.)
+    :param m: The message to process, as a string or a buffer of ASCII codes.
+    :param language: The language of the dictionary to use.
+    :param provider: The provider of the dictionary. If None then the provider shared by the whole process is used.
     :return: The ratio of tokens in the message that are in a dictionary in the range [0.0, 1.0].
     """
-    en_dict = enchant.Dict(language)
-    n_in_dictionary = 0
-    tokens = m.split()
-
-    for token in tokens:
-        if en_dict.check(token):
-            n_in_dictionary += 1
+    provider = default_provider if provider is None else provider
+    tokens = (m if isinstance(m, str) else decode(encode(m))).split()
+    n_in_dictionary = sum(provider.check(token, language) for token in tokens)
 
     return n_in_dictionary / len(tokens)
 
@@ -64,7 +165,10 @@ def positional_similarity(message, other_message) -> float:
     :param other_message: The other message to compare.
     :return: A ratio in the range [0.0, 1.0] relating to the ratio of matching characters taking into account position.
     """
-    return sum(1 if c1 == c2 else 0 for c1, c2 in zip(message, other_message)) / len(message)
+    a, b = encode(message), encode(other_message)
+    n = min(len(a), len(b))
+
+    return np.count_nonzero(a[:n] == b[:n]) / len(a)
 
 
 def distributional_similarity(message, other_message) -> float:
@@ -91,10 +195,10 @@ def aggregate_score(message, other_message) -> float:
              indicates the messages are exactly the same.
     """
     return mean([distributional_similarity(message, other_message), positional_similarity(message, other_message),
-                 ratio_tokens_in_dict(message, other_message)])
+                 ratio_tokens_in_dict(message)])
 
 
-def print_attack_summary(attack: BruteForceAttackI, message: Message, ciphertext: CipherText,
+def print_attack_summary(attack: CiphertextOnlyAttackI, message: Message, ciphertext: CipherText,
                          cipher_type: Type[CipherI], key_type: Type[KeyI]):
     """Perform an attack on a given ciphertext and print a summary of how well the attacker did.
 
@@ -104,28 +208,42 @@ def print_attack_summary(attack: BruteForceAttackI, message: Message, ciphertext
     :param cipher_type: The type of cipher that was used to generate the ciphertext.
     :param key_type: The type of key that was used to generate the ciphertext.
     """
-    start = datetime.now()
+    # Collect the statistics of any brute-force searches so that they can be printed with the summary.
+    memory_sink = MemorySink()
+    sinks = getattr(attack, 'sinks', None)
+
+    if sinks is not None:
+        sinks.append(memory_sink)
 
-    estimated_message, estimated_key = attack.from_cipher(ciphertext, cipher_type, key_type)
+    start = perf_counter_ns()
 
-    delta = datetime.now() - start
+    try:
+        estimated_message, estimated_key = attack.from_cipher(ciphertext, cipher_type, key_type)
+    finally:
+        if sinks is not None:
+            sinks.remove(memory_sink)
+
+    elapsed = (perf_counter_ns() - start) / 1e9
     exact_match = estimated_message == message
     pos_similarity = positional_similarity(message, estimated_message)
     dist_similarity = distributional_similarity(message, estimated_message)
     sensibility = ratio_tokens_in_dict(estimated_message)
 
     print('\n%s Solution:'
-          '\n\tElapsed Time: %s'
+          '\n\tElapsed Time: %.6fs'
           '\n\tMessage: %s'
           '\n\tKey: %s'
           '\n\tExact Match: %s'
           '\n\tLetter Position Similarity: %.2f'
           '\n\tLetter Distribution Similarity: %.2f'
           '\n\tRatio of Tokens in Dictionary: %.2f' % (attack.__class__.__name__,
-                                                       str(delta),
+                                                       elapsed,
                                                        estimated_message,
                                                        estimated_key,
                                                        str(exact_match),
                                                        pos_similarity,
                                                        dist_similarity,
                                                        sensibility))
+
+    for record in memory_sink.records:
+        print('\tSearch: %s' % format_stats(record))
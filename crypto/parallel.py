@@ -0,0 +1,72 @@
+"""This module runs brute-force searches across a pool of processes."""
+
+import heapq
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.synchronize import Event
+from typing import Type, Tuple, Optional, List
+
+from crypto.interfaces import BruteForceAttackI, CipherI, KeyI, SamplingStrategyI
+from crypto.types import CipherText
+
+# The event that tells the searches in a worker process to stop, see `_init_worker(...)`.
+_stop_event: Optional[Event] = None
+
+
+def _init_worker(stop_event: Event):
+    """Set up a worker process.
+
+    :param stop_event: The event shared by all of the workers that is set once any worker finds a good enough key.
+    """
+    global _stop_event
+    _stop_event = stop_event
+
+
+def _search_part(attack: BruteForceAttackI, c: CipherText, cipher_type: Type[CipherI], key_type: Type[KeyI],
+                 sampling_strategy: SamplingStrategyI, checkpoint_path: Optional[str]) -> List[Tuple[float, KeyI]]:
+    """Search one part of a partitioned key space in a worker process.
+
+    :return: The best (score, key) pairs found in this part of the key space, best first.
+    """
+    return attack.search(c, cipher_type, key_type, sampling_strategy, _stop_event, checkpoint_path)
+
+
+def _part_checkpoint_path(checkpoint_path: Optional[str], part: int, n_parts: int) -> Optional[str]:
+    """Get the checkpoint file for one part of a partitioned key space.
+
+    :return: The path of the file, or None if the search is not checkpointed.
+    """
+    return None if checkpoint_path is None else '%s.%d-of-%d' % (checkpoint_path, part, n_parts)
+
+
+def parallel_search(attack: BruteForceAttackI, c: CipherText, cipher_type: Type[CipherI], key_type: Type[KeyI],
+                    n_workers: int) -> List[Tuple[float, KeyI]]:
+    """Run a brute-force search across a pool of processes.
+
+    The attack's sampling strategy is partitioned into one strategy per process and each process searches its part of
+    the key space with `attack.search(...)`. As soon as one process finds a key that scores above the attack's
+    threshold, the others stop after their current chunk of keys.
+
+    :param attack: The attack to run, see `BruteForceAttackABC.search(...)`. This must be picklable.
+    :param c: The ciphertext.
+    :param cipher_type: The type of cipher that is being used.
+    :param key_type: The type of key the cipher uses.
+    :param n_workers: The number of processes to use.
+    :return: Up to `attack.top_k` (score, key) pairs, best first. Ties are broken in favour of the first part of the
+             key space, so the result does not depend on which process finishes first.
+    """
+    context = multiprocessing.get_context()
+    stop_event = context.Event()
+    sampling_strategies = attack.sampling_strategy.partition(n_workers)
+
+    with ProcessPoolExecutor(n_workers, mp_context=context, initializer=_init_worker,
+                             initargs=(stop_event,)) as executor:
+        futures = [executor.submit(_search_part, attack, c, cipher_type, key_type, sampling_strategy,
+                                   _part_checkpoint_path(attack.checkpoint_path, part, n_workers))
+                   for part, sampling_strategy in enumerate(sampling_strategies)]
+        results = [(-score, part, rank, key)
+                   for part, future in enumerate(futures)
+                   for rank, (score, key) in enumerate(future.result())]
+
+    return [(-negated_score, key) for negated_score, _, _, key in heapq.nsmallest(attack.top_k, results,
+                                                                                   key=lambda r: r[:3])]
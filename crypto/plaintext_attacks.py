@@ -0,0 +1,203 @@
+"""This module implements attacks that recover keys from messages and their ciphertexts rather than by searching.
+
+Every letter of a message and the letter it is encrypted to give away part of the key, so the key of the Caesar,
+substitution and Vigenere ciphers can be read off a (message, ciphertext) pair in one linear pass: the shift for the
+Caesar cipher, the mapping of each letter that occurs for the substitution cipher, and the period and the shift of each
+column for the Vigenere cipher. Only the letters of a substitution key that do not occur in any message are searched
+for.
+"""
+
+from string import ascii_uppercase
+from typing import Sequence, Tuple, Optional, Type, List, Callable
+
+import numpy as np
+
+from crypto.ciphers.caesar import CaesarCipherKey
+from crypto.ciphers.substitution import SubstitutionCipherKey
+from crypto.ciphers.utils import encode, letter_mask, LETTERS
+from crypto.ciphers.vigenere import VigenereCipherKey
+from crypto.common_attacks import HillClimbingAttack
+from crypto.interfaces import KnownPlaintextAttackI, ChosenPlaintextAttackI, CipherI, KeyI
+from crypto.language import get_language_model
+from crypto.metrics import letter_distribution
+from crypto.types import Message, CipherText
+
+
+def letter_pairs(m: Message, c: CipherText) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Line up the letters of a message with the letters of its ciphertext.
+
+    :param m: The message.
+    :param c: The ciphertext that the message was encrypted to.
+    :return: The indices (0 for 'A' to 25 for 'Z') of the message's letters and of the ciphertext's letters, or None
+             if the ciphertext cannot be an encryption of the message, i.e. the whitespace does not line up.
+    """
+    a, b = encode(m), encode(c)
+
+    if len(a) != len(b):
+        return None
+
+    mask = letter_mask(a)
+
+    if not np.array_equal(mask, letter_mask(b)) or not np.array_equal(a[~mask], b[~mask]):
+        return None
+
+    return (a[mask] - LETTERS[0]).astype(np.int64), (b[mask] - LETTERS[0]).astype(np.int64)
+
+
+def periods(s: np.ndarray) -> List[int]:
+    """Find every period of a sequence, i.e. every p such that `s[i] == s[i + p]` wherever both exist.
+
+    The periods are found from the prefix function of the sequence (as in the Knuth-Morris-Pratt algorithm) in linear
+    time: the periods are the length of the sequence minus the lengths of its borders.
+
+    :param s: The sequence.
+    :return: The periods in increasing order. The length of the sequence is always the last period.
+    """
+    n = len(s)
+    borders = [0] * n
+
+    for i in range(1, n):
+        k = borders[i - 1]
+
+        while k > 0 and s[i] != s[k]:
+            k = borders[k - 1]
+
+        borders[i] = k + 1 if s[i] == s[k] else k
+
+    result = []
+    k = borders[-1] if n else 0
+
+    while k > 0:
+        result.append(n - k)
+        k = borders[k - 1]
+
+    return result + [n]
+
+
+class KnownPlaintextAttack(KnownPlaintextAttackI):
+    """Recovers Caesar, substitution and Vigenere keys from pairs of messages and their ciphertexts.
+
+    Messages must be encrypted from the start of the key, i.e. each pair is a whole message and its ciphertext.
+    """
+
+    def __init__(self, hill_climbing: Optional[HillClimbingAttack] = None):
+        """Create a new known plaintext attack.
+
+        :param hill_climbing: The attack used to guess the mappings of the letters of a substitution key that do not
+                              occur in any of the messages, if another ciphertext is given. If None then a hill climbing
+                              attack with the default options is used.
+        """
+        super().__init__()
+
+        self.hill_climbing = HillClimbingAttack(n_restarts=1) if hill_climbing is None else hill_climbing
+
+    def from_pairs(self, pairs: Sequence[Tuple[Message, CipherText]], cipher_type: Type[CipherI],
+                   key_type: Type[KeyI], c: Optional[CipherText] = None) -> Optional[KeyI]:
+        letters = [letter_pairs(message, ciphertext) for message, ciphertext in pairs]
+
+        if any(pair is None for pair in letters):
+            return None
+
+        if issubclass(key_type, CaesarCipherKey):
+            return self._caesar_key(letters, key_type)
+        elif issubclass(key_type, SubstitutionCipherKey):
+            return self._substitution_key(letters, key_type, c)
+        elif issubclass(key_type, VigenereCipherKey):
+            return self._vigenere_key(letters, key_type)
+
+        raise ValueError('%s does not support %s.' % (self.__class__.__name__, key_type.__name__))
+
+    @staticmethod
+    def _caesar_key(letters: List[Tuple[np.ndarray, np.ndarray]],
+                    key_type: Type[CaesarCipherKey]) -> Optional[CaesarCipherKey]:
+        shifts = np.concatenate([(b - a) % 26 for a, b in letters]) if letters else np.empty(0, dtype=np.int64)
+
+        if len(shifts) == 0:
+            return key_type.get_identity()
+
+        return key_type(int(shifts[0])) if np.all(shifts == shifts[0]) else None
+
+    def _substitution_key(self, letters: List[Tuple[np.ndarray, np.ndarray]], key_type: Type[SubstitutionCipherKey],
+                          c: Optional[CipherText]) -> Optional[SubstitutionCipherKey]:
+        a = np.concatenate([a for a, _ in letters]) if letters else np.empty(0, dtype=np.int64)
+        b = np.concatenate([b for _, b in letters]) if letters else np.empty(0, dtype=np.int64)
+        # The ciphertext letter (by index) of each message letter, or -1 where it is unknown.
+        mapping = np.full(26, -1, dtype=np.int64)
+        mapping[a] = b
+        known = mapping[mapping >= 0]
+
+        # A message letter must always be encrypted to the same letter and no two letters to the same letter.
+        if not np.array_equal(mapping[a], b) or len(np.unique(known)) != len(known):
+            return None
+
+        unknown = np.flatnonzero(mapping < 0)
+        unused = np.setdiff1d(np.arange(26), known)
+
+        if c is not None and len(unknown) > 1:
+            # Start by pairing letters up by how common they are, then only search the mappings that are unknown.
+            unknown = unknown[np.argsort(-get_language_model().letter_frequencies[unknown], kind='stable')]
+            unused = unused[np.argsort(-letter_distribution(c)[unused], kind='stable')]
+
+        mapping[unknown] = unused
+        key = key_type({ascii_uppercase[i]: ascii_uppercase[j] for i, j in enumerate(mapping)})
+
+        if c is not None and len(unknown) > 1:
+            _, key = self.hill_climbing.improve(c, key, ''.join(ascii_uppercase[j] for j in unused))
+
+        return key
+
+    @staticmethod
+    def _vigenere_key(letters: List[Tuple[np.ndarray, np.ndarray]],
+                      key_type: Type[VigenereCipherKey]) -> Optional[VigenereCipherKey]:
+        shifts = sorted([(b - a) % 26 for a, b in letters], key=len, reverse=True)
+
+        if not shifts or len(shifts[0]) == 0:
+            return key_type.get_identity()
+
+        # The shortest period of the longest key stream that the other key streams agree with is the key.
+        for period in periods(shifts[0]):
+            key = shifts[0][:period]
+
+            if all(np.array_equal(s, key[np.arange(len(s)) % period]) for s in shifts[1:]):
+                return key_type(''.join(ascii_uppercase[shift] for shift in key))
+
+        return None
+
+
+class ChosenPlaintextAttack(ChosenPlaintextAttackI):
+    """Recovers Caesar, substitution and Vigenere keys by having a message that reveals the whole key encrypted."""
+
+    def __init__(self, max_key_length: int = 100, known_plaintext_attack: Optional[KnownPlaintextAttack] = None):
+        """Create a new chosen plaintext attack.
+
+        :param max_key_length: The longest Vigenere key that can be recovered.
+        :param known_plaintext_attack: The attack that recovers the key from the chosen message and its ciphertext. If
+                                       None then a known plaintext attack with the default options is used.
+        """
+        super().__init__()
+
+        self.max_key_length = max_key_length
+        self.known_plaintext_attack = KnownPlaintextAttack() if known_plaintext_attack is None \
+            else known_plaintext_attack
+
+    def choose_message(self, key_type: Type[KeyI]) -> Message:
+        """Choose a message that reveals the whole key when it is encrypted.
+
+        :param key_type: The type of key the cipher uses.
+        :return: The message.
+        """
+        if issubclass(key_type, CaesarCipherKey):
+            return Message('A')
+        elif issubclass(key_type, SubstitutionCipherKey):
+            return Message(ascii_uppercase)
+        elif issubclass(key_type, VigenereCipherKey):
+            # The key stream repeats at least twice, so its period is the key (or a key equivalent to it).
+            return Message('A' * (2 * self.max_key_length))
+
+        raise ValueError('%s does not support %s.' % (self.__class__.__name__, key_type.__name__))
+
+    def from_oracle(self, encrypt: Callable[[Message], CipherText], cipher_type: Type[CipherI],
+                    key_type: Type[KeyI]) -> Optional[KeyI]:
+        m = self.choose_message(key_type)
+
+        return self.known_plaintext_attack.from_pairs([(m, encrypt(m))], cipher_type, key_type)
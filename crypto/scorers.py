@@ -0,0 +1,101 @@
+"""This module compares letter histograms to a reference distribution, see `ScorerI`.
+
+Each scorer does the work that only depends on the reference distribution (norms, logarithms and expected proportions)
+once when it is created, so scoring a batch of histograms is a single matrix-vector product plus a few element-wise
+operations.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from crypto.interfaces import ScorerI
+from crypto.language import get_language_model
+
+# The smallest expected proportion of a letter, so that letters that never occur in the reference do not give
+# infinite scores.
+MIN_PROPORTION = 1e-6
+
+
+class ReferenceScorerABC(ScorerI):
+    """A scorer that compares histograms to the letter frequencies of a reference distribution."""
+
+    def __init__(self, reference: Optional[np.ndarray] = None):
+        """Create a scorer.
+
+        :param reference: The frequencies (or counts) of the letters a-z. If None then the letter frequencies of the
+                          English language model are used, see `crypto.language`.
+        """
+        reference = get_language_model().letter_frequencies if reference is None else reference
+        self.reference = np.asarray(reference, dtype=np.float64)
+
+    def __repr__(self):
+        return '%s()' % self.__class__.__name__
+
+    @staticmethod
+    def _prepare(histograms: np.ndarray):
+        """Get a batch of histograms as a 2-D float array along with the total count of each histogram.
+
+        :return: The (n, 26) histograms and a vector of their totals.
+        """
+        histograms = np.atleast_2d(np.asarray(histograms, dtype=np.float64))
+
+        return histograms, histograms.sum(axis=1)
+
+
+class CosineScorer(ReferenceScorerABC):
+    """Scores histograms by the cosine of the angle between them and the reference distribution, in the range
+    [0.0, 1.0].
+    """
+
+    def __init__(self, reference: Optional[np.ndarray] = None):
+        super().__init__(reference)
+
+        self._unit_reference = self.reference / np.linalg.norm(self.reference)
+
+    def score(self, histograms: np.ndarray) -> np.ndarray:
+        histograms, _ = self._prepare(histograms)
+        norms = np.linalg.norm(histograms, axis=1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(norms > 0, histograms @ self._unit_reference / norms, -np.inf)
+
+
+class ChiSquaredScorer(ReferenceScorerABC):
+    """Scores histograms by Pearson's chi-squared statistic between their counts and the counts expected from the
+    reference distribution, negated so that higher scores are better.
+
+    The statistic is `sum((O - N * p) ** 2 / (N * p))` for observed counts `O`, a total of `N` letters and expected
+    proportions `p`, which is computed as `sum(O ** 2 / p) / N - N`. The histograms must hold counts, not frequencies.
+    """
+
+    def __init__(self, reference: Optional[np.ndarray] = None):
+        super().__init__(reference)
+
+        proportions = np.maximum(self.reference / self.reference.sum(), MIN_PROPORTION)
+        self._inverse_proportions = 1 / proportions
+
+    def score(self, histograms: np.ndarray) -> np.ndarray:
+        histograms, totals = self._prepare(histograms)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            chi_squared = (histograms ** 2) @ self._inverse_proportions / totals - totals
+
+        return np.where(totals > 0, -chi_squared, -np.inf)
+
+
+class LogLikelihoodScorer(ReferenceScorerABC):
+    """Scores histograms by the mean log probability of their letters under the reference distribution, i.e. the log
+    likelihood of the letters normalised by their number so that messages of different lengths can be compared.
+    """
+
+    def __init__(self, reference: Optional[np.ndarray] = None):
+        super().__init__(reference)
+
+        self._log_proportions = np.log(np.maximum(self.reference / self.reference.sum(), MIN_PROPORTION))
+
+    def score(self, histograms: np.ndarray) -> np.ndarray:
+        histograms, totals = self._prepare(histograms)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(totals > 0, histograms @ self._log_proportions / totals, -np.inf)
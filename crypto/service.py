@@ -0,0 +1,480 @@
+"""This module runs many independent attacks as a service, e.g. to crack thousands of ciphertexts at once.
+
+Jobs and results are JSON objects, one per line. A job looks like:
+
+    {"id": 1, "ciphertext": "KHOOR ZRUOG", "cipher": "CaesarCipher", "attack": "NGramAttack", "timeout": 10}
+
+with these fields:
+- id: Any JSON value that identifies the job in its result. If missing then the line number is used.
+- ciphertext: The ciphertext to attack.
+- cipher: The name of the cipher that was used, see `CIPHERS`.
+- attack: The name of the attack to use, see `ATTACKS`. Defaults to 'NGramAttack'.
+- key_type: The name of the type of key the cipher uses. Defaults to the cipher's own key type.
+- sampling: How brute-force attacks should sample keys, e.g. {"type": "exhaustive"} (the default) or
+  {"type": "random", "n": 1000, "seed": 1}. Only the integer options in `SAMPLING_OPTIONS` are allowed.
+- options: Other keyword arguments for the attack, e.g. {"chunk_size": 64}. Only the numeric options in `OPTIONS` are
+  allowed, so that jobs cannot make the service read files or start processes.
+- timeout: The number of seconds to give up after, or null for no limit. Defaults to the service's timeout.
+
+A line {"cancel": <id>} cancels the job with that id. Ids only have to be unique among the jobs in flight from the
+same connection, and a connection can only cancel its own jobs. Each job gets exactly one result, written as soon as
+the job finishes (so not necessarily in the order the jobs were given), such as:
+
+    {"id": 1, "status": "ok", "message": "HELLO WORLD", "key": "3", "score": 0.97, "elapsed": 0.01}
+
+where the status is one of 'ok', 'timeout', 'cancelled' or 'error' (with an 'error' field instead of the message).
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from threading import Event
+from time import perf_counter
+from typing import Dict, Any, Optional, Callable, Tuple, Type, AsyncIterator, Awaitable
+
+from crypto.abcs import BruteForceAttackABC
+from crypto.candidates import Candidate
+from crypto.ciphers import CaesarCipher, CaesarCipherKey, SubstitutionCipher, SubstitutionCipherKey, \
+    VigenereCipher, VigenereCipherKey
+from crypto.common_attacks import LetterFrequencyAttack, DictionaryAttack, LanguageAnalysisAttack, NGramAttack, \
+    HillClimbingAttack, IndexOfCoincidenceAttack
+from crypto.interfaces import CipherI, KeyI, CiphertextOnlyAttackI, SamplingStrategyI
+from crypto.strategies import ExhaustiveSampling, RandomSampling, UniqueRandomSampling
+
+# The ciphers that jobs can name, with the type of key each one uses by default.
+CIPHERS: Dict[str, Tuple[Type[CipherI], Type[KeyI]]] = {
+    'CaesarCipher': (CaesarCipher, CaesarCipherKey),
+    'SubstitutionCipher': (SubstitutionCipher, SubstitutionCipherKey),
+    'VigenereCipher': (VigenereCipher, VigenereCipherKey),
+}
+
+# The types of keys that jobs can name.
+KEY_TYPES: Dict[str, Type[KeyI]] = {key_type.__name__: key_type for _, key_type in CIPHERS.values()}
+
+# The attacks that jobs can name.
+ATTACKS: Dict[str, Type[CiphertextOnlyAttackI]] = {
+    attack_type.__name__: attack_type for attack_type in (LetterFrequencyAttack, DictionaryAttack,
+                                                          LanguageAnalysisAttack, NGramAttack, HillClimbingAttack,
+                                                          IndexOfCoincidenceAttack)
+}
+
+
+# The options of attacks that jobs may set. Other options, such as `checkpoint_path` (checkpoints are unpickled) and
+# `n_workers`, are only for trusted callers of `run_job(...)`.
+OPTIONS = ('chunk_size', 'top_k', 'prefix_length', 'margin', 'n_restarts', 'n_iterations', 'seed')
+
+# The options that jobs may set for each type of sampling strategy, see `make_sampling_strategy(...)`.
+SAMPLING_OPTIONS: Dict[str, Tuple[str, ...]] = {
+    'exhaustive': ('part', 'n_parts'),
+    'random': ('n', 'seed'),
+    'unique': ('n', 'seed', 'part', 'n_parts'),
+}
+
+
+def make_sampling_strategy(spec: Optional[Dict[str, Any]]) -> SamplingStrategyI:
+    """Make a sampling strategy from its description in a job.
+
+    :param spec: The description, e.g. {"type": "random", "n": 1000, "seed": 1}. The type is one of 'exhaustive',
+                 'random' or 'unique' (see `UniqueRandomSampling`). If None then keys are sampled exhaustively.
+    :return: The sampling strategy.
+    """
+    spec = dict(spec or {'type': 'exhaustive'})
+    strategy_type = spec.pop('type', 'exhaustive')
+
+    if strategy_type == 'exhaustive':
+        return ExhaustiveSampling(**spec)
+    elif strategy_type == 'random':
+        return RandomSampling(**spec)
+    elif strategy_type == 'unique':
+        return UniqueRandomSampling(**spec)
+
+    raise ValueError('Unknown sampling strategy \'%s\'.' % strategy_type)
+
+
+def run_job(job: Dict[str, Any], stop_event: Optional[Event] = None) -> Dict[str, Any]:
+    """Run one job. This is what the worker processes of `BatchService` run.
+
+    :param job: The job, see the description of this module.
+    :param stop_event: An event that cancels the job once it is set. Brute-force attacks check it between chunks of
+                       keys, other attacks run until they finish.
+    :return: The result (without the status or id), see the description of this module.
+    """
+    start = perf_counter()
+    cipher_type, key_type = CIPHERS[job['cipher']]
+    key_type = KEY_TYPES[job['key_type']] if 'key_type' in job else key_type
+    attack_type = ATTACKS[job.get('attack', 'NGramAttack')]
+    options = job.get('options', {})
+    c = job['ciphertext']
+
+    if issubclass(attack_type, BruteForceAttackABC):
+        attack = attack_type(make_sampling_strategy(job.get('sampling')), **options)
+    else:
+        attack = attack_type(**options)
+
+    if isinstance(attack, BruteForceAttackABC) and type(attack).from_cipher is BruteForceAttackABC.from_cipher \
+            and attack.n_workers == 1:
+        # Search directly rather than through `from_cipher(...)` so that the job can be stopped part of the way.
+        results = attack.search(c, cipher_type, key_type, stop_event=stop_event,
+                                checkpoint_path=attack.checkpoint_path)
+        candidates = [Candidate(score, key, c, cipher_type) for score, key in results]
+        message, key = (candidates[0].message, candidates[0].key) if candidates else (None, None)
+        score = candidates[0].score if candidates else None
+    else:
+        message, key = attack.from_cipher(c, cipher_type, key_type)
+        score = None
+
+    return dict(message=message, key=format_key(key), score=None if score is None else float(score),
+                elapsed=perf_counter() - start)
+
+
+def format_key(key: Optional[KeyI]) -> Optional[str]:
+    """Format a key for a result.
+
+    :param key: The key.
+    :return: The key as a string. Substitution keys are written as the alphabet that 'A' through 'Z' map to.
+    """
+    if key is None:
+        return None
+    elif isinstance(key, SubstitutionCipherKey):
+        return key.alphabet
+
+    return str(key)
+
+
+class BatchService:
+    """Runs jobs on a bounded pool of processes and reports each result as soon as its job finishes.
+
+    At most `max_pending` jobs are queued or running at once. Once that many are in flight, `submit(...)` waits for a
+    job to finish, so a reader that submits jobs as it reads them stops reading until there is room (backpressure).
+
+    Jobs are only handed to the pool when a process is free to run them, so a job's timeout counts the time it runs
+    for and not the time it spends queued behind other jobs. A job keeps its process until the process is done with
+    it, even if the job has already timed out or been cancelled.
+    """
+
+    def __init__(self, n_workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 timeout: Optional[float] = None):
+        """Create a batch service. The pool of processes is started by `start()` or by using the service as an
+        asynchronous context manager.
+
+        :param n_workers: The number of processes to run jobs on. If None then one per CPU is used.
+        :param max_pending: The maximum number of jobs that can be queued or running at once. If None then this is
+                            twice the number of processes.
+        :param timeout: The number of seconds jobs are given to run unless they say otherwise. If None then jobs have
+                        no time limit by default.
+        """
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.n_workers
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # The places for jobs that are in flight, and the processes that are free to run them.
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._workers: Optional[asyncio.Semaphore] = None
+        # The events that cancel each job that is in flight (one for the worker and one for the service), by the
+        # connection that submitted the job and its id.
+        self._jobs: Dict[Tuple[Any, Any], Tuple[Any, asyncio.Event]] = {}
+
+    async def __aenter__(self) -> 'BatchService':
+        self.start()
+
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def start(self):
+        """Start the pool of processes. This must be called from the event loop that the service will be used in."""
+        context = multiprocessing.get_context()
+        self._executor = ProcessPoolExecutor(self.n_workers, mp_context=context)
+        # Start the processes now, before any connections are accepted, or forked processes would hold copies of the
+        # connections open after the service closes them.
+        self._executor.submit(os.getpid).result()
+        # Events that can be shared with the worker processes after they have started.
+        self._manager = context.Manager()
+        self._loop = asyncio.get_event_loop()
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._workers = asyncio.Semaphore(self.n_workers)
+
+    async def close(self):
+        """Cancel any jobs that are in flight and stop the pool of processes."""
+        for connection, job_id in list(self._jobs):
+            self.cancel(job_id, connection)
+
+        await self._loop.run_in_executor(None, self._executor.shutdown)
+        self._manager.shutdown()
+
+    async def submit(self, job: Dict[str, Any], connection: Any = None) -> asyncio.Task:
+        """Queue a job, waiting until there is room for it if `max_pending` jobs are already in flight.
+
+        :param job: The job, see the description of this module. A ValueError is raised if another job from the same
+                    connection with the same id is in flight.
+        :param connection: Identifies whoever submitted the job, e.g. a connection to the service. Only they can
+                           cancel the job.
+        :return: A task that finishes with the result of the job. The task never raises, all failures (including
+                 timeouts and cancellation by `cancel(...)`) are reported in the result.
+        """
+        await self._slots.acquire()
+
+        job_key = (connection, job.get('id'))
+
+        if job_key in self._jobs:
+            self._slots.release()
+
+            raise ValueError('A job with the id %r is already in flight.' % (job.get('id'),))
+
+        stop_event = self._manager.Event()
+        cancelled = asyncio.Event()
+        self._jobs[job_key] = (stop_event, cancelled)
+        task = asyncio.ensure_future(self._run(job, stop_event, cancelled))
+        task.add_done_callback(lambda _: self._forget(job_key, cancelled))
+
+        return task
+
+    def in_flight(self, job_id: Any, connection: Any = None) -> bool:
+        """Check whether a job is in flight.
+
+        :param job_id: The id of the job.
+        :param connection: Whoever submitted the job, see `submit(...)`.
+        :return: True if the job is queued or running, False otherwise.
+        """
+        return (connection, job_id) in self._jobs
+
+    def cancel(self, job_id: Any, connection: Any = None) -> bool:
+        """Cancel a job that is in flight. Its result has the status 'cancelled'.
+
+        :param job_id: The id of the job.
+        :param connection: Whoever submitted the job, see `submit(...)`.
+        :return: True if the job was in flight, False if it had already finished or does not exist.
+        """
+        if not self.in_flight(job_id, connection):
+            return False
+
+        stop_event, cancelled = self._jobs[(connection, job_id)]
+        stop_event.set()
+        cancelled.set()
+
+        return True
+
+    async def _run(self, job: Dict[str, Any], stop_event: Any, cancelled: asyncio.Event) -> Dict[str, Any]:
+        """Wait for a free process, run a job on it and make the job's result.
+
+        :return: The result, see the description of this module. Unexpected errors are reported in the result rather
+                 than raised, so that one bad job cannot stop the others.
+        """
+        try:
+            return await self._run_job(job, stop_event, cancelled)
+        except Exception as e:
+            return dict(id=job.get('id'), status='error', error='%s: %s' % (e.__class__.__name__, e))
+
+    async def _run_job(self, job: Dict[str, Any], stop_event: Any, cancelled: asyncio.Event) -> Dict[str, Any]:
+        """Run a job for `_run(...)`."""
+        worker = asyncio.ensure_future(self._workers.acquire())
+
+        if not await self._first(worker, cancelled):
+            # The job was cancelled before it started.
+            if worker.done() and not worker.cancelled():
+                self._workers.release()
+            else:
+                worker.cancel()
+
+            self._slots.release()
+
+            return dict(id=job.get('id'), status='cancelled')
+
+        future = self._executor.submit(run_job, job, stop_event)
+        # Hold the job's place and process until the process is done with it, even if the job is given up on first.
+        future.add_done_callback(lambda _: self._loop.call_soon_threadsafe(self._release))
+        result_future = asyncio.wrap_future(future)
+        # The result of a job that is given up on is never looked at, so mark any error as seen to avoid warnings.
+        result_future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+        if await self._first(result_future, cancelled, job.get('timeout', self.timeout)):
+            try:
+                result = dict(status='ok', **result_future.result())
+            except Exception as e:
+                result = dict(status='error', error='%s: %s' % (e.__class__.__name__, e))
+        else:
+            # Stop the job part of the way through, if the attack allows it.
+            stop_event.set()
+            result = dict(status='cancelled' if cancelled.is_set() else 'timeout')
+
+        return dict(id=job.get('id'), **result)
+
+    @staticmethod
+    async def _first(future: asyncio.Future, cancelled: asyncio.Event, timeout: Optional[float] = None) -> bool:
+        """Wait for a future to finish unless a job is cancelled or a timeout passes first.
+
+        :return: True if the future finished, False otherwise.
+        """
+        cancelled_future = asyncio.ensure_future(cancelled.wait())
+
+        try:
+            done, _ = await asyncio.wait([future, cancelled_future], timeout=timeout,
+                                         return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            cancelled_future.cancel()
+
+        return future in done and not cancelled.is_set()
+
+    def _release(self):
+        """Free up the process and the place of a job once the process is done with it."""
+        self._workers.release()
+        self._slots.release()
+
+    def _forget(self, job_key: Tuple[Any, Any], cancelled: asyncio.Event):
+        """Stop tracking a job once its result is ready."""
+        if self._jobs.get(job_key, (None, None))[1] is cancelled:
+            del self._jobs[job_key]
+
+    async def serve(self, lines: AsyncIterator[str], emit: Callable[[Dict[str, Any]], Awaitable[None]]):
+        """Run the jobs in a stream of JSON lines and report each result as soon as it is ready.
+
+        Each call is a separate connection, so the ids of its jobs cannot clash with the jobs of other calls and it
+        can only cancel its own jobs.
+
+        :param lines: The lines to read jobs (and cancellations) from.
+        :param emit: The function to report each result with. Invalid lines are reported as errors.
+        """
+        connection = object()
+        tasks = set()
+
+        async def report(task: asyncio.Task):
+            await emit(await task)
+
+        line_number = 0
+
+        async for line in lines:
+            line_number += 1
+
+            if not line.strip():
+                continue
+
+            try:
+                job = json.loads(line)
+                assert isinstance(job, dict), 'A job must be a JSON object.'
+            except (ValueError, AssertionError) as e:
+                await emit(dict(id=None, status='error', error='Invalid job on line %d: %s' % (line_number, e)))
+
+                continue
+
+            if 'cancel' in job:
+                if is_valid_id(job['cancel']):
+                    self.cancel(job['cancel'], connection)
+
+                continue
+
+            job.setdefault('id', line_number)
+            error = validate_job(job)
+
+            if not error and self.in_flight(job['id'], connection):
+                error = 'A job with the id %r is already in flight.' % (job['id'],)
+
+            if error:
+                await emit(dict(id=job['id'], status='error', error=error))
+
+                continue
+
+            report_task = asyncio.ensure_future(report(await self.submit(job, connection)))
+            tasks.add(report_task)
+            report_task.add_done_callback(tasks.discard)
+
+        await asyncio.gather(*tasks)
+
+
+def validate_job(job: Dict[str, Any]) -> Optional[str]:
+    """Check that a job names things that exist, so that mistakes are reported before the job is queued.
+
+    :param job: The job, see the description of this module.
+    :return: A description of what is wrong with the job, or None if nothing is.
+    """
+    options = job.get('options', {})
+    sampling = job.get('sampling') or {'type': 'exhaustive'}
+    timeout = job.get('timeout')
+
+    if not is_valid_id(job.get('id')):
+        return 'The id must not be an array or an object.'
+    elif not isinstance(job.get('ciphertext'), str):
+        return 'The ciphertext must be a string.'
+    elif job.get('cipher') not in CIPHERS:
+        return 'Unknown cipher \'%s\', expected one of %s.' % (job.get('cipher'), ', '.join(CIPHERS))
+    elif 'key_type' in job and job['key_type'] not in KEY_TYPES:
+        return 'Unknown key type \'%s\', expected one of %s.' % (job['key_type'], ', '.join(KEY_TYPES))
+    elif job.get('attack', 'NGramAttack') not in ATTACKS:
+        return 'Unknown attack \'%s\', expected one of %s.' % (job['attack'], ', '.join(ATTACKS))
+    elif timeout is not None and (not is_number(timeout) or timeout < 0):
+        return 'The timeout must be null or a non-negative number.'
+    elif not isinstance(options, dict):
+        return 'The options must be a JSON object.'
+    elif not isinstance(sampling, dict):
+        return 'The sampling strategy must be a JSON object.'
+    elif sampling.get('type', 'exhaustive') not in SAMPLING_OPTIONS:
+        return 'Unknown sampling strategy \'%s\', expected one of %s.' % (sampling['type'],
+                                                                         ', '.join(SAMPLING_OPTIONS))
+
+    for name, value in options.items():
+        if name not in OPTIONS:
+            return 'Unknown option \'%s\', expected one of %s.' % (name, ', '.join(OPTIONS))
+        elif not is_number(value):
+            return 'The option \'%s\' must be a number.' % name
+
+    sampling_options = SAMPLING_OPTIONS[sampling.get('type', 'exhaustive')]
+
+    for name, value in sampling.items():
+        if name == 'type':
+            continue
+        elif name not in sampling_options:
+            return 'Unknown sampling option \'%s\', expected one of %s.' % (name, ', '.join(sampling_options))
+        elif not is_number(value) or not isinstance(value, int):
+            return 'The sampling option \'%s\' must be an integer.' % name
+
+    return None
+
+
+def is_number(value: Any) -> bool:
+    """Check whether a JSON value is a number.
+
+    :param value: The value.
+    :return: True if the value is an integer or a float, False otherwise (including for booleans).
+    """
+    return not isinstance(value, bool) and isinstance(value, (int, float))
+
+
+def is_valid_id(job_id: Any) -> bool:
+    """Check whether a JSON value can be used as the id of a job.
+
+    :param job_id: The value.
+    :return: True if the value is a string, a number, a boolean or null, False if it is an array or an object.
+    """
+    return not isinstance(job_id, (list, dict))
+
+
+async def read_lines(reader: asyncio.StreamReader) -> AsyncIterator[str]:
+    """Read the lines of a stream.
+
+    :param reader: The stream.
+    :return: Yields each line as a string.
+    """
+    while True:
+        line = await reader.readline()
+
+        if not line:
+            return
+
+        yield line.decode('utf-8')
+
+
+def line_writer(writer: asyncio.StreamWriter) -> Callable[[Dict[str, Any]], Awaitable[None]]:
+    """Get a function that writes results to a stream as JSON lines.
+
+    :param writer: The stream.
+    :return: The function.
+    """
+    async def emit(result: Dict[str, Any]):
+        writer.write((json.dumps(result) + '\n').encode('utf-8'))
+        await writer.drain()
+
+    return emit
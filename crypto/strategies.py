@@ -1,28 +1,278 @@
-from typing import Type, Generator, Optional
+import copy
+import hashlib
+import math
+from random import Random
+from typing import Type, Generator, Optional, List, Tuple, Dict, Any
 
 from crypto.interfaces import SamplingStrategyI, KeyI
+from crypto.key_space import KeySpace
 
 
 class ExhaustiveSampling(SamplingStrategyI):
-    def sample(self, key_type: Type[KeyI]) -> Generator[KeyI, None, None]:
-        yield from key_type.get_space()
+    def __init__(self, part: int = 0, n_parts: int = 1):
+        """Create an exhaustive sampler.
+
+        :param part: The index of the range of the key space to sample.
+        :param n_parts: The number of contiguous ranges the key space is split into. This is used to split the key
+                        space between several samplers.
+        """
+        assert 0 <= part < n_parts, 'Invalid part %d of %d.' % (part, n_parts)
+
+        self.part = part
+        self.n_parts = n_parts
+
+    def get_range(self, key_type: Type[KeyI]) -> KeySpace:
+        """Get the range of a key space that this sampler covers.
+
+        :param key_type: The type of key whose key space should be sampled.
+        :return: The range of the key space.
+        """
+        return key_type.get_space().split(self.n_parts)[self.part]
+
+    def sample(self, key_type: Type[KeyI], *, start: int = 0) -> Generator[KeyI, None, None]:
+        yield from self.get_range(key_type)[start:]
+
+    def get_params(self) -> Dict[str, Any]:
+        return dict(part=self.part, n_parts=self.n_parts)
+
+    def getstate(self):
+        # The position in the key space is all the state there is, and that is given by `start`.
+        return None
+
+    def setstate(self, state):
+        pass
+
+    def partition(self, n_parts: int) -> List['ExhaustiveSampling']:
+        # Splitting each of this sampler's n ranges into n_parts ranges gives the same boundaries as splitting the whole
+        # key space into n * n_parts ranges.
+        return [ExhaustiveSampling(self.part * n_parts + i, self.n_parts * n_parts) for i in range(n_parts)]
 
 
 class RandomSampling(SamplingStrategyI):
-    def __init__(self, n: int = 1000):
+    def __init__(self, n: int = 1000, seed: Optional[int] = None):
         """Create a random sampler.
 
         :param n: Default number of samples to generate before stopping.
+        :param seed: The seed for the random number generator, so that the same keys are sampled every time. If None
+                     then the generator is seeded from the operating system's source of randomness.
         """
         self.n = n
+        self.seed = seed
+        self.random = Random(seed)
 
-    def sample(self, key_type: Type[KeyI], n: Optional[int] = None) -> Generator[KeyI, None, None]:
+    def sample(self, key_type: Type[KeyI], n: Optional[int] = None, *,
+               start: int = 0) -> Generator[KeyI, None, None]:
         """Generate samples from a key space.
 
+        :param key_type: The type of key whose key space should be sampled.
         :param n: Number of samples to generate before stopping. If None then the default value set via the
                   constructor is used.
-        :param key_type: The type of key whose key space should be sampled.
+        :param start: The number of samples that have already been generated, see `SamplingStrategyI.sample(...)`.
         :return: Yields keys sampled from a key space.
         """
-        for _ in range(n if n else self.n):
-            yield key_type.generate_random()
+        for _ in range(start, n if n else self.n):
+            yield key_type.generate_random(rng=self.random)
+
+    def get_params(self) -> Dict[str, Any]:
+        return dict(n=self.n, seed=self.seed)
+
+    def getstate(self):
+        return self.random.getstate()
+
+    def setstate(self, state):
+        self.random.setstate(state)
+
+    def partition(self, n_parts: int) -> List['RandomSampling']:
+        # Each part gets its own seed so that the parts do not sample the same keys.
+        return [self._seeded(RandomSampling(self.n // n_parts + (1 if i < self.n % n_parts else 0)))
+                for i in range(n_parts)]
+
+    def _seeded(self, part: 'RandomSampling') -> 'RandomSampling':
+        """Seed a part of this sampler from this sampler's random number generator.
+
+        :param part: The part.
+        :return: The part. Its seed is only recorded if this sampler's is, so that the parameters of the parts of an
+                 unseeded sampler are the same every time (see `get_params()`).
+        """
+        seed = self.random.getrandbits(64)
+        part.random.seed(seed)
+        part.seed = None if self.seed is None else seed
+
+        return part
+
+
+class BitSet:
+    """A set of the integers in the range [0, size) that takes one bit per integer."""
+
+    def __init__(self, size: int):
+        """Create an empty set.
+
+        :param size: The number of integers the set can hold.
+        """
+        self.size = size
+        self.bits = bytearray((size + 7) // 8)
+
+    def __contains__(self, i: int) -> bool:
+        byte, bit = divmod(i, 8)
+
+        return bool(self.bits[byte] & (1 << bit))
+
+    def add(self, i: int) -> bool:
+        """Add an integer to the set.
+
+        :param i: The integer.
+        :return: True if the integer was not in the set already, False otherwise.
+        """
+        byte, bit = divmod(i, 8)
+        mask = 1 << bit
+
+        if self.bits[byte] & mask:
+            return False
+
+        self.bits[byte] |= mask
+
+        return True
+
+
+class BloomFilter:
+    """A probabilistic set of integers whose size only depends on how many integers it is expected to hold.
+
+    Integers that were added are always found, but integers that were not added are also found with a probability of
+    about `error_rate` once `capacity` integers have been added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 1e-3):
+        """Create an empty Bloom filter.
+
+        :param capacity: The number of integers the filter is expected to hold.
+        :param error_rate: The probability of finding an integer that was not added, once the filter is full.
+        """
+        assert capacity > 0, 'The capacity must be positive.'
+        assert 0 < error_rate < 1, 'The error rate must be in the range (0, 1).'
+
+        self.n_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.n_hashes = max(1, round(self.n_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.n_bits + 7) // 8)
+
+    def __contains__(self, i: int) -> bool:
+        return all(self.bits[byte] & (1 << bit) for byte, bit in self._positions(i))
+
+    def add(self, i: int) -> bool:
+        """Add an integer to the filter.
+
+        :param i: The (non-negative) integer.
+        :return: True if the integer was definitely not in the filter already, False if it probably was.
+        """
+        added = False
+
+        for byte, bit in self._positions(i):
+            mask = 1 << bit
+
+            if not self.bits[byte] & mask:
+                self.bits[byte] |= mask
+                added = True
+
+        return added
+
+    def _positions(self, i: int) -> List[Tuple[int, int]]:
+        """Get the bits that an integer sets.
+
+        :param i: The (non-negative) integer.
+        :return: The byte and the bit within the byte of each of the integer's `n_hashes` bits.
+        """
+        # Derive all of the bit positions from two well mixed hashes (double hashing). Unlike `hash(...)`, which is the
+        # identity for small integers, this spreads consecutive integers over the whole filter.
+        digest = hashlib.blake2b(i.to_bytes(i.bit_length() // 8 + 1, 'little'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+
+        return [divmod((h1 + k * h2) % self.n_bits, 8) for k in range(self.n_hashes)]
+
+
+class UniqueRandomSampling(RandomSampling):
+    """A random sampler that never samples the same key twice.
+
+    Keys are drawn uniformly by their position in the key space and keys that were already sampled are drawn again.
+    Sampled keys are remembered by their position: in a `BitSet` if the key space is small enough, otherwise in a
+    `BloomFilter` sized for `n` keys, which rarely (with probability `error_rate`) skips a key that was not sampled.
+    If `n` is at least the size of the key space then every key is sampled in order, like `ExhaustiveSampling` does.
+
+    When the sampler is partitioned, each part only samples the keys whose position modulo the number of parts is the
+    part's index, so no two parts sample the same key either. Positions are drawn from the part's share directly, so
+    partitioning does not make sampling any slower.
+    """
+
+    def __init__(self, n: int = 1000, seed: Optional[int] = None, part: int = 0, n_parts: int = 1,
+                 max_bits: int = 2 ** 23, error_rate: float = 1e-3, max_retries: int = 1000):
+        """Create a deduplicating random sampler.
+
+        :param n: Default number of samples to generate before stopping.
+        :param seed: The seed for the random number generator, so that the same keys are sampled every time. If None
+                     then the generator is seeded from the operating system's source of randomness.
+        :param part: The index of the share of the key space to sample.
+        :param n_parts: The number of shares the key space is split into, see `partition(...)`.
+        :param max_bits: The largest (share of a) key space to remember sampled keys for exactly, at one bit per key.
+        :param error_rate: The false positive rate of the Bloom filter used for larger key spaces.
+        :param max_retries: The most keys in a row that may turn out to have been sampled already before the share of
+                            the key space is considered exhausted.
+        """
+        super().__init__(n, seed)
+
+        assert 0 <= part < n_parts, 'Invalid part %d of %d.' % (part, n_parts)
+        assert max_retries > 0, 'The number of retries must be positive.'
+
+        self.part = part
+        self.n_parts = n_parts
+        self.max_bits = max_bits
+        self.error_rate = error_rate
+        self.max_retries = max_retries
+        self._visited = None
+
+    def sample(self, key_type: Type[KeyI], n: Optional[int] = None, *,
+               start: int = 0) -> Generator[KeyI, None, None]:
+        n = n if n else self.n
+        size = key_type.get_space_size()
+        # The number of keys in this sampler's share of the key space.
+        share_size = max(0, size - self.part + self.n_parts - 1) // self.n_parts
+
+        if n >= share_size:
+            for index in range(self.part + start * self.n_parts, size, self.n_parts):
+                yield key_type.key_at(index)
+
+            return
+
+        if start == 0 or self._visited is None:
+            self._visited = BitSet(share_size) if share_size <= self.max_bits else BloomFilter(n, self.error_rate)
+
+        for i in range(start, n):
+            for _ in range(self.max_retries):
+                r = self.random.randrange(share_size)
+
+                if self._visited.add(r):
+                    break
+            else:
+                raise RuntimeError('Part %d of %d of the key space is exhausted after %d of %d samples: the last %d '
+                                   'keys drawn were all sampled already.'
+                                   % (self.part, self.n_parts, i, n, self.max_retries))
+
+            yield key_type.key_at(self.part + self.n_parts * r)
+
+    def get_params(self) -> Dict[str, Any]:
+        return dict(super().get_params(), part=self.part, n_parts=self.n_parts, max_bits=self.max_bits,
+                    error_rate=self.error_rate, max_retries=self.max_retries)
+
+    def getstate(self):
+        return self.random.getstate(), copy.deepcopy(self._visited)
+
+    def setstate(self, state):
+        random_state, visited = state
+        self.random.setstate(random_state)
+        self._visited = copy.deepcopy(visited)
+
+    def partition(self, n_parts: int) -> List['UniqueRandomSampling']:
+        # Splitting each share into n_parts shares by position modulo n_parts gives the shares of the whole key space
+        # modulo n * n_parts, and each part gets its own seed.
+        return [self._seeded(UniqueRandomSampling(self.n // n_parts + (1 if i < self.n % n_parts else 0), None,
+                                                  self.part + self.n_parts * i, self.n_parts * n_parts, self.max_bits,
+                                                  self.error_rate, self.max_retries))
+                for i in range(n_parts)]
@@ -0,0 +1,56 @@
+"""This module builds and caches the translation tables of ciphers that map each letter onto a fixed letter."""
+
+from functools import lru_cache
+from string import ascii_uppercase
+
+import numpy as np
+
+
+class TranslationTable:
+    """A mapping of the letters A-Z onto another alphabet in the forms needed to translate strings, bytes and arrays.
+
+    Every other character (e.g. whitespace) is mapped onto itself.
+    """
+
+    def __init__(self, alphabet: str):
+        """Create a translation table.
+
+        :param alphabet: The 26 letters that 'A' through 'Z' should be mapped to, in order.
+        """
+        self.alphabet = alphabet
+        # For `str.translate(...)`.
+        self.str_table = str.maketrans(ascii_uppercase, alphabet)
+        # For `bytes.translate(...)`.
+        self.bytes_table = bytes.maketrans(ascii_uppercase.encode('ascii'), alphabet.encode('ascii'))
+        # A (read-only) 256 element uint8 lookup table for indexing encoded messages, see `ciphers.utils.substitute`.
+        self.array = np.frombuffer(self.bytes_table, dtype=np.uint8)
+
+    def __repr__(self):
+        return '%s(alphabet=%s)' % (self.__class__.__name__, self.alphabet)
+
+
+@lru_cache(maxsize=1024)
+def translation_table(alphabet: str) -> TranslationTable:
+    """Get the translation table for an alphabet.
+
+    Tables are kept in a bounded least-recently-used cache, so keys with the same value share one table (e.g. the same
+    Caesar shift being tried on many ciphertexts).
+
+    :param alphabet: The 26 letters that 'A' through 'Z' should be mapped to, in order.
+    :return: The translation table.
+    """
+    return TranslationTable(alphabet)
+
+
+def inverse_alphabet(alphabet: str) -> str:
+    """Get the alphabet that undoes the mapping given by another alphabet.
+
+    :param alphabet: The 26 letters that 'A' through 'Z' are mapped to, in order.
+    :return: The 26 letters that those letters should be mapped back to, in order.
+    """
+    inverse = [''] * len(ascii_uppercase)
+
+    for letter, mapped_letter in zip(ascii_uppercase, alphabet):
+        inverse[ord(mapped_letter) - ord('A')] = letter
+
+    return ''.join(inverse)
@@ -1,6 +1,8 @@
-from typing import NewType, TypeVar
+from mmap import mmap
+from typing import NewType, TypeVar, Union
 
 T = TypeVar('T')
-KeySpace = NewType('KeySpace', set)  # Set[KeyI]
 CipherText = NewType('CipherText', str)
 Message = NewType('Message', str)
+# Objects that messages and ciphertexts can be read from (and written to) without copying, e.g. a memory-mapped file.
+Buffer = Union[bytes, bytearray, memoryview, mmap]
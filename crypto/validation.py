@@ -0,0 +1,24 @@
+"""This module checks that messages and ciphertexts are in the format the ciphers expect."""
+
+import re
+from typing import Union
+
+from crypto.types import Message, CipherText, Buffer
+
+# Messages and ciphertexts may only contain uppercase letters and ASCII whitespace.
+VALID_TEXT = re.compile(r'[A-Z \t\n\r\x0b\x0c]*')
+VALID_BYTES = re.compile(VALID_TEXT.pattern.encode('ascii'))
+
+
+def is_valid(x: Union[Message, CipherText, Buffer]) -> bool:
+    """Check if a given message or ciphertext are in a valid format.
+
+    The check is a single regular expression match, which runs in C. Buffers (e.g. bytes or a memory-mapped file) are
+    matched in place without being copied.
+
+    :param x: The message or ciphertext to check. This may also be a buffer of ASCII codes.
+    :return: True if the message or ciphertext is valid, False otherwise.
+    """
+    pattern = VALID_TEXT if isinstance(x, str) else VALID_BYTES
+
+    return pattern.fullmatch(x) is not None
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import sys
+from typing import Optional, Dict, Any, AsyncIterator, TextIO
+
+import plac
+
+from crypto.service import BatchService, read_lines, line_writer
+
+
+async def read_text_lines(f: TextIO) -> AsyncIterator[str]:
+    """Read the lines of a text file (e.g. stdin, which may be a pipe or a redirected file) without blocking the event
+    loop.
+
+    :param f: The file.
+    :return: Yields each line.
+    """
+    loop = asyncio.get_event_loop()
+
+    while True:
+        line = await loop.run_in_executor(None, f.readline)
+
+        if not line:
+            return
+
+        yield line
+
+
+async def write_stdout(result: Dict[str, Any]):
+    print(json.dumps(result), flush=True)
+
+
+async def run(socket: Optional[str], port: Optional[int], workers: Optional[int], pending: Optional[int],
+              timeout: Optional[float]):
+    async with BatchService(workers, pending, timeout) as service:
+        if socket is None and port is None:
+            await service.serve(read_text_lines(sys.stdin), write_stdout)
+
+            return
+
+        async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            try:
+                await service.serve(read_lines(reader), line_writer(writer))
+            finally:
+                writer.close()
+
+        if socket is not None:
+            server = await asyncio.start_unix_server(handle_connection, socket)
+        else:
+            server = await asyncio.start_server(handle_connection, '127.0.0.1', port)
+
+        print('Listening on %s.' % (socket or '127.0.0.1:%d' % port), file=sys.stderr)
+
+        async with server:
+            await server.serve_forever()
+
+
+@plac.annotations(
+    socket=plac.Annotation('Serve jobs on a Unix domain socket at this path instead of reading stdin.', kind='option',
+                           type=str, abbrev='s'),
+    port=plac.Annotation('Serve jobs on this TCP port of localhost instead of reading stdin.', kind='option',
+                         type=int),
+    workers=plac.Annotation('The number of processes to run jobs on. Defaults to one per CPU.', kind='option',
+                            type=int, abbrev='w'),
+    pending=plac.Annotation('The maximum number of jobs that can be queued or running at once. Defaults to twice the '
+                            'number of processes.', kind='option', type=int),
+    timeout=plac.Annotation('The number of seconds to give each job, unless the job says otherwise.', kind='option',
+                            type=float, abbrev='t')
+)
+def main(socket: Optional[str] = None, port: Optional[int] = None, workers: Optional[int] = None,
+         pending: Optional[int] = None, timeout: Optional[float] = None) -> int:
+    """A service that attacks many ciphertexts at once.
+
+    Jobs are read as JSON lines (from stdin, or from each connection to the socket) and results are written as JSON
+    lines as soon as each job finishes. See `crypto.service` for the format of jobs and results.
+    """
+    try:
+        asyncio.run(run(socket, port, workers, pending, timeout))
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+if __name__ == '__main__':
+    plac.call(main)
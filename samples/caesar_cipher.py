@@ -1,3 +1,4 @@
+import sys
 from typing import Optional
 
 import plac
@@ -8,16 +9,27 @@ from crypto.common_attacks import LetterFrequencyAttack, DictionaryAttack, Langu
 from crypto.metrics import print_attack_summary
 from crypto.strategies import ExhaustiveSampling
 from crypto.types import Message
+from samples.pipe import run_pipe
 
 
 @plac.annotations(
     key=plac.Annotation("The key to use for the caesar cipher. This is typically an integer in the range [0, 25]."
                         "If not specified then a key is chosen at random.", kind='option', type=int),
-    filename=plac.Annotation('The name of a file to use as the message.', kind='option', type=str, abbrev='f')
+    filename=plac.Annotation('The name of a file to use as the message.', kind='option', type=str, abbrev='f'),
+    pipe=plac.Annotation('Encrypt the file (or stdin if no file is given) to stdout in chunks instead of running the '
+                         'demonstration. If no key is given then the random key is written to stderr.', kind='flag',
+                         abbrev='p'),
+    decrypt=plac.Annotation('In pipe mode, decrypt instead of encrypt.', kind='flag', abbrev='d')
 )
-def main(key: Optional[int] = None, filename: Optional[str] = None) -> int:
+def main(key: Optional[int] = None, filename: Optional[str] = None, pipe: bool = False, decrypt: bool = False) -> int:
     """A demonstration of the Caesar cipher."""
 
+    if pipe:
+        key = CaesarCipherKey(key) if key is not None else CaesarCipherKey.generate_random()
+        print('Key: %s' % key, file=sys.stderr)
+
+        return run_pipe(CaesarCipher(), key, filename, decrypt)
+
     if filename:
         with open(filename, 'r') as f:
             message = Message(f.read())
@@ -0,0 +1,26 @@
+"""Helpers for using the demos in shell pipelines."""
+
+import sys
+from typing import Optional
+
+from crypto.interfaces import CipherI, KeyI
+
+
+def run_pipe(cipher: CipherI, key: KeyI, filename: Optional[str] = None, decrypt: bool = False) -> int:
+    """Encrypt or decrypt a file or stdin to stdout, one chunk at a time.
+
+    :param cipher: The cipher to use.
+    :param key: The key to use.
+    :param filename: The name of the file to read. If None then stdin is read.
+    :param decrypt: Whether to decrypt instead of encrypt.
+    :return: The exit code.
+    """
+    transform = cipher.decrypt_stream if decrypt else cipher.encrypt_stream
+
+    if filename:
+        with open(filename, 'r') as f:
+            transform(f, sys.stdout, key)
+    else:
+        transform(sys.stdin, sys.stdout, key)
+
+    return 0
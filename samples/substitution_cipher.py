@@ -1,27 +1,44 @@
+import sys
+from string import ascii_uppercase
 from typing import Optional
 
 import plac
 
 from crypto.ciphers.substitution import SubstitutionCipher, SubstitutionCipherKey
 from crypto.ciphers.utils import is_valid
-from crypto.common_attacks import LetterFrequencyAttack, DictionaryAttack, LanguageAnalysisAttack
+from crypto.common_attacks import LetterFrequencyAttack, DictionaryAttack, LanguageAnalysisAttack, HillClimbingAttack
 from crypto.metrics import print_attack_summary
 from crypto.strategies import RandomSampling
 from crypto.types import Message
+from samples.pipe import run_pipe
 
 
-# TODO: Allow key to be set by user
 @plac.annotations(
     n_samples=plac.Annotation(
         "The max number of keys an attacker can sample. Set to a higher number if you are willing to wait longer.",
         kind='option',
         type=int),
-    filename=plac.Annotation('The name of a file to use as the message.', kind='option', type=str, abbrev='f')
+    filename=plac.Annotation('The name of a file to use as the message.', kind='option', type=str, abbrev='f'),
+    n_restarts=plac.Annotation('The number of times the hill climbing attack restarts its search from a random key.',
+                               kind='option', type=int),
+    key=plac.Annotation('The key to use, given as the 26 letters that the letters A-Z are mapped to, e.g. '
+                        'QWERTYUIOPASDFGHJKLZXCVBNM. If not specified then a key is chosen at random.', kind='option',
+                        type=str),
+    pipe=plac.Annotation('Encrypt the file (or stdin if no file is given) to stdout in chunks instead of running the '
+                         'demonstration. If no key is given then the random key is written to stderr.', kind='flag',
+                         abbrev='p'),
+    decrypt=plac.Annotation('In pipe mode, decrypt instead of encrypt.', kind='flag', abbrev='d')
 )
-def main(n_samples: int = 1000, filename: Optional[str] = None) -> int:
+def main(n_samples: int = 1000, filename: Optional[str] = None, n_restarts: int = 5, key: Optional[str] = None,
+         pipe: bool = False, decrypt: bool = False) -> int:
     """A demonstration of the substitution cipher."""
     cipher = SubstitutionCipher()
-    key = SubstitutionCipherKey.generate_random()
+    key = SubstitutionCipherKey(dict(zip(ascii_uppercase, key))) if key else SubstitutionCipherKey.generate_random()
+
+    if pipe:
+        print('Key: %s' % ''.join(key.value[char] for char in ascii_uppercase), file=sys.stderr)
+
+        return run_pipe(cipher, key, filename, decrypt)
 
     if filename:
         with open(filename, 'r') as f:
@@ -51,6 +68,9 @@ def main(n_samples: int = 1000, filename: Optional[str] = None) -> int:
     attacker3 = LanguageAnalysisAttack(sampling_strategy)
     print_attack_summary(attacker3, message, ciphertext, SubstitutionCipher, SubstitutionCipherKey)
 
+    attacker4 = HillClimbingAttack(n_restarts)
+    print_attack_summary(attacker4, message, ciphertext, SubstitutionCipher, SubstitutionCipherKey)
+
     return 0
 
 
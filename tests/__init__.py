@@ -2,9 +2,24 @@
 
 # Import test suites so that they can be automatically found by unittest.
 from tests.abcs import TestABCs
+from tests.benchmarks import TestBenchmarks
+from tests.candidates import TestCandidates
+from tests.checkpoint import TestCheckpoint
 from tests.ciphers.caesar import CaeserCipherTests
+from tests.ciphers.otp import OneTimePadCipherTests
 from tests.ciphers.substitution import SubstitutionCipherTests
 from tests.ciphers.vigenere import VigenereCipherTests
 from tests.common_attacks import TestCommonAttacks
+from tests.dictionaries import TestDictionaries
+from tests.instrumentation import TestInstrumentation
 from tests.interfaces import TestInterfaces
+from tests.key_space import TestKeySpace
+from tests.language import TestLanguage
+from tests.metrics import TestMetrics
+from tests.plaintext_attacks import TestPlaintextAttacks
 from tests.samples import TestSamples
+from tests.scorers import TestScorers
+from tests.service import TestService
+from tests.strategies import TestStrategies
+from tests.translation import TestTranslation
+from tests.validation import TestValidation
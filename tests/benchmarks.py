@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+
+from benchmarks.cases import get_benchmarks, read_texts, GROUPS
+from benchmarks.harness import Benchmark, run_benchmarks, compare, save_report, load_report
+from crypto.language import read_corpus
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_benchmarks_run(self):
+        benchmarks = get_benchmarks(GROUPS, sizes=[64], attack_sizes=[64])
+
+        self.assertEqual(len(set(b.name for b in benchmarks)), len(benchmarks), 'Benchmark names must be unique.')
+
+        # Running every benchmark takes too long for a unit test, so only run the first one of each group.
+        smoke = [next(b for b in benchmarks if b.group == group) for group in GROUPS]
+        report = run_benchmarks(smoke, repeat=1, min_time=0.0)
+
+        self.assertEqual([result['name'] for result in report['results']], [b.name for b in smoke])
+        self.assertEqual([result['group'] for result in report['results']], list(GROUPS))
+
+        for result in report['results']:
+            self.assertGreater(result['best'], 0.0)
+            self.assertGreater(result['mb_per_s'], 0.0)
+
+    def test_texts_are_held_out_from_the_corpus(self):
+        texts = read_texts()
+
+        self.assertNotIn(' '.join(read_corpus().split()[:50]), texts.upper())
+        self.assertIn('MACBETH', texts.upper())
+
+    def test_report_round_trips_through_file(self):
+        report = run_benchmarks([Benchmark('noop', 'test', lambda: lambda: None)], repeat=1, min_time=0.0)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.json')
+            save_report(report, path)
+
+            self.assertEqual(load_report(path), report)
+
+    def test_compare_flags_regressions(self):
+        baseline = [dict(name='a', best=1.0), dict(name='b', best=1.0), dict(name='c', best=1.0)]
+        results = [dict(name='a', best=1.1), dict(name='b', best=1.5), dict(name='d', best=1.0)]
+
+        comparisons = compare(results, baseline, tolerance=0.2)
+
+        self.assertEqual([comparison['name'] for comparison in comparisons], ['a', 'b'],
+                         'Only benchmarks in both runs should be compared.')
+        self.assertEqual([comparison['regression'] for comparison in comparisons], [False, True])
+        self.assertAlmostEqual(comparisons[1]['ratio'], 1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
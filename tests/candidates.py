@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+
+from crypto.candidates import CandidateHeap, rerank
+from crypto.ciphers.caesar import CaesarCipher, CaesarCipherKey
+from crypto.common_attacks import LetterFrequencyAttack, NGramAttack
+from crypto.metrics import ratio_tokens_in_dict
+from crypto.strategies import ExhaustiveSampling
+from crypto.types import Message
+
+
+class TestCandidates(unittest.TestCase):
+    def test_heap_keeps_highest_scores(self):
+        heap = CandidateHeap(4)
+        keys = list(CaesarCipherKey.get_space())
+        scores = np.arange(26) % 7
+
+        heap.push_many(scores[:13], keys[:13])
+        heap.push_many(scores[13:], keys[13:])
+
+        # Ties are broken in favour of the keys that were pushed first.
+        self.assertEqual(heap.items(), [(6, keys[6]), (6, keys[13]), (6, keys[20]), (5, keys[5])])
+        self.assertEqual(heap.best_score, 6)
+        self.assertEqual(heap.min_score, 5)
+
+    def test_top_candidates_are_sorted_and_lazy(self):
+        m = Message('THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG')
+        k = CaesarCipherKey(4)
+        c = CaesarCipher().encrypt(m, k)
+
+        attack = NGramAttack(ExhaustiveSampling(), top_k=5)
+        candidates = attack.top_candidates(c, CaesarCipher, CaesarCipherKey)
+
+        self.assertEqual(len(candidates), 5)
+        self.assertEqual(candidates[0].key, k)
+        self.assertEqual(len(set(candidate.key for candidate in candidates)), 5)
+        self.assertEqual([candidate.score for candidate in candidates],
+                         sorted((candidate.score for candidate in candidates), reverse=True))
+        self.assertIsNone(candidates[1]._message, 'Messages should only be decrypted when they are asked for.')
+        self.assertEqual(candidates[0].message, m)
+
+    def test_parallel_top_candidates_match_serial(self):
+        c = CaesarCipher().encrypt(Message('HELLO WORLD'), CaesarCipherKey(9))
+
+        serial = LetterFrequencyAttack(ExhaustiveSampling(), top_k=4).top_candidates(c, CaesarCipher, CaesarCipherKey)
+        parallel = LetterFrequencyAttack(ExhaustiveSampling(), top_k=4, n_workers=2) \
+            .top_candidates(c, CaesarCipher, CaesarCipherKey)
+
+        self.assertEqual([(x.score, x.key) for x in serial], [(x.score, x.key) for x in parallel])
+
+    def test_rerank(self):
+        c = CaesarCipher().encrypt(Message('HELLO WORLD'), CaesarCipherKey(9))
+        candidates = LetterFrequencyAttack(ExhaustiveSampling(), top_k=26).top_candidates(c, CaesarCipher,
+                                                                                           CaesarCipherKey)
+
+        self.assertEqual(rerank(candidates, ratio_tokens_in_dict)[0].key, CaesarCipherKey(9))
+
+
+if __name__ == '__main__':
+    unittest.main()
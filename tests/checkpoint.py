@@ -0,0 +1,129 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from crypto.checkpoint import load_checkpoint, fingerprint
+from crypto.ciphers.caesar import CaesarCipher, CaesarCipherKey
+from crypto.ciphers.vigenere import VigenereCipher, VigenereCipherKey
+from crypto.common_attacks import NGramAttack
+from crypto.strategies import RandomSampling, ExhaustiveSampling, UniqueRandomSampling
+from crypto.types import Message
+
+
+class InterruptedNGramAttack(NGramAttack):
+    """An n-gram attack that is killed part of the way through a search."""
+
+    def __init__(self, *args, n_chunks: int, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.n_chunks = n_chunks
+
+    def score_many(self, candidates: np.ndarray) -> np.ndarray:
+        if self.n_chunks == 0:
+            raise KeyboardInterrupt
+
+        self.n_chunks -= 1
+
+        return super().score_many(candidates)
+
+
+class CountingRandomSampling(RandomSampling):
+    """A random sampler that counts how often its state is taken."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.n_getstate = 0
+
+    def getstate(self):
+        self.n_getstate += 1
+
+        return super().getstate()
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'search.ckpt')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_resumed_random_search_matches_uninterrupted_search(self):
+        c = VigenereCipher().encrypt(Message('IT WAS THE BEST OF TIMES IT WAS THE WORST OF TIMES'),
+                                     VigenereCipherKey('KEY'))
+        options = dict(chunk_size=10, top_k=3, checkpoint_path=self.path, checkpoint_interval=0)
+
+        with self.assertRaises(KeyboardInterrupt):
+            InterruptedNGramAttack(RandomSampling(100, seed=1), n_chunks=4, **options) \
+                .top_candidates(c, VigenereCipher, VigenereCipherKey)
+
+        checkpoint = load_checkpoint(self.path)
+        self.assertEqual(checkpoint.position, 40)
+        self.assertFalse(checkpoint.finished)
+
+        # Only the 60 keys that were not scored before the interruption should be scored after resuming.
+        resumed = InterruptedNGramAttack(RandomSampling(100, seed=1), n_chunks=6, **options) \
+            .top_candidates(c, VigenereCipher, VigenereCipherKey)
+        uninterrupted = NGramAttack(RandomSampling(100, seed=1), chunk_size=10, top_k=3) \
+            .top_candidates(c, VigenereCipher, VigenereCipherKey)
+
+        self.assertEqual([(candidate.score, candidate.key) for candidate in resumed],
+                         [(candidate.score, candidate.key) for candidate in uninterrupted])
+        self.assertTrue(load_checkpoint(self.path).finished)
+        self.assertGreater(load_checkpoint(self.path).elapsed, checkpoint.elapsed)
+
+    def test_sampling_state_is_only_taken_when_saving(self):
+        c = CaesarCipher().encrypt(Message('THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG'), CaesarCipherKey(7))
+        sampling_strategy = CountingRandomSampling(100, seed=1)
+
+        NGramAttack(sampling_strategy, chunk_size=10, checkpoint_path=self.path, checkpoint_interval=3600) \
+            .top_candidates(c, CaesarCipher, CaesarCipherKey)
+
+        # Only the final save happens within the interval.
+        self.assertEqual(sampling_strategy.n_getstate, 1)
+        self.assertTrue(load_checkpoint(self.path).finished)
+
+    def test_finished_search_is_not_repeated(self):
+        c = CaesarCipher().encrypt(Message('THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG'), CaesarCipherKey(7))
+
+        _, key = NGramAttack(ExhaustiveSampling(), checkpoint_path=self.path).from_cipher(c, CaesarCipher,
+                                                                                         CaesarCipherKey)
+        _, resumed_key = InterruptedNGramAttack(ExhaustiveSampling(), n_chunks=0, checkpoint_path=self.path) \
+            .from_cipher(c, CaesarCipher, CaesarCipherKey)
+
+        self.assertEqual(key, CaesarCipherKey(7))
+        self.assertEqual(resumed_key, key)
+
+    def test_checkpoint_for_other_ciphertext_is_rejected(self):
+        attack = NGramAttack(ExhaustiveSampling(), checkpoint_path=self.path)
+        attack.from_cipher('ABC', CaesarCipher, CaesarCipherKey)
+
+        with self.assertRaises(AssertionError):
+            attack.from_cipher('XYZ', CaesarCipher, CaesarCipherKey)
+
+    def test_checkpoint_for_other_sampling_strategy_is_rejected(self):
+        NGramAttack(RandomSampling(10, seed=1), checkpoint_path=self.path).from_cipher('ABC', CaesarCipher,
+                                                                                       CaesarCipherKey)
+
+        for sampling_strategy in (RandomSampling(10, seed=2), RandomSampling(20, seed=1),
+                                  UniqueRandomSampling(10, seed=1), ExhaustiveSampling()):
+            with self.assertRaises(AssertionError):
+                NGramAttack(sampling_strategy, checkpoint_path=self.path).from_cipher('ABC', CaesarCipher,
+                                                                                      CaesarCipherKey)
+
+    def test_fingerprint_includes_sampling_strategy(self):
+        def fingerprint_of(sampling_strategy):
+            return fingerprint('ABC', CaesarCipher, CaesarCipherKey, sampling_strategy)
+
+        self.assertEqual(fingerprint_of(RandomSampling(10, seed=1)), fingerprint_of(RandomSampling(10, seed=1)))
+        self.assertNotEqual(fingerprint_of(ExhaustiveSampling(0, 2)), fingerprint_of(ExhaustiveSampling(1, 2)))
+        # The parts of an unseeded sampler are the same every time, so their searches can be resumed.
+        self.assertEqual([fingerprint_of(part) for part in RandomSampling(10).partition(2)],
+                         [fingerprint_of(part) for part in RandomSampling(10).partition(2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
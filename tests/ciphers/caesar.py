@@ -35,6 +35,18 @@ class CaeserCipherTests(CipherTestCase):
     def test_is_symmetric(self):
         super(CaeserCipherTests, self).is_symmetric_test(CaesarCipher, self.key)
 
+    def test_long_message_is_symmetric(self):
+        super(CaeserCipherTests, self).long_message_is_symmetric_test(CaesarCipher, self.key)
+
+    def test_stream_is_symmetric(self):
+        super(CaeserCipherTests, self).stream_is_symmetric_test(CaesarCipher, self.key)
+
+    def test_buffers(self):
+        super(CaeserCipherTests, self).buffer_test(CaesarCipher, self.key)
+
+    def test_decrypt_many(self):
+        super(CaeserCipherTests, self).decrypt_many_test(CaesarCipher, list(CaesarCipherKey.get_space()))
+
 
 if __name__ == '__main__':
     unittest.main()
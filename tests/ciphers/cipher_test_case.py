@@ -1,5 +1,9 @@
+import io
+import mmap
+import os
+import tempfile
 import unittest
-from typing import Type, Any, Optional, List
+from typing import Type, Any, Optional, List, Sequence
 
 from crypto.abcs import CipherABC
 from crypto.ciphers.utils import is_valid
@@ -115,3 +119,120 @@ class CipherTestCase(unittest.TestCase):
         D = cipher.decrypt
 
         self.assertEqual(D(E(m, key), key), m, msg='The cipher is not symmetric for the key \'%s\'!' % key)
+
+    def long_message_is_symmetric_test(self, cipher_type: Type[CipherABC], key: Optional[KeyI] = None,
+                                       filename: str = 'data/macbeth_excerpt.txt'):
+        """Ensure that the cipher is symmetric for long, multi-line messages.
+
+        :param cipher_type: The type of cipher to test.
+        :param key: The key to use.
+        :param filename: The name of the file to use as the message.
+        """
+        with open(filename, 'r') as f:
+            m = Message(f.read())
+
+        cipher = cipher_type()
+        c = cipher.encrypt(m, key)
+
+        self.assertEqual(len(c), len(m), msg='The ciphertext should be the same length as the message.')
+        self.assertEqual(cipher.decrypt(c, key), m, msg='The cipher is not symmetric for the key \'%s\'!' % key)
+
+    def stream_is_symmetric_test(self, cipher_type: Type[CipherABC], key: Optional[KeyI] = None,
+                                 filename: str = 'data/macbeth_excerpt.txt', chunk_size: int = 7):
+        """Ensure that encrypting and decrypting streams in chunks gives the same results as encrypting and decrypting
+        the whole message at once.
+
+        :param cipher_type: The type of cipher to test.
+        :param key: The key to use.
+        :param filename: The name of the file to use as the message.
+        :param chunk_size: The number of characters to read at once. This should be small so that the message is split
+                           into many chunks, including chunks that start or end part of the way through a word.
+        """
+        with open(filename, 'r') as f:
+            m = Message(f.read())
+
+        cipher = cipher_type()
+        c = io.StringIO()
+        decrypted = io.StringIO()
+
+        self.assertEqual(cipher.encrypt_stream(io.StringIO(m), c, key, chunk_size), len(m))
+        self.assertEqual(c.getvalue(), cipher.encrypt(m, key),
+                         msg='Stream encryption does not match encryption with the key \'%s\'!' % key)
+
+        cipher.decrypt_stream(io.StringIO(c.getvalue()), decrypted, key, chunk_size)
+        self.assertEqual(decrypted.getvalue(), m,
+                         msg='The cipher is not symmetric for streams with the key \'%s\'!' % key)
+
+        # Binary streams give back bytes.
+        c = io.BytesIO()
+        decrypted = io.BytesIO()
+
+        self.assertEqual(cipher.encrypt_stream(io.BytesIO(m.encode('ascii')), c, key, chunk_size), len(m))
+        self.assertEqual(c.getvalue(), cipher.encrypt(m, key).encode('ascii'),
+                         msg='Binary stream encryption does not match encryption with the key \'%s\'!' % key)
+
+        cipher.decrypt_stream(io.BytesIO(c.getvalue()), decrypted, key, chunk_size)
+        self.assertEqual(decrypted.getvalue(), m.encode('ascii'),
+                         msg='The cipher is not symmetric for binary streams with the key \'%s\'!' % key)
+
+    def buffer_test(self, cipher_type: Type[CipherABC], key: Optional[KeyI] = None,
+                    filename: str = 'data/macbeth_excerpt.txt'):
+        """Ensure that buffers (bytes, bytearrays, memoryviews and memory-mapped files) can be encrypted and decrypted,
+        and that the results can be written to a caller-provided buffer.
+
+        :param cipher_type: The type of cipher to test.
+        :param key: The key to use.
+        :param filename: The name of the file to use as the message.
+        """
+        with open(filename, 'r') as f:
+            m = Message(f.read())
+
+        cipher = cipher_type()
+        c = cipher.encrypt(m, key)
+        m_bytes = m.encode('ascii')
+        c_bytes = c.encode('ascii')
+
+        for buffer in (m_bytes, bytearray(m_bytes), memoryview(m_bytes)):
+            self.assertEqual(cipher.encrypt(buffer, key), c_bytes,
+                             msg='Encrypting a %s does not match encrypting a string.' % type(buffer).__name__)
+
+        out = bytearray(len(c_bytes))
+        self.assertIs(cipher.decrypt(c_bytes, key, out=out), out)
+        self.assertEqual(out, m_bytes)
+        self.assertRaises(AssertionError, cipher.encrypt, m_bytes, key, out=bytes(len(m_bytes)))
+
+        with tempfile.TemporaryDirectory() as directory:
+            src_path = os.path.join(directory, 'message.txt')
+            dst_path = os.path.join(directory, 'ciphertext.txt')
+
+            with open(src_path, 'wb') as f:
+                f.write(m_bytes)
+
+            with open(dst_path, 'wb') as f:
+                f.truncate(len(m_bytes))
+
+            with open(src_path, 'rb') as src, open(dst_path, 'r+b') as dst:
+                with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as src_map, \
+                        mmap.mmap(dst.fileno(), 0) as dst_map:
+                    cipher.encrypt(src_map, key, out=dst_map)
+                    self.assertEqual(cipher.decrypt(dst_map, key), m_bytes)
+
+            with open(dst_path, 'rb') as f:
+                self.assertEqual(f.read(), c_bytes)
+
+    def decrypt_many_test(self, cipher_type: Type[CipherABC], keys: Sequence[KeyI]):
+        """Ensure that decrypting with a batch of keys gives the same messages as decrypting with each key in turn.
+
+        :param cipher_type: The type of cipher to test.
+        :param keys: The keys to use.
+        """
+        c = CipherText('HELLO WORLD')
+
+        cipher = cipher_type()
+        messages = cipher.decrypt_many(c, keys)
+
+        self.assertEqual(messages.shape, (len(keys), len(c)))
+
+        for m, key in zip(messages, keys):
+            self.assertEqual(m.tobytes().decode('ascii'), cipher.decrypt(c, key),
+                             msg='Batch decryption does not match decryption with the key \'%s\'!' % key)
@@ -0,0 +1,120 @@
+import io
+import unittest
+from random import Random
+
+import numpy as np
+
+from crypto.ciphers import OneTimePadCipher, OneTimePadCipherKey
+from tests.ciphers.cipher_test_case import CipherTestCase
+
+
+class OneTimePadCipherTests(CipherTestCase):
+    raw_key = bytes(range(256))
+    key = OneTimePadCipherKey(bytes(range(256)))
+
+    def test_keyspace_is_correct(self):
+        pass_cases = [
+            b'',
+            bytes(range(256)),
+            b'\x00\xff'
+        ]
+
+        fail_cases = [
+            None,
+            '',
+            'HELLO WORLD',
+            42,
+            bytearray(b'HELLO WORLD'),
+            [1, 2, 3]
+        ]
+
+        super(OneTimePadCipherTests, self) \
+            .keyspace_is_correct_test(OneTimePadCipherKey, pass_cases, fail_cases)
+
+    def test_key_space_indices(self):
+        space = OneTimePadCipherKey.get_space(2)
+
+        self.assertEqual(space.size, 2 ** 16)
+        self.assertEqual(space[0], OneTimePadCipherKey(b'\x00\x00'))
+        self.assertEqual(space[258], OneTimePadCipherKey(b'\x01\x02'))
+        self.assertEqual(space.index_of(OneTimePadCipherKey(b'\xff\xff')), 2 ** 16 - 1)
+        self.assertNotIn(OneTimePadCipherKey(b'\x00'), space)
+
+    def test_can_set_key(self):
+        super(OneTimePadCipherTests, self).can_set_key_test(OneTimePadCipher, self.key, self.key)
+
+    def test_identity_key(self):
+        m = 'HELLO WORLD'
+
+        self.assertEqual(OneTimePadCipher().encrypt(m, OneTimePadCipherKey.get_identity(len(m))), b'HELLO WORLD')
+
+    def test_key_is_generated_when_not_given(self):
+        cipher = OneTimePadCipher()
+        self.assertIsNone(cipher.key)
+
+        c = cipher.encrypt('HELLO WORLD')
+
+        self.assertEqual(len(cipher.key), len(c))
+        self.assertEqual(c, OneTimePadCipher().encrypt('HELLO WORLD', cipher.key))
+        self.assertEqual(cipher.decrypt(c), b'HELLO WORLD')
+
+    def test_key_is_generated_for_streams(self):
+        m = b'HELLO WORLD' * 10
+        cipher = OneTimePadCipher()
+        c = io.BytesIO()
+
+        self.assertEqual(cipher.encrypt_stream(io.BytesIO(m), c, chunk_size=7), len(m))
+        self.assertEqual(len(cipher.key), len(m))
+        self.assertEqual(cipher.decrypt(c.getvalue()), m)
+
+    def test_decrypting_needs_a_key(self):
+        self.assertRaises(AssertionError, OneTimePadCipher().decrypt, b'HELLO WORLD')
+
+    def test_is_symmetric(self):
+        cipher = OneTimePadCipher()
+        key = OneTimePadCipherKey.generate_random(11)
+        c = cipher.encrypt('HELLO WORLD', key)
+
+        self.assertNotEqual(c, b'HELLO WORLD')
+        self.assertEqual(cipher.decrypt(c, key), b'HELLO WORLD')
+
+    def test_large_message_is_symmetric(self):
+        m = np.random.default_rng(0).integers(0, 256, 2 ** 22, dtype=np.uint8).tobytes()
+        key = OneTimePadCipherKey.generate_random(len(m))
+        cipher = OneTimePadCipher(key)
+        out = bytearray(len(m))
+
+        self.assertIs(cipher.decrypt(cipher.encrypt(m), out=out), out)
+        self.assertEqual(out, m)
+
+    def test_key_must_cover_message(self):
+        self.assertRaises(AssertionError, OneTimePadCipher(OneTimePadCipherKey.generate_random()).encrypt, b'A' * 65)
+
+    def test_stream_is_symmetric(self):
+        with open('data/macbeth_excerpt.txt', 'rb') as f:
+            m = f.read()
+
+        key = OneTimePadCipherKey.generate_random(len(m), Random(42))
+        cipher = OneTimePadCipher()
+        c = io.BytesIO()
+        decrypted = io.BytesIO()
+
+        self.assertEqual(cipher.encrypt_stream(io.BytesIO(m), c, key, chunk_size=7), len(m))
+        self.assertEqual(c.getvalue(), cipher.encrypt(m, key))
+
+        cipher.decrypt_stream(io.BytesIO(c.getvalue()), decrypted, key, chunk_size=7)
+        self.assertEqual(decrypted.getvalue(), m)
+
+    def test_decrypt_many(self):
+        keys = [self.key, OneTimePadCipherKey.get_identity(), OneTimePadCipherKey.generate_random()]
+        c = OneTimePadCipher().encrypt(b'HELLO WORLD', self.key)
+        messages = OneTimePadCipher().decrypt_many(c, keys)
+
+        self.assertEqual(messages.shape, (3, len(c)))
+
+        for m, key in zip(messages, keys):
+            self.assertEqual(m.tobytes(), OneTimePadCipher().decrypt(c, key))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -53,3 +53,16 @@ class SubstitutionCipherTests(CipherTestCase):
 
     def test_is_symmetric(self):
         super(SubstitutionCipherTests, self).is_symmetric_test(SubstitutionCipher, self.key)
+
+    def test_long_message_is_symmetric(self):
+        super(SubstitutionCipherTests, self).long_message_is_symmetric_test(SubstitutionCipher, self.key)
+
+    def test_stream_is_symmetric(self):
+        super(SubstitutionCipherTests, self).stream_is_symmetric_test(SubstitutionCipher, self.key)
+
+    def test_buffers(self):
+        super(SubstitutionCipherTests, self).buffer_test(SubstitutionCipher, self.key)
+
+    def test_decrypt_many(self):
+        keys = [self.key, SubstitutionCipherKey.get_identity(), SubstitutionCipherKey.generate_random()]
+        super(SubstitutionCipherTests, self).decrypt_many_test(SubstitutionCipher, keys)
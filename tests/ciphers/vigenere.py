@@ -52,6 +52,19 @@ class VigenereCipherTests(CipherTestCase):
     def test_is_symmetric(self):
         super(VigenereCipherTests, self).is_symmetric_test(VigenereCipher, self.key)
 
+    def test_long_message_is_symmetric(self):
+        super(VigenereCipherTests, self).long_message_is_symmetric_test(VigenereCipher, self.key)
+
+    def test_stream_is_symmetric(self):
+        super(VigenereCipherTests, self).stream_is_symmetric_test(VigenereCipher, self.key)
+
+    def test_buffers(self):
+        super(VigenereCipherTests, self).buffer_test(VigenereCipher, self.key)
+
+    def test_decrypt_many(self):
+        keys = [self.key, VigenereCipherKey('A'), VigenereCipherKey(ascii_uppercase)]
+        super(VigenereCipherTests, self).decrypt_many_test(VigenereCipher, keys)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,13 @@
+import os
 import unittest
+from random import Random
 
 from crypto.ciphers.caesar import CaesarCipher, CaesarCipherKey
-from crypto.common_attacks import LetterFrequencyAttack, DictionaryAttack
+from crypto.ciphers.substitution import SubstitutionCipher, SubstitutionCipherKey
+from crypto.ciphers.vigenere import VigenereCipher, VigenereCipherKey
+from crypto.common_attacks import LetterFrequencyAttack, DictionaryAttack, HillClimbingAttack, \
+    IndexOfCoincidenceAttack, NGramAttack, LanguageAnalysisAttack
+from crypto.language import ENGLISH_CORPUS
 from crypto.strategies import ExhaustiveSampling
 from crypto.types import Message
 
@@ -33,6 +39,149 @@ class TestCommonAttacks(unittest.TestCase):
         self.assertIn(key, CaesarCipherKey.get_space(), 'Attack method generated an invalid key \'%s\'.' % key)
         self.assertTrue(cipher.is_valid(message), 'Attack method generated an invalid message \'%s\'' % message)
 
+    def test_letter_frequency_attack_recovers_caesar_key(self):
+        with open('data/macbeth_excerpt.txt', 'r') as f:
+            m = Message(f.read())
+
+        k = CaesarCipherKey(11)
+
+        cipher = CaesarCipher()
+        c = cipher.encrypt(m, k)
+
+        attack = LetterFrequencyAttack(ExhaustiveSampling())
+        message, key = attack.from_cipher(c, CaesarCipher, CaesarCipherKey)
+
+        self.assertEqual(key, k)
+        self.assertEqual(message, m)
+
+    def test_ngram_attack_recovers_caesar_key(self):
+        m = Message('THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG')
+        k = CaesarCipherKey(20)
+
+        cipher = CaesarCipher()
+        c = cipher.encrypt(m, k)
+
+        attack = NGramAttack(ExhaustiveSampling())
+        message, key = attack.from_cipher(c, CaesarCipher, CaesarCipherKey)
+
+        self.assertEqual(key, k)
+        self.assertEqual(message, m)
+
+    def test_parallel_search_matches_serial_search(self):
+        m = Message('THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG')
+        k = CaesarCipherKey(7)
+
+        cipher = CaesarCipher()
+        c = cipher.encrypt(m, k)
+
+        serial_attack = NGramAttack(ExhaustiveSampling())
+        parallel_attack = NGramAttack(ExhaustiveSampling(), n_workers=3)
+
+        self.assertEqual(parallel_attack.from_cipher(c, CaesarCipher, CaesarCipherKey),
+                         serial_attack.from_cipher(c, CaesarCipher, CaesarCipherKey))
+
+    def test_hill_climbing_attack_recovers_substitution_key(self):
+        # The language model is built from a corpus that does not include this text, so the attack is evaluated on
+        # held-out text.
+        self.assertNotIn(os.path.abspath('data/macbeth_excerpt.txt'), map(os.path.abspath, ENGLISH_CORPUS))
+
+        with open('data/macbeth_excerpt.txt', 'r') as f:
+            m = Message(f.read())
+
+        k = SubstitutionCipherKey.generate_random(rng=Random(7))
+
+        cipher = SubstitutionCipher()
+        c = cipher.encrypt(m, k)
+
+        attack = HillClimbingAttack(n_restarts=3, seed=42)
+        message, key = attack.from_cipher(c, SubstitutionCipher, SubstitutionCipherKey)
+
+        self.assertEqual(key, k)
+        self.assertEqual(message, m)
+
+    def test_hill_climbing_attack_rejects_unsupported_options_and_ciphertexts(self):
+        # The attack does not search like a brute-force attack, so options such as `top_k` would do nothing.
+        with self.assertRaises(TypeError):
+            HillClimbingAttack(top_k=3)
+
+        with self.assertRaises(AssertionError):
+            HillClimbingAttack(n_restarts=1).from_cipher('hello world', SubstitutionCipher, SubstitutionCipherKey)
+
+    def test_index_of_coincidence_attack_recovers_vigenere_key(self):
+        with open('data/macbeth_excerpt.txt', 'r') as f:
+            m = Message(f.read())
+
+        for k in [VigenereCipherKey('OTAGO'), VigenereCipherKey('CRYPTOGRAPHY')]:
+            cipher = VigenereCipher()
+            c = cipher.encrypt(m, k)
+
+            attack = IndexOfCoincidenceAttack()
+            message, key = attack.from_cipher(c, VigenereCipher, VigenereCipherKey)
+
+            self.assertEqual(key, k)
+            self.assertEqual(message, m)
+
+    def test_index_of_coincidence_attack_recovers_keys_with_repeated_parts(self):
+        with open('data/macbeth_excerpt.txt', 'r') as f:
+            m = Message(f.read())
+
+        for k in [VigenereCipherKey('BANANA'), VigenereCipherKey('KNICKKNACK'), VigenereCipherKey('ABCABD')]:
+            c = VigenereCipher().encrypt(m, k)
+            message, key = IndexOfCoincidenceAttack().from_cipher(c, VigenereCipher, VigenereCipherKey)
+
+            self.assertEqual(key, k)
+            self.assertEqual(message, m)
+
+    def test_index_of_coincidence_attack_recovers_keys_from_short_ciphertexts(self):
+        with open('data/macbeth_excerpt.txt', 'r') as f:
+            words = f.read().split()
+
+        # About 200 letters from the middle of the text.
+        m = Message(' '.join(words[1000:1038]))
+
+        for k in ['LEMON', 'CRYPTO', 'KEY', 'BANANA', 'KNICKKNACK']:
+            c = VigenereCipher().encrypt(m, VigenereCipherKey(k))
+            message, key = IndexOfCoincidenceAttack().from_cipher(c, VigenereCipher, VigenereCipherKey)
+
+            self.assertEqual(key, VigenereCipherKey(k))
+            self.assertEqual(message, m)
+
+    def test_progressive_scoring_prunes_keys_on_prefix(self):
+        with open('data/macbeth_excerpt.txt', 'r') as f:
+            m = Message(f.read())
+
+        k = CaesarCipherKey(11)
+        c = CaesarCipher().encrypt(m, k)
+
+        for attack_type in (DictionaryAttack, LanguageAnalysisAttack):
+            full = attack_type(ExhaustiveSampling()).top_candidates(c, CaesarCipher, CaesarCipherKey)
+            attack = attack_type(ExhaustiveSampling(), prefix_length=200)
+            lengths = []
+            score_many = attack.score_many
+            attack.score_many = lambda candidates: lengths.extend([candidates.shape[1]] * len(candidates)) or \
+                score_many(candidates)
+            progressive = attack.top_candidates(c, CaesarCipher, CaesarCipherKey)
+
+            self.assertEqual(progressive[0].key, k)
+            self.assertAlmostEqual(progressive[0].score, full[0].score)
+            self.assertEqual(progressive[0].message, m)
+            self.assertEqual(lengths.count(len(c)), 1, 'Only the correct key should be scored in full.')
+            self.assertEqual(len(lengths), 27)
+
+    def test_progressive_scoring_scores_every_top_key_in_full(self):
+        with open('data/macbeth_excerpt.txt', 'r') as f:
+            c = CaesarCipher().encrypt(Message(f.read()), CaesarCipherKey(11))
+
+        for attack_type in (DictionaryAttack, LanguageAnalysisAttack):
+            attack = attack_type(ExhaustiveSampling(), top_k=3, prefix_length=200, margin=0.02)
+            candidates = attack.top_candidates(c, CaesarCipher, CaesarCipherKey)
+
+            self.assertEqual(len(candidates), 3)
+
+            for candidate in candidates:
+                score = attack.score_many(CaesarCipher().decrypt_many(c, [candidate.key]))[0]
+                self.assertAlmostEqual(candidate.score, float(score))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,72 @@
+import pickle
+import unittest
+
+from crypto.dictionaries import DictionaryProvider, WordlistDictionary, enchant_is_available
+from crypto.metrics import ratio_tokens_in_dict
+
+
+class TestDictionaries(unittest.TestCase):
+    def test_reuses_dictionary_handles(self):
+        provider = DictionaryProvider()
+
+        self.assertIs(provider.get('en'), provider.get('en'))
+
+    def test_caches_token_lookups(self):
+        provider = DictionaryProvider(cache_size=2)
+
+        self.assertTrue(provider.check('HELLO'))
+        self.assertTrue(provider.check('HELLO'))
+        self.assertFalse(provider.check('XQZJ'))
+
+        info = provider.cache_info()
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.misses, 2)
+
+        provider.cache_clear()
+        self.assertEqual(provider.cache_info().currsize, 0)
+
+    def test_wordlist_backend(self):
+        provider = DictionaryProvider(backend='wordlist')
+
+        self.assertIsInstance(provider.get('en'), WordlistDictionary)
+        self.assertTrue(provider.check('WORLD'))
+        self.assertFalse(provider.check('XQZJ'))
+
+    def test_custom_backend(self):
+        provider = DictionaryProvider(backend=lambda language: WordlistDictionary(['crypto']))
+
+        self.assertTrue(provider.check('CRYPTO'))
+        self.assertFalse(provider.check('WORLD'))
+
+    def test_can_be_pickled(self):
+        provider = DictionaryProvider(backend='wordlist', cache_size=16)
+        provider.check('HELLO')
+
+        unpickled = pickle.loads(pickle.dumps(provider))
+
+        self.assertEqual(unpickled.backend, 'wordlist')
+        self.assertEqual(unpickled.cache_info().maxsize, 16)
+        self.assertTrue(unpickled.check('HELLO'))
+
+    def test_can_be_pickled_with_module_level_backend(self):
+        unpickled = pickle.loads(pickle.dumps(DictionaryProvider(backend=WordlistDictionary.for_language)))
+
+        self.assertTrue(unpickled.check('HELLO'))
+
+        with self.assertRaises((pickle.PicklingError, AttributeError)):
+            pickle.dumps(DictionaryProvider(backend=lambda language: WordlistDictionary(['crypto'])))
+
+    def test_wordlist_covers_ordinary_english(self):
+        provider = DictionaryProvider(backend='wordlist')
+
+        for m in ('THE CAT SAT ON THE MAT', 'I WOULD LIKE SOME COFFEE PLEASE', 'SHE WALKED HOME QUICKLY'):
+            self.assertEqual(ratio_tokens_in_dict(m, provider=provider), 1.0, m)
+
+        self.assertEqual(ratio_tokens_in_dict('QEB ZXQ PXQ LK QEB JXQ', provider=provider), 0.0)
+
+    def test_enchant_is_not_available_without_a_dictionary(self):
+        self.assertFalse(enchant_is_available('xx_NOT_A_LANGUAGE'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from crypto.ciphers.caesar import CaesarCipher, CaesarCipherKey
+from crypto.ciphers.vigenere import VigenereCipher, VigenereCipherKey
+from crypto.common_attacks import DictionaryAttack, LetterFrequencyAttack, NGramAttack
+from crypto.instrumentation import AttackStats, MemorySink, JsonLinesSink, LoggingSink
+from crypto.strategies import ExhaustiveSampling, RandomSampling
+from crypto.types import Message
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.c = VigenereCipher().encrypt(Message('IT WAS THE BEST OF TIMES IT WAS THE WORST OF TIMES'),
+                                          VigenereCipherKey('KEY'))
+
+    def test_search_records_statistics(self):
+        sink = MemorySink()
+        NGramAttack(RandomSampling(100, seed=1), chunk_size=30, sinks=[sink]) \
+            .top_candidates(self.c, VigenereCipher, VigenereCipherKey)
+
+        self.assertEqual(len(sink.records), 1)
+        record = sink.records[0]
+
+        self.assertEqual(record['attack'], 'NGramAttack')
+        self.assertEqual(record['cipher'], 'VigenereCipher')
+        self.assertEqual(record['n_keys'], 100)
+        self.assertEqual(record['n_chunks'], 4)
+        self.assertEqual(record['exit_reason'], 'exhausted')
+        self.assertEqual(record['exit_position'], 100)
+        self.assertGreater(record['keys_per_second'], 0)
+        self.assertGreater(record['decrypt_time'], 0)
+        self.assertGreater(record['score_time'], 0)
+        self.assertLessEqual(record['sample_time'] + record['decrypt_time'] + record['score_time'], record['elapsed'])
+        self.assertEqual(record['scores']['count'], 100)
+        self.assertLessEqual(record['scores']['min'], record['scores']['p50'])
+        self.assertLessEqual(record['scores']['p50'], record['scores']['max'])
+
+    def test_early_exit_is_recorded(self):
+        sink = MemorySink()
+        c = CaesarCipher().encrypt(Message('HELLO WORLD'), CaesarCipherKey(3))
+        DictionaryAttack(ExhaustiveSampling(), chunk_size=2, sinks=[sink]).from_cipher(c, CaesarCipher,
+                                                                                       CaesarCipherKey)
+
+        self.assertEqual(sink.records[0]['exit_reason'], 'threshold')
+        self.assertEqual(sink.records[0]['exit_position'], 4)
+
+    def test_scorers_that_do_not_decrypt_record_no_decryption_time(self):
+        sink = MemorySink()
+        c = CaesarCipher().encrypt(Message('HELLO WORLD'), CaesarCipherKey(3))
+        LetterFrequencyAttack(ExhaustiveSampling(), sinks=[sink]).from_cipher(c, CaesarCipher, CaesarCipherKey)
+
+        self.assertEqual(sink.records[0]['decrypt_time'], 0)
+        self.assertEqual(sink.records[0]['n_keys'], 26)
+
+    def test_search_is_not_instrumented_without_sinks(self):
+        attack = NGramAttack(ExhaustiveSampling())
+        cipher = CaesarCipher()
+
+        self.assertEqual(attack.sinks, [])
+        self.assertTrue(np.array_equal(attack.get_key_scorer('ABC', cipher)([CaesarCipherKey(1)]),
+                                       attack.get_key_scorer('ABC', cipher, AttackStats('', '', ''))(
+                                           [CaesarCipherKey(1)])))
+
+    def test_json_lines_and_logging_sinks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'stats.jsonl')
+            attack = NGramAttack(RandomSampling(50, seed=1), sinks=[JsonLinesSink(path), LoggingSink()])
+
+            with self.assertLogs('crypto.instrumentation') as logs:
+                attack.top_candidates(self.c, VigenereCipher, VigenereCipherKey)
+                attack.top_candidates(self.c, VigenereCipher, VigenereCipherKey)
+
+            with open(path, 'r') as f:
+                records = [json.loads(line) for line in f]
+
+        self.assertEqual([record['n_keys'] for record in records], [50, 50])
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn('NGramAttack on VigenereCipher: 50 keys', logs.output[0])
+
+    def test_score_quantiles_are_estimated_from_a_bounded_sample(self):
+        stats = AttackStats('attack', 'cipher', 'key', max_scores=1000)
+        scores = np.arange(100000, dtype=np.float64)
+
+        for chunk in np.split(scores, 100):
+            stats.record_chunk(len(chunk), 0, 0, chunk)
+
+        stats.finish('exhausted', len(scores))
+        distribution = stats.score_distribution()
+
+        self.assertEqual(distribution['count'], 100000)
+        self.assertEqual(distribution['min'], 0)
+        self.assertEqual(distribution['max'], 99999)
+        self.assertAlmostEqual(distribution['mean'], 49999.5)
+        self.assertAlmostEqual(distribution['std'], np.std(scores), places=3)
+        self.assertAlmostEqual(distribution['p50'], 50000, delta=5000)
+        self.assertAlmostEqual(distribution['p90'], 90000, delta=3000)
+
+
+if __name__ == '__main__':
+    unittest.main()
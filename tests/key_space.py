@@ -0,0 +1,61 @@
+import unittest
+
+from crypto.ciphers.caesar import CaesarCipherKey
+from crypto.ciphers.otp import OneTimePadCipherKey
+from crypto.ciphers.substitution import SubstitutionCipherKey
+from crypto.ciphers.vigenere import VigenereCipherKey
+
+
+class TestKeySpace(unittest.TestCase):
+    def test_index_round_trip(self):
+        for key_type, indices in [(CaesarCipherKey, [0, 13, 25]),
+                                  (SubstitutionCipherKey, [0, 1, 12345678, SubstitutionCipherKey.get_space_size() - 1]),
+                                  (VigenereCipherKey, [0, 25, 26, 27, 26 + 26 ** 2, 10 ** 20]),
+                                  (OneTimePadCipherKey, [0, 1, 2 ** 64 - 1])]:
+            for index in indices:
+                with self.subTest(key_type=key_type.__name__, index=index):
+                    self.assertEqual(key_type.index_of(key_type.key_at(index)), index)
+
+    def test_keys_are_ordered(self):
+        self.assertEqual(SubstitutionCipherKey.key_at(0), SubstitutionCipherKey.get_identity())
+        self.assertEqual(''.join(SubstitutionCipherKey.key_at(1).value[char] for char in 'XYZ'), 'XZY')
+        self.assertEqual(''.join(SubstitutionCipherKey.key_at(SubstitutionCipherKey.get_space_size() - 1)
+                                 .value[char] for char in 'ABC'), 'ZYX')
+
+        self.assertEqual([VigenereCipherKey.key_at(i).value for i in [0, 25, 26, 27, 26 + 26 ** 2]],
+                         ['A', 'Z', 'AA', 'AB', 'AAA'])
+
+    def test_random_keys_have_indices(self):
+        for key_type in [SubstitutionCipherKey, VigenereCipherKey]:
+            with self.subTest(key_type=key_type.__name__):
+                key = key_type.generate_random()
+
+                self.assertEqual(key_type.key_at(key_type.index_of(key)), key)
+                self.assertIn(key, key_type.get_space())
+
+    def test_slicing(self):
+        space = VigenereCipherKey.get_space()
+        middle = space[26:26 + 26 ** 2]
+
+        self.assertEqual(middle.size, 26 ** 2)
+        self.assertEqual(middle[0].value, 'AA')
+        self.assertEqual(middle[-1].value, 'ZZ')
+        self.assertEqual(middle.index_of(VigenereCipherKey('AB')), 1)
+        self.assertIn(VigenereCipherKey('QQ'), middle)
+        self.assertNotIn(VigenereCipherKey('Q'), middle)
+        self.assertNotIn('not a key', middle)
+
+        with self.assertRaises(IndexError):
+            middle.key_at(middle.size)
+
+    def test_split_covers_huge_key_space(self):
+        space = SubstitutionCipherKey.get_space()
+        parts = space.split(7)
+
+        self.assertEqual(sum(part.size for part in parts), space.size)
+        self.assertEqual([part.start for part in parts[1:]], [part.stop for part in parts[:-1]])
+        self.assertEqual(next(iter(parts[0])), SubstitutionCipherKey.get_identity())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from crypto.common_attacks import LetterFrequencyAttack, LanguageAnalysisAttack, IndexOfCoincidenceAttack
+from crypto.dictionaries import DATA_DIR
+from crypto.language import LanguageModel, get_language_model, corpus_hash, language_model_path, cache_dir, \
+    ENGLISH_CORPUS, ENGLISH_LETTER_FREQUENCIES, CACHE_DIR_VARIABLE
+from crypto.metrics import get_ngram_table
+from crypto.strategies import ExhaustiveSampling
+
+
+class TestLanguage(unittest.TestCase):
+    def test_model_round_trips_through_file(self):
+        model = LanguageModel.build(ENGLISH_CORPUS[:1], max_n=3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'language.bin')
+            model.save(path)
+            loaded = LanguageModel.load(path)
+
+            self.assertEqual(sorted(loaded.ngram_tables), [1, 2, 3])
+
+            for n in (1, 2, 3):
+                self.assertIsInstance(loaded.ngram_table(n).base, np.memmap, 'Tables should be memory-mapped.')
+                self.assertEqual(loaded.ngram_table(n).dtype, np.float32)
+                self.assertTrue(np.array_equal(loaded.ngram_table(n), model.ngram_table(n)))
+
+            self.assertTrue(np.array_equal(loaded.letter_frequencies, model.letter_frequencies))
+            self.assertEqual(loaded.word_counts, model.word_counts)
+            self.assertEqual(loaded.corpus_hash, model.corpus_hash)
+            self.assertEqual(LanguageModel.read_corpus_hash(path), corpus_hash(ENGLISH_CORPUS[:1], max_n=3))
+
+            del loaded
+
+    def test_stale_model_is_rebuilt(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'language.bin')
+            LanguageModel.build(ENGLISH_CORPUS, max_n=2).save(path)
+
+            model = get_language_model('en', path)
+
+            self.assertEqual(sorted(model.ngram_tables), [1, 2, 3, 4], 'The model should have been rebuilt.')
+            self.assertEqual(LanguageModel.read_corpus_hash(path), model.corpus_hash)
+
+            del model
+
+    def test_model_is_cached_outside_the_package(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with mock.patch.dict(os.environ, {CACHE_DIR_VARIABLE: os.path.join(directory, 'cache')}):
+                path = language_model_path()
+                model = get_language_model('en', path)
+
+                self.assertEqual(os.path.dirname(path), cache_dir())
+                self.assertIn(model.corpus_hash[:16], os.path.basename(path))
+                self.assertTrue(os.path.exists(path))
+
+            self.assertNotEqual(os.path.dirname(language_model_path()), DATA_DIR)
+
+            del model
+
+    def test_missing_model_has_no_corpus_hash(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertIsNone(LanguageModel.read_corpus_hash(os.path.join(directory, 'language.bin')))
+
+    def test_files_that_are_not_models_are_rejected(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'language.bin')
+
+            with open(path, 'wb') as f:
+                f.write(b'NOTAMODEL' * 10)
+
+            with self.assertRaises(AssertionError):
+                LanguageModel.load(path)
+
+    def test_model_statistics(self):
+        model = get_language_model()
+
+        self.assertAlmostEqual(float(model.letter_frequencies.sum()), 1.0, places=4)
+        self.assertTrue(np.array_equal(model.letter_frequencies, ENGLISH_LETTER_FREQUENCIES))
+        self.assertEqual(int(np.argmax(model.letter_frequencies)), ord('E') - ord('A'))
+        self.assertEqual(model.ngram_table(4).shape, (26,) * 4)
+        self.assertGreater(model.ngram_table(2)[ord('T') - ord('A'), ord('H') - ord('A')],
+                           model.ngram_table(2)[ord('Q') - ord('A'), ord('Z') - ord('A')])
+        self.assertGreater(model.word_frequency('the'), model.word_frequency('xylophone'))
+        self.assertEqual(model.word_frequency('xylophone'), 0.0)
+
+    def test_model_is_shared(self):
+        self.assertIs(get_language_model(), get_language_model('en'))
+        self.assertIs(get_ngram_table(4), get_language_model().ngram_table(4))
+
+        letter_frequencies = get_language_model().letter_frequencies
+
+        self.assertIs(LetterFrequencyAttack(ExhaustiveSampling()).letter_frequencies, letter_frequencies)
+        self.assertIs(LanguageAnalysisAttack(ExhaustiveSampling()).letter_frequencies, letter_frequencies)
+        self.assertIs(IndexOfCoincidenceAttack().letter_frequencies, letter_frequencies)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+import numpy as np
+
+from crypto.metrics import ngram_fitness, ngram_fitness_many, letter_distribution, ratio_tokens_in_dict, \
+    positional_similarity
+from crypto.ciphers.utils import encode
+
+
+class TestMetrics(unittest.TestCase):
+    def test_ngram_fitness_prefers_english(self):
+        self.assertGreater(ngram_fitness('TO BE OR NOT TO BE'), ngram_fitness('XQ ZJ KVB WXQ ZJ KV'))
+
+    def test_ngram_fitness_many_matches_ngram_fitness(self):
+        messages = ['HELLO WORLD', 'WORLD HELLO', 'HELL OWORLD']
+        expected = [ngram_fitness(m) for m in messages]
+        actual = ngram_fitness_many(np.stack([encode(m) for m in messages]))
+
+        self.assertTrue(np.allclose(expected, actual))
+
+    def test_metrics_accept_buffers(self):
+        m = 'TO BE OR NOT TO BE THAT IS THE QUESTION'
+        m_bytes = m.encode('ascii')
+
+        for buffer in (m_bytes, bytearray(m_bytes), memoryview(m_bytes)):
+            with self.subTest(type=type(buffer).__name__):
+                self.assertTrue(np.array_equal(letter_distribution(buffer), letter_distribution(m)))
+                self.assertEqual(ngram_fitness(buffer), ngram_fitness(m))
+                self.assertEqual(ratio_tokens_in_dict(buffer), ratio_tokens_in_dict(m))
+                self.assertEqual(positional_similarity(buffer, m), 1.0)
+
+        self.assertEqual(positional_similarity('HELLO WORLD', 'HELLO THERE'), 6 / 11)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import random
+import unittest
+
+import numpy as np
+
+from crypto.ciphers import CaesarCipher, CaesarCipherKey, SubstitutionCipher, SubstitutionCipherKey, \
+    VigenereCipher, VigenereCipherKey
+from crypto.plaintext_attacks import KnownPlaintextAttack, ChosenPlaintextAttack, periods
+from crypto.types import Message
+
+
+class TestPlaintextAttacks(unittest.TestCase):
+    def setUp(self):
+        with open('data/macbeth_excerpt.txt', 'r') as f:
+            self.m = Message(f.read())
+
+    def test_periods(self):
+        self.assertEqual(periods(np.array([1, 2, 1, 2, 1])), [2, 4, 5])
+        self.assertEqual(periods(np.array([1, 2, 3])), [3])
+        self.assertEqual(periods(np.array([7, 7, 7])), [1, 2, 3])
+        self.assertEqual(periods(np.array([])), [0])
+
+    def test_known_plaintext_recovers_caesar_key(self):
+        k = CaesarCipherKey(17)
+        c = CaesarCipher().encrypt(self.m, k)
+
+        self.assertEqual(KnownPlaintextAttack().from_pairs([(self.m, c)], CaesarCipher, CaesarCipherKey), k)
+
+    def test_known_plaintext_recovers_vigenere_key(self):
+        attack = KnownPlaintextAttack()
+
+        for k in [VigenereCipherKey('OTAGO'), VigenereCipherKey('CRYPTOGRAPHY')]:
+            pairs = [(m, VigenereCipher().encrypt(m, k)) for m in (Message('HELLO WORLD'), self.m)]
+
+            self.assertEqual(attack.from_pairs(pairs, VigenereCipher, VigenereCipherKey), k)
+
+    def test_known_plaintext_recovers_substitution_key(self):
+        k = SubstitutionCipherKey.generate_random(random.Random(1))
+        cipher = SubstitutionCipher()
+        m = Message('THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG')
+
+        self.assertEqual(KnownPlaintextAttack().from_pairs([(m, cipher.encrypt(m, k))], SubstitutionCipher,
+                                                           SubstitutionCipherKey), k)
+
+    def test_known_plaintext_searches_unknown_substitution_letters(self):
+        k = SubstitutionCipherKey.generate_random(random.Random(2))
+        cipher = SubstitutionCipher()
+        m = Message('ALL THE WORLDS A STAGE')
+        c = cipher.encrypt(self.m, k)
+
+        key = KnownPlaintextAttack().from_pairs([(m, cipher.encrypt(m, k))], SubstitutionCipher,
+                                                SubstitutionCipherKey, c)
+
+        for char in set(m.replace(' ', '')):
+            self.assertEqual(key.value[char], k.value[char], 'Known letters should keep their mappings.')
+
+        n_correct = sum(a == b for a, b in zip(cipher.decrypt(c, key), self.m))
+        self.assertGreater(n_correct / len(self.m), 0.9)
+
+    def test_known_plaintext_rejects_inconsistent_pairs(self):
+        attack = KnownPlaintextAttack()
+        m = Message('HELLO WORLD')
+        pairs = [(m, CaesarCipher().encrypt(m, CaesarCipherKey(1))), (m, CaesarCipher().encrypt(m, CaesarCipherKey(2)))]
+
+        self.assertIsNone(attack.from_pairs(pairs, CaesarCipher, CaesarCipherKey))
+        self.assertIsNone(attack.from_pairs([(m, 'ABCDE FGHIJ')], SubstitutionCipher, SubstitutionCipherKey))
+        self.assertIsNone(attack.from_pairs([(m, 'HELLOWORLD ')], VigenereCipher, VigenereCipherKey))
+
+    def test_chosen_plaintext_recovers_keys(self):
+        attack = ChosenPlaintextAttack()
+        rng = random.Random(3)
+
+        for cipher_type, key_type in [(CaesarCipher, CaesarCipherKey), (SubstitutionCipher, SubstitutionCipherKey),
+                                      (VigenereCipher, VigenereCipherKey)]:
+            k = key_type.generate_random(rng=rng)
+            cipher = cipher_type(k)
+
+            self.assertEqual(attack.from_oracle(cipher.encrypt, cipher_type, key_type), k)
+
+
+if __name__ == '__main__':
+    unittest.main()
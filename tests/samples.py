@@ -1,7 +1,10 @@
+import io
+import json
 import os
 import sys
 import unittest
 
+from samples.batch_service import main as batch_service_sample
 from samples.caesar_cipher import main as caesar_cipher_sample
 from samples.substitution_cipher import main as substitution_cipher_sample
 
@@ -31,6 +34,37 @@ class TestSamples(unittest.TestCase):
                 sys.stdout = stdout
                 self.assertEqual(return_code, 0, 'Main function returned non-zero exit code.')
 
+    def test_caesar_cipher_sample_pipe_mode_writes_ciphertext(self):
+        with open(os.devnull, 'w') as devnull:
+            stdout, stderr = sys.stdout, sys.stderr
+            sys.stdout, sys.stderr = io.StringIO(), devnull
+
+            try:
+                return_code = caesar_cipher_sample(key=3, filename='data/hello_world.txt', pipe=True)
+                output = sys.stdout.getvalue()
+            finally:
+                sys.stdout, sys.stderr = stdout, stderr
+
+        self.assertEqual(return_code, 0, 'Main function returned non-zero exit code.')
+        self.assertEqual(output.strip(), 'KHOOR ZRUOG')
+
+    def test_batch_service_sample_answers_jobs_on_stdin(self):
+        jobs = [dict(id=i, ciphertext='KHOOR ZRUOG', cipher='CaesarCipher', attack='DictionaryAttack')
+                for i in range(3)]
+        stdin, stdout = sys.stdin, sys.stdout
+        sys.stdin, sys.stdout = io.StringIO(''.join(json.dumps(job) + '\n' for job in jobs)), io.StringIO()
+
+        try:
+            return_code = batch_service_sample(workers=2)
+            output = sys.stdout.getvalue()
+        finally:
+            sys.stdin, sys.stdout = stdin, stdout
+
+        results = [json.loads(line) for line in output.splitlines()]
+
+        self.assertEqual(return_code, 0, 'Main function returned non-zero exit code.')
+        self.assertEqual(sorted(result['id'] for result in results), [0, 1, 2])
+        self.assertTrue(all(result['message'] == 'HELLO WORLD' for result in results))
 
 
 if __name__ == '__main__':
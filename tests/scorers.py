@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+
+from crypto.ciphers import CaesarCipher, CaesarCipherKey
+from crypto.common_attacks import LetterFrequencyAttack, IndexOfCoincidenceAttack
+from crypto.language import get_language_model
+from crypto.metrics import cosine_similarity, letter_distribution, letter_distributions, rotations
+from crypto.scorers import CosineScorer, ChiSquaredScorer, LogLikelihoodScorer
+from crypto.strategies import ExhaustiveSampling
+from crypto.types import Message
+
+
+class TestScorers(unittest.TestCase):
+    def setUp(self):
+        self.reference = get_language_model().letter_frequencies
+        self.histograms = np.random.default_rng(0).integers(0, 50, size=(10, 26))
+
+    def test_cosine_scorer(self):
+        scores = CosineScorer(self.reference).score(self.histograms)
+
+        self.assertTrue(np.allclose(scores, cosine_similarity(self.histograms, self.reference)))
+
+    def test_chi_squared_scorer(self):
+        scores = ChiSquaredScorer(self.reference).score(self.histograms)
+        totals = self.histograms.sum(axis=1, keepdims=True)
+        expected = totals * self.reference / self.reference.sum()
+        chi_squared = np.sum((self.histograms - expected) ** 2 / expected, axis=1)
+
+        self.assertTrue(np.allclose(scores, -chi_squared))
+
+    def test_log_likelihood_scorer(self):
+        scores = LogLikelihoodScorer(self.reference).score(self.histograms)
+        log_likelihood = self.histograms @ np.log(self.reference / self.reference.sum())
+
+        self.assertTrue(np.allclose(scores, log_likelihood / self.histograms.sum(axis=1)))
+
+    def test_single_and_empty_histograms(self):
+        m = Message('THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG')
+
+        for scorer in (CosineScorer(), ChiSquaredScorer(), LogLikelihoodScorer()):
+            self.assertEqual(scorer.score(letter_distribution(m)).shape, (1,))
+            self.assertEqual(scorer.score(np.zeros((2, 26))).tolist(), [-np.inf, -np.inf])
+
+    def test_english_scores_higher_than_ciphertext(self):
+        m = Message('IT WAS THE BEST OF TIMES IT WAS THE WORST OF TIMES IT WAS THE AGE OF WISDOM')
+        c = CaesarCipher().encrypt(m, CaesarCipherKey(7))
+        histograms = letter_distributions(np.stack([np.frombuffer(s.encode(), dtype=np.uint8) for s in (m, c)]))
+
+        for scorer in (CosineScorer(), ChiSquaredScorer(), LogLikelihoodScorer()):
+            scores = scorer.score(histograms)
+            self.assertGreater(scores[0], scores[1], scorer)
+            self.assertEqual(int(np.argmax(scorer.score(rotations(histograms[1])))), 7, scorer)
+
+    def test_attacks_with_scorers(self):
+        m = Message('IT WAS THE BEST OF TIMES IT WAS THE WORST OF TIMES IT WAS THE AGE OF WISDOM')
+        c = CaesarCipher().encrypt(m, CaesarCipherKey(11))
+
+        for scorer in (CosineScorer(), ChiSquaredScorer(), LogLikelihoodScorer()):
+            attack = LetterFrequencyAttack(ExhaustiveSampling(), scorer=scorer)
+            message, key = attack.from_cipher(c, CaesarCipher, CaesarCipherKey)
+            self.assertEqual(message, m, scorer)
+            self.assertEqual(key.value, 11, scorer)
+            self.assertIs(IndexOfCoincidenceAttack(scorer=scorer).scorer, scorer)
+
+
+if __name__ == '__main__':
+    unittest.main()
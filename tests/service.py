@@ -0,0 +1,184 @@
+import asyncio
+import unittest
+
+from crypto.ciphers.substitution import SubstitutionCipher, SubstitutionCipherKey
+from crypto.service import BatchService, run_job, validate_job
+
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+async def serve(service: BatchService, lines):
+    async def read():
+        for line in lines:
+            yield line
+
+    results = []
+
+    async def emit(result):
+        results.append(result)
+
+    await service.serve(read(), emit)
+
+    return results
+
+
+# A job that takes far longer than any test is willing to wait.
+SLOW_JOB = '{"id": "slow", "ciphertext": "LXFOPVEFRNHR", "cipher": "VigenereCipher", ' \
+           '"sampling": {"type": "random", "n": 1000000000}}'
+
+
+class TestService(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def test_run_job_cracks_ciphertexts(self):
+        result = run_job(dict(ciphertext='KHOOR ZRUOG', cipher='CaesarCipher', attack='DictionaryAttack'))
+        self.assertEqual((result['message'], result['key']), ('HELLO WORLD', '3'))
+        self.assertEqual(result['score'], 1.0)
+
+        result = run_job(dict(ciphertext='LXFOPVEFRNHR', cipher='VigenereCipher', attack='IndexOfCoincidenceAttack',
+                              options=dict(max_key_length=5)))
+        self.assertIn('message', result)
+
+        key = SubstitutionCipherKey.generate_random()
+        result = run_job(dict(ciphertext=SubstitutionCipher().encrypt('HELLO', key), cipher='SubstitutionCipher',
+                              attack='HillClimbingAttack',
+                              options=dict(n_restarts=1, n_iterations=10, seed=0)))
+        self.assertEqual(len(result['key']), 26)
+
+    def test_invalid_jobs_are_reported(self):
+        self.assertIsNone(validate_job(dict(ciphertext='ABC', cipher='CaesarCipher')))
+        self.assertIsNotNone(validate_job(dict(ciphertext='ABC', cipher='EnigmaCipher')))
+        self.assertIsNotNone(validate_job(dict(ciphertext='ABC', cipher='CaesarCipher', attack='GuessAttack')))
+        self.assertIsNotNone(validate_job(dict(ciphertext=123, cipher='CaesarCipher')))
+        self.assertIsNotNone(validate_job(dict(id=[1], ciphertext='ABC', cipher='CaesarCipher')))
+
+    def test_only_safe_options_are_allowed(self):
+        def job(**options):
+            return dict(ciphertext='ABC', cipher='CaesarCipher', options=options)
+
+        self.assertIsNone(validate_job(job(chunk_size=64, top_k=3, prefix_length=20, margin=1.5)))
+        self.assertIsNotNone(validate_job(job(checkpoint_path='/tmp/checkpoint.pickle')))
+        self.assertIsNotNone(validate_job(job(n_workers=1000)))
+        self.assertIsNotNone(validate_job(job(chunk_size='64')))
+        self.assertIsNotNone(validate_job(dict(ciphertext='ABC', cipher='CaesarCipher', options=[1])))
+
+    def test_timeout_and_sampling_are_validated(self):
+        def job(**fields):
+            return dict(ciphertext='ABC', cipher='CaesarCipher', **fields)
+
+        self.assertIsNone(validate_job(job(timeout=None, sampling=None)))
+        self.assertIsNone(validate_job(job(timeout=1.5, sampling=dict(type='unique', n=10, seed=1, part=0, n_parts=2))))
+        self.assertIsNotNone(validate_job(job(timeout='abc')))
+        self.assertIsNotNone(validate_job(job(timeout=-1)))
+        self.assertIsNotNone(validate_job(job(sampling='random')))
+        self.assertIsNotNone(validate_job(job(sampling=dict(type='guess'))))
+        self.assertIsNotNone(validate_job(job(sampling=dict(type='random', n='10'))))
+        self.assertIsNotNone(validate_job(job(sampling=dict(type='random', n=1.5))))
+        self.assertIsNotNone(validate_job(job(sampling=dict(type='unique', max_bits=2 ** 40))))
+
+        async def main():
+            async with BatchService(1) as service:
+                return await serve(service, ['{"id": 1, "ciphertext": "KHOOR", "cipher": "CaesarCipher", '
+                                             '"timeout": "abc"}',
+                                             '{"id": 2, "ciphertext": "KHOOR", "cipher": "CaesarCipher", '
+                                             '"sampling": {"type": "random", "rng": "x"}}',
+                                             '{"id": 3, "ciphertext": "KHOOR", "cipher": "CaesarCipher"}'])
+
+        results = run(main())
+
+        self.assertEqual(sorted((result['id'], result['status']) for result in results),
+                         [(1, 'error'), (2, 'error'), (3, 'ok')])
+
+    def test_unexpected_errors_are_reported_as_results(self):
+        async def main():
+            async with BatchService(1) as service:
+                # Skip validation to reach the worker with a job that cannot run.
+                task = await service.submit(dict(id='bad', ciphertext='KHOOR', cipher='CaesarCipher', timeout='abc'))
+
+                return await task
+
+        result = run(main())
+
+        self.assertEqual((result['id'], result['status']), ('bad', 'error'))
+
+        async def main():
+            async with BatchService(1) as service:
+                return await serve(service, ['not json', '[1, 2]', '{"ciphertext": "ABC", "cipher": "Enigma"}',
+                                             '{"id": "lower", "ciphertext": "abc", "cipher": "CaesarCipher"}'])
+
+        results = run(main())
+
+        self.assertEqual([result['status'] for result in results], ['error'] * 4)
+        self.assertEqual([result['id'] for result in results], [None, None, 3, 'lower'])
+
+    def test_results_are_streamed_for_every_job(self):
+        lines = ['{"id": %d, "ciphertext": "KHOOR ZRUOG", "cipher": "CaesarCipher", "attack": "DictionaryAttack"}' % i
+                 for i in range(6)]
+
+        async def main():
+            # Only two jobs can be in flight at once, so reading the jobs has to wait for earlier jobs to finish.
+            async with BatchService(2, max_pending=2) as service:
+                return await serve(service, lines)
+
+        results = run(main())
+
+        self.assertEqual(sorted(result['id'] for result in results), list(range(6)))
+        self.assertTrue(all(result['status'] == 'ok' and result['message'] == 'HELLO WORLD' for result in results))
+
+    def test_slow_jobs_time_out_and_free_their_worker(self):
+        fast_job = '{"id": "fast", "ciphertext": "KHOOR", "cipher": "CaesarCipher"}'
+
+        async def main():
+            async with BatchService(1, timeout=0.5) as service:
+                return await serve(service, [SLOW_JOB, fast_job])
+
+        results = run(main())
+
+        self.assertEqual([(result['id'], result['status']) for result in results], [('slow', 'timeout'),
+                                                                                     ('fast', 'ok')])
+
+    def test_jobs_can_be_cancelled(self):
+        async def main():
+            async with BatchService(1) as service:
+                return await serve(service, [SLOW_JOB, '{"cancel": "slow"}'])
+
+        results = run(main())
+
+        self.assertEqual([(result['id'], result['status']) for result in results], [('slow', 'cancelled')])
+
+    def test_ids_in_flight_must_be_unique(self):
+        async def main():
+            async with BatchService(1) as service:
+                return await serve(service, [SLOW_JOB, SLOW_JOB, '{"cancel": "slow"}'])
+
+        results = run(main())
+
+        self.assertEqual([(result['id'], result['status']) for result in results], [('slow', 'error'),
+                                                                                     ('slow', 'cancelled')])
+
+    def test_connections_cannot_cancel_each_others_jobs(self):
+        async def main():
+            async with BatchService(2, timeout=1) as service:
+                async def other_connection():
+                    await asyncio.sleep(0.2)
+
+                    return await serve(service, [SLOW_JOB.replace('1000000000', '1'), '{"cancel": "slow"}'])
+
+                return await asyncio.gather(serve(service, [SLOW_JOB]), other_connection())
+
+        results, other_results = run(main())
+
+        self.assertEqual([(result['id'], result['status']) for result in results], [('slow', 'timeout')])
+        self.assertEqual([result['id'] for result in other_results], ['slow'])
+
+
+if __name__ == '__main__':
+    unittest.main()
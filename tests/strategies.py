@@ -0,0 +1,120 @@
+import unittest
+from random import Random
+
+from crypto.ciphers.caesar import CaesarCipherKey
+from crypto.ciphers.substitution import SubstitutionCipherKey
+from crypto.ciphers.vigenere import VigenereCipherKey
+from crypto.strategies import ExhaustiveSampling, RandomSampling, UniqueRandomSampling, BitSet, BloomFilter
+
+
+class TestStrategies(unittest.TestCase):
+    def test_exhaustive_sampling_partitions_cover_key_space(self):
+        parts = ExhaustiveSampling().partition(3)
+        keys = [key for part in parts for key in part.sample(CaesarCipherKey)]
+
+        self.assertEqual(keys, list(CaesarCipherKey.get_space()))
+
+    def test_exhaustive_sampling_partitions_are_contiguous(self):
+        parts = ExhaustiveSampling().partition(2)
+        nested_parts = [nested_part for part in parts for nested_part in part.partition(3)]
+
+        self.assertEqual([part.get_range(CaesarCipherKey).start for part in nested_parts],
+                         [part.get_range(CaesarCipherKey).start for part in ExhaustiveSampling().partition(6)])
+        self.assertEqual([key for part in nested_parts for key in part.sample(CaesarCipherKey)],
+                         list(CaesarCipherKey.get_space()))
+
+    def test_random_sampling_partitions_share_samples(self):
+        parts = RandomSampling(10).partition(3)
+
+        self.assertEqual([part.n for part in parts], [4, 3, 3])
+        self.assertEqual(sum(len(list(part.sample(CaesarCipherKey))) for part in parts), 10)
+
+    def test_random_sampling_resumes_from_state(self):
+        sampler = RandomSampling(20, seed=3)
+        keys = list(RandomSampling(20, seed=3).sample(VigenereCipherKey))
+
+        samples = sampler.sample(VigenereCipherKey)
+        first_keys = [next(samples) for _ in range(8)]
+        state = sampler.getstate()
+
+        resumed = RandomSampling(20)
+        resumed.setstate(state)
+
+        self.assertEqual(first_keys + list(resumed.sample(VigenereCipherKey, start=8)), keys)
+
+    def test_random_sampling_takes_the_number_of_samples_positionally(self):
+        self.assertEqual(len(list(RandomSampling(20, seed=3).sample(VigenereCipherKey, 5))), 5)
+        self.assertEqual(len(list(UniqueRandomSampling(20, seed=3).sample(CaesarCipherKey, 5))), 5)
+        self.assertTrue(all(len(VigenereCipherKey.generate_random(3, rng=Random(i))) <= 3 for i in range(20)))
+
+    def test_unique_random_sampling_never_repeats_keys(self):
+        for key_type, n in [(CaesarCipherKey, 20), (VigenereCipherKey, 500), (SubstitutionCipherKey, 200)]:
+            keys = list(UniqueRandomSampling(n, seed=1).sample(key_type))
+
+            self.assertEqual(len(keys), n)
+            self.assertEqual(len(set(keys)), n)
+
+    def test_unique_random_sampling_enumerates_small_key_spaces(self):
+        self.assertEqual(list(UniqueRandomSampling(1000, seed=1).sample(CaesarCipherKey)),
+                         list(CaesarCipherKey.get_space()))
+        self.assertEqual(list(UniqueRandomSampling(1000, seed=1).sample(CaesarCipherKey, start=20)),
+                         list(CaesarCipherKey.get_space())[20:])
+
+    def test_unique_random_sampling_is_reproducible(self):
+        self.assertEqual(list(UniqueRandomSampling(20, seed=5).sample(CaesarCipherKey)),
+                         list(UniqueRandomSampling(20, seed=5).sample(CaesarCipherKey)))
+        # A Bloom filter is used when the key space is too large to remember exactly.
+        self.assertEqual(list(UniqueRandomSampling(50, seed=5, max_bits=0).sample(VigenereCipherKey)),
+                         list(UniqueRandomSampling(50, seed=5, max_bits=0).sample(VigenereCipherKey)))
+
+    def test_unique_random_sampling_resumes_from_state(self):
+        keys = list(UniqueRandomSampling(20, seed=3).sample(CaesarCipherKey))
+
+        sampler = UniqueRandomSampling(20, seed=3)
+        samples = sampler.sample(CaesarCipherKey)
+        first_keys = [next(samples) for _ in range(8)]
+        state = sampler.getstate()
+
+        resumed = UniqueRandomSampling(20)
+        resumed.setstate(state)
+
+        self.assertEqual(first_keys + list(resumed.sample(CaesarCipherKey, start=8)), keys)
+
+    def test_unique_random_sampling_partitions_are_disjoint(self):
+        parts = UniqueRandomSampling(20, seed=2).partition(3)
+        keys = [key for part in parts for key in part.sample(CaesarCipherKey)]
+
+        self.assertEqual([part.n for part in parts], [7, 7, 6])
+        self.assertEqual(len(keys), 20)
+        self.assertEqual(len(set(keys)), 20)
+
+        nested_parts = [nested_part for part in UniqueRandomSampling(26).partition(2)
+                        for nested_part in part.partition(2)]
+        keys = [key for part in nested_parts for key in part.sample(CaesarCipherKey)]
+
+        self.assertEqual(sorted(keys, key=lambda k: k.value), list(CaesarCipherKey.get_space()))
+
+    def test_unique_random_sampling_stops_when_its_share_is_exhausted(self):
+        # A Bloom filter this small soon claims that every key was sampled already.
+        sampler = UniqueRandomSampling(100, seed=0, max_bits=0, error_rate=0.99, max_retries=50)
+
+        with self.assertRaises(RuntimeError):
+            list(sampler.sample(VigenereCipherKey))
+
+    def test_visited_sets(self):
+        for visited in (BitSet(1000), BloomFilter(1000)):
+            self.assertTrue(all(visited.add(i) for i in range(0, 1000, 2)))
+            self.assertFalse(any(visited.add(i) for i in range(0, 1000, 2)))
+
+        bloom_filter = BloomFilter(1000, error_rate=0.01)
+
+        for i in range(1000):
+            bloom_filter.add(i)
+
+        self.assertTrue(all(i in bloom_filter for i in range(1000)))
+        n_false_positives = sum(i in bloom_filter for i in range(10 ** 6, 10 ** 6 + 10000))
+        self.assertLess(n_false_positives, 300)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+from crypto.ciphers.caesar import CaesarCipherKey
+from crypto.ciphers.substitution import SubstitutionCipherKey
+from crypto.ciphers.utils import translate, shifted_alphabet
+from crypto.translation import translation_table, inverse_alphabet
+
+
+class TestTranslation(unittest.TestCase):
+    def test_keys_with_the_same_value_share_tables(self):
+        key = CaesarCipherKey(3)
+        other_key = CaesarCipherKey(3)
+
+        self.assertIs(key.encryption_table, other_key.encryption_table)
+        self.assertIs(key.decryption_table, other_key.decryption_table)
+        self.assertIs(key.decryption_table, CaesarCipherKey(23).encryption_table)
+
+    def test_inverse_alphabet_undoes_alphabet(self):
+        key = SubstitutionCipherKey.generate_random()
+        table = translation_table(key.alphabet)
+        inverse_table = translation_table(inverse_alphabet(key.alphabet))
+
+        self.assertEqual(inverse_alphabet(shifted_alphabet(1)), shifted_alphabet(-1))
+        self.assertEqual(translate(translate('HELLO WORLD', table), inverse_table), 'HELLO WORLD')
+
+    def test_translate_gives_the_same_result_for_every_input_type(self):
+        table = translation_table(shifted_alphabet(3))
+        out = bytearray(11)
+
+        self.assertEqual(translate('HELLO WORLD', table), 'KHOOR ZRUOG')
+
+        for x in (b'HELLO WORLD', bytearray(b'HELLO WORLD'), memoryview(b'HELLO WORLD')):
+            with self.subTest(type=type(x).__name__):
+                self.assertEqual(translate(x, table), b'KHOOR ZRUOG')
+
+        self.assertIs(translate('HELLO WORLD', table, out), out)
+        self.assertEqual(out, b'KHOOR ZRUOG')
+
+
+if __name__ == '__main__':
+    unittest.main()
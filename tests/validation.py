@@ -0,0 +1,49 @@
+import unittest
+
+from crypto.ciphers.caesar import CaesarCipher, CaesarCipherKey
+from crypto.common_attacks import NGramAttack
+from crypto.strategies import ExhaustiveSampling
+from crypto.validation import is_valid
+
+
+class CountingCaesarCipher(CaesarCipher):
+    """A Caesar cipher that counts how many times it validates its input."""
+
+    n_validations = 0
+
+    @staticmethod
+    def is_valid(x) -> bool:
+        CountingCaesarCipher.n_validations += 1
+
+        return CaesarCipher.is_valid(x)
+
+
+class TestValidation(unittest.TestCase):
+    def test_is_valid(self):
+        for x in ('', 'HELLO WORLD', 'HELLO\tWORLD\r\n', b'HELLO WORLD', bytearray(b'HELLO\nWORLD'),
+                  memoryview(b'HELLO WORLD')):
+            with self.subTest(x=x):
+                self.assertTrue(is_valid(x))
+
+        for x in ('Hello world', 'HELLO WORLD!', 'HELLO 1', 'CAFÉ', b'hello', memoryview(b'HELLO\x00')):
+            with self.subTest(x=x):
+                self.assertFalse(is_valid(x))
+
+    def test_unchecked_decrypt_skips_validation(self):
+        cipher = CaesarCipher()
+
+        self.assertRaises(AssertionError, cipher.decrypt, 'not valid', CaesarCipherKey(1))
+        self.assertEqual(cipher.decrypt('B C', CaesarCipherKey(1), validate=False), 'A B')
+        self.assertEqual(cipher.decrypt_many('B C', [CaesarCipherKey(1)], validate=False).shape, (1, 3))
+
+    def test_attack_validates_ciphertext_once(self):
+        c = CaesarCipher().encrypt('THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG', CaesarCipherKey(9))
+        CountingCaesarCipher.n_validations = 0
+
+        NGramAttack(ExhaustiveSampling(), chunk_size=4).top_candidates(c, CountingCaesarCipher, CaesarCipherKey)
+
+        self.assertEqual(CountingCaesarCipher.n_validations, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()